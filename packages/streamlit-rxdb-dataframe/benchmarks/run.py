@@ -0,0 +1,300 @@
+"""
+Benchmark suite of the Python side of `rxdb_dataframe`, run over synthetic collections
+generated from `benchmarks/schema.json` (see `rxdb_dataframe.synthetic`).
+
+    python benchmarks/run.py                        # compare with the default baseline
+    python benchmarks/run.py --save                 # (re)write the baseline
+    python benchmarks/run.py --sizes 1k,100k --only convert,query --threshold 0.1
+
+Every case is timed `--repeat` times, the fastest run is compared to the baseline. The exit
+status is 1 if any case is slower than the baseline by more than `--threshold` (relative),
+ignoring differences below the `--noise` floor (seconds).
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(current_dir))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from rxdb_dataframe import get_column_config, get_dataframe_by_schema  # noqa: E402
+from rxdb_dataframe.edits import diff_dataframes  # noqa: E402
+from rxdb_dataframe.indexes import DataFrameIndexes, schema_indexes  # noqa: E402
+from rxdb_dataframe.mango import query_dataframe  # noqa: E402
+from rxdb_dataframe.parallel import ParallelConverter  # noqa: E402
+from rxdb_dataframe.plan import compile_schema  # noqa: E402
+from rxdb_dataframe.synthetic import generate_docs  # noqa: E402
+
+DEFAULT_SCHEMA = os.path.join(current_dir, "schema.json")
+DEFAULT_BASELINE = os.path.join(current_dir, "baselines", "default.json")
+DEFAULT_SIZES = "1k,100k,1m"
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_NOISE = 0.001
+QUERY = {
+    "selector": {"priority": "high", "estimate": {"$gte": 50}, "completed": {"$ne": True}},
+    "sort": [{"createdAt": "desc"}],
+    "limit": 100,
+}
+RANGE_QUERY = {
+    "selector": {"createdAt": {"$gte": "2023-01-01T00:00:00Z", "$lt": "2023-02-01T00:00:00Z"}},
+    "sort": [{"createdAt": "asc"}],
+}
+
+SIZE_CASES = [
+    "convert",
+    "convert[flatten]",
+    "convert[parallel]",
+    "query",
+    "query[indexed]",
+    "range",
+    "range[indexed]",
+    "encode",
+    "diff",
+]
+
+Case = Tuple[str, Callable[[], Any]]
+
+
+class Elapsed(float):
+    """Seconds measured by the case itself"""
+
+
+def parse_size(size: str) -> int:
+    """`1k` -> 1000, `1m` -> 1000000"""
+    size = size.strip().lower()
+    factor = {"k": 1_000, "m": 1_000_000}.get(size[-1:], 1)
+    return int(float(size.rstrip("km")) * factor)
+
+
+def format_size(n: int) -> str:
+    for suffix, factor in (("m", 1_000_000), ("k", 1_000)):
+        if n >= factor and n % factor == 0:
+            return f"{n // factor}{suffix}"
+    return str(n)
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """Times the case, unless it reports its own timing (`Elapsed`, e.g. of a subprocess)"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        timings.append(float(result) if isinstance(result, Elapsed) else elapsed)
+    return {"min_s": min(timings), "median_s": statistics.median(timings), "repeat": repeat}
+
+
+def edited_frame(df: pd.DataFrame, primary_key: str, seed: int = 0) -> pd.DataFrame:
+    """
+    Returns copy of the frame with 1% of the titles changed, 0.5% of the rows removed and
+    0.5% of the rows added, as a bulk edit in `st.data_editor` would.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(df)
+    edited = df.copy()
+    changed = rng.choice(n, max(1, n // 100), replace=False)
+    title = edited.columns.get_loc("title")
+    edited.iloc[changed, title] = edited.iloc[changed, title] + " (edited)"
+    edited = edited.drop(edited.index[rng.choice(n, max(1, n // 200), replace=False)])
+    added = df.iloc[: max(1, n // 200)].copy()
+    added[primary_key] = [f"added-{i}" for i in range(len(added))]
+    return pd.concat([edited, added], ignore_index=True)
+
+
+def import_case(module: str) -> Callable[[], Any]:
+    """
+    Times the import of the module in a fresh interpreter, to catch heavy dependencies creeping
+    into the import path
+    """
+    env = {**os.environ, "PYTHONPATH": os.path.dirname(current_dir)}
+    code = (
+        "import time; started = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - started)"
+    )
+
+    def run():
+        process = subprocess.run(
+            [sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True
+        )
+        return Elapsed(process.stdout.split()[-1])
+
+    return run
+
+
+def schema_cases(schema: dict) -> List[Case]:
+    """Cases not depending on the collection size"""
+
+    def cold(func):
+        def run():
+            func.clear()
+            return func(schema)
+
+        return run
+
+    return [
+        ("dataframe_by_schema", cold(get_dataframe_by_schema)),
+        ("dataframe_by_schema[cached]", lambda: get_dataframe_by_schema(schema)),
+        ("column_config", cold(get_column_config)),
+        ("column_config[cached]", lambda: get_column_config(schema)),
+        ("import", import_case("rxdb_dataframe.core")),
+        ("import[streamlit]", import_case("rxdb_dataframe.component")),
+    ]
+
+
+def size_cases(schema: dict, docs: List[Dict[str, Any]]) -> List[Case]:
+    primary_key = schema["primaryKey"]
+    plan = compile_schema(schema)
+    flat_plan = compile_schema(schema, flatten=True)
+    df = plan.apply(docs)
+    edited = edited_frame(df, primary_key)
+    indexes = DataFrameIndexes(schema_indexes(schema, primary_key))
+    indexes.build(df)
+    converter = ParallelConverter(threshold=0)  # one chunk per core (up to 4)
+    return [
+        ("convert", lambda: plan.apply(docs)),
+        ("convert[flatten]", lambda: flat_plan.apply(docs)),
+        ("convert[parallel]", lambda: converter.convert(plan, docs)),
+        ("query", lambda: query_dataframe(df, QUERY, primary_key)),
+        ("query[indexed]", lambda: query_dataframe(df, QUERY, primary_key, indexes)),
+        ("range", lambda: query_dataframe(df, RANGE_QUERY, primary_key)),
+        ("range[indexed]", lambda: query_dataframe(df, RANGE_QUERY, primary_key, indexes)),
+        ("encode", lambda: plan.encode(df)),
+        ("diff", lambda: diff_dataframes(edited, df, plan, primary_key)),
+    ]
+
+
+def run_benchmarks(
+    schema: dict,
+    sizes: List[int],
+    repeat: int = 3,
+    only: Optional[List[str]] = None,
+    seed: int = 0,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns timings of the selected cases, keyed by `<case>/<size>` (schema cases by name).
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+
+    def selected(name: str) -> bool:
+        return not only or name.split("[")[0] in only
+
+    for name, func in schema_cases(schema):
+        if selected(name):
+            results[name] = measure(func, repeat)
+    for n in sizes:
+        if not any(selected(name) for name in SIZE_CASES):
+            break
+        docs = generate_docs(schema, n, seed=seed)
+        for name, func in size_cases(schema, docs):
+            if selected(name):
+                results[f"{name}/{format_size(n)}"] = {**measure(func, repeat), "rows": n}
+        del docs
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float = DEFAULT_THRESHOLD,
+    noise: float = DEFAULT_NOISE,
+) -> List[str]:
+    """
+    Returns names of the cases slower than the baseline by more than `threshold` (relative)
+    and `noise` (absolute, seconds).
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        current, previous = result["min_s"], base["min_s"]
+        if current > previous * (1 + threshold) and current - previous > noise:
+            regressions.append(name)
+    return regressions
+
+
+def environment() -> Dict[str, str]:
+    import pyarrow
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "pyarrow": pyarrow.__version__,
+    }
+
+
+def report(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    regressions: List[str],
+) -> str:
+    lines = [f"{'case':<32} {'min ms':>10} {'median ms':>10} {'baseline':>10} {'change':>8}"]
+    for name, result in results.items():
+        base = baseline.get(name)
+        previous = f"{base['min_s'] * 1000:.2f}" if base else ""
+        change = f"{result['min_s'] / base['min_s'] - 1:+.0%}" if base else ""
+        lines.append(
+            f"{name:<32} {result['min_s'] * 1000:>10.2f} {result['median_s'] * 1000:>10.2f} "
+            f"{previous:>10} {change:>8}"
+            + ("  REGRESSION" if name in regressions else "")
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--schema", default=DEFAULT_SCHEMA)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="e.g. 1k,100k,1m")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", help="comma separated case names, e.g. convert,diff")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="write results as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--noise", type=float, default=DEFAULT_NOISE)
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    with open(args.schema) as f:
+        schema = json.load(f)
+    sizes = [parse_size(size) for size in args.sizes.split(",") if size.strip()]
+    only = [name.strip() for name in args.only.split(",")] if args.only else None
+    results = run_benchmarks(schema, sizes, args.repeat, only, args.seed)
+
+    baseline: Dict[str, Dict[str, Any]] = {}
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold, args.noise)
+    print(report(results, baseline, regressions))
+
+    document = {"environment": environment(), "results": results}
+    for path in [args.output] + ([args.baseline] if args.save else []):
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(document, f, indent=2)
+                f.write("\n")
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -84,6 +84,15 @@ class AsyncSubprocess:
             env={**os.environ.copy(), **self.env} if self.env else None,
         )
 
+    @property
+    def pid(self) -> typing.Optional[int]:
+        """Process id of the running subprocess."""
+        return self._proc.pid if self._proc is not None else None
+
+    def is_running(self) -> bool:
+        """Check if the subprocess was started and has not exited yet."""
+        return self._proc is not None and self._proc.poll() is None
+
     def stop(self):
         """Terminate the subprocess and close resources."""
         if self._proc is not None:
@@ -98,17 +107,23 @@ class StreamlitRunner:
     """A context manager for running Streamlit scripts."""
 
     def __init__(
-            self, script_path: os.PathLike, server_port: typing.Optional[int] = None
+            self, script_path: os.PathLike, server_port: typing.Optional[int] = None,
+            args: typing.Optional[typing.List[str]] = None,
+            env: typing.Optional[typing.Dict[str, str]] = None,
     ):
         """Initialize a StreamlitRunner instance.
 
         Args:
             script_path (os.PathLike): Path to the Streamlit script to run.
             server_port (int, optional): Port for the Streamlit server. Defaults to None.
+            args (List[str], optional): Extra `streamlit run` options. Defaults to None.
+            env (dict, optional): Extra environment variables. Defaults to None.
         """
         self._process = None
         self.server_port = server_port
         self.script_path = script_path
+        self.args = args or []
+        self.env = env
 
     def __enter__(self) -> "StreamlitRunner":
         """Start the Streamlit server when entering the context."""
@@ -133,7 +148,9 @@ class StreamlitRunner:
                 "--server.headless=true",
                 "--browser.gatherUsageStats=false",
                 "--global.developmentMode=false",
-            ]
+                *self.args,
+            ],
+            env=self.env,
         )
         self._process.start()
         if not self.is_server_running():
@@ -144,25 +161,44 @@ class StreamlitRunner:
         """Stop the Streamlit server and close resources."""
         self._process.stop()
 
-    def is_server_running(self, timeout: int = 30) -> bool:
+    @property
+    def pid(self) -> typing.Optional[int]:
+        """Process id of the Streamlit server."""
+        return self._process.pid if self._process is not None else None
+
+    def is_server_running(
+            self, timeout: float = 30, interval: float = 0.05, max_interval: float = 1.0
+    ) -> bool:
         """Check if the Streamlit server is running.
 
+        The health endpoint is polled with an interval growing from `interval` to
+        `max_interval`, so a server starting quickly is detected at once.
+
         Args:
-            timeout (int, optional): Maximum time to wait for the server to start. Defaults to 30.
+            timeout (float, optional): Maximum time to wait for the server to start, in seconds.
+                Defaults to 30.
+            interval (float, optional): First polling interval, in seconds. Defaults to 0.05.
+            max_interval (float, optional): Longest polling interval, in seconds. Defaults to 1.
 
         Returns:
             bool: True if the server is running, False otherwise.
         """
+        deadline = time.monotonic() + timeout
         with requests.Session() as http_session:
-            start_time = time.time()
             while True:
                 with contextlib.suppress(requests.RequestException):
-                    response = http_session.get(self.server_url + "/_stcore/health")
+                    response = http_session.get(
+                        self.server_url + "/_stcore/health", timeout=max_interval
+                    )
                     if response.text == "ok":
                         return True
-                time.sleep(3)
-                if time.time() - start_time > 60 * timeout:
+                if not self._process.is_running():
+                    return False  # the server exited, e.g. script or port error
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
                     return False
+                time.sleep(min(interval, remaining))
+                interval = min(interval * 2, max_interval)
 
     @property
     def server_url(self) -> str:
@@ -0,0 +1,299 @@
+"""Multi-session load harness for Streamlit apps using the RxDB dataframe component.
+
+Starts the app (the example app by default) with `StreamlitRunner`, opens N headless
+browser contexts (sessions) at once and replays a scripted workload in every one of them.
+Reported per session count: p50/p95/p99 rerun latency, errors, and the server RSS & CPU
+sampled while the sessions were running.
+
+    python e2e/load_harness.py --sessions 1,50,200
+    python e2e/load_harness.py --script my_app.py --workload workload.json --output load.json
+
+A workload is a JSON list of steps, every step (except `wait`) triggers a rerun which is timed
+until the app settles (no script run for `--settle` ms):
+
+    {"action": "click", "text": "active"}                  # click a widget label, e.g. radio
+    {"action": "edit", "row": 0, "column": 0, "value": "x"}  # edit a data editor cell
+    {"action": "paste", "row": 0, "column": 0, "rows": [["a", "true"]]}  # bulk insert/update
+    {"action": "wait", "ms": 500}
+
+Requires `playwright` (with Chromium installed) and `psutil`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import typing
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from e2e_utils import StreamlitRunner  # noqa: E402
+
+ROOT_DIRECTORY = Path(__file__).parent.parent.absolute()
+BASIC_EXAMPLE_FILE = ROOT_DIRECTORY / "example.py"
+COMPONENT_FRAME = 'iframe[title="rxdb_dataframe\\.rxdb_dataframe"]'
+DATA_EDITOR = '[data-testid="stDataFrameResizable"]'
+# the grid is drawn on a canvas, cells are addressed by position
+ROW_HEIGHT = 35
+COLUMN_WIDTH = 120
+
+DEFAULT_WORKLOAD = [
+    {"action": "click", "text": "active"},
+    {"action": "click", "text": "completed"},
+    {"action": "click", "text": "all"},
+    {"action": "click", "text": "data_editor"},
+    {"action": "edit", "row": 0, "column": 0, "value": "edited by load harness"},
+    {
+        "action": "paste",
+        "row": -1,  # the "add row" row: pasted rows are added
+        "column": 0,
+        "rows": [[f"load harness todo {i}", "false"] for i in range(50)],
+    },
+    {"action": "click", "text": "dataframe"},
+]
+
+
+def percentile(values: typing.List[float], q: float) -> typing.Optional[float]:
+    """Nearest-rank percentile, `q` in [0, 100]."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+class ResourceSampler:
+    """Samples RSS & CPU of a process (with its children) in a background thread."""
+
+    def __init__(self, pid: int, interval: float = 0.25):
+        import psutil
+
+        self._process = psutil.Process(pid)
+        self.interval = interval
+        self.rss: typing.List[int] = []
+        self.cpu: typing.List[float] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _processes(self):
+        import psutil
+
+        with_children = [self._process]
+        with_children.extend(self._process.children(recursive=True))
+        for process in with_children:
+            try:
+                yield process, process.memory_info().rss, process.cpu_percent(None)
+            except psutil.NoSuchProcess:
+                continue
+
+    def _run(self):
+        list(self._processes())  # the first `cpu_percent` call only starts measuring
+        while not self._stop.wait(self.interval):
+            samples = list(self._processes())
+            self.rss.append(sum(rss for _, rss, _ in samples))
+            self.cpu.append(sum(cpu for _, _, cpu in samples))
+
+    def __enter__(self) -> "ResourceSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+
+    def summary(self) -> typing.Dict[str, typing.Optional[float]]:
+        mb = 1024 ** 2
+        return {
+            "rss_peak_mb": max(self.rss) / mb if self.rss else None,
+            "rss_mean_mb": sum(self.rss) / len(self.rss) / mb if self.rss else None,
+            "cpu_mean_percent": sum(self.cpu) / len(self.cpu) if self.cpu else None,
+            "cpu_peak_percent": max(self.cpu) if self.cpu else None,
+        }
+
+
+async def wait_for_app(page, settle_ms: int, timeout_ms: int) -> None:
+    """Wait until the app finished its script runs, including the ones triggered by the
+    component (a run starting within `settle_ms` after the previous one is waited for too)."""
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    not_running = page.locator('[data-testid="stApp"][data-test-script-state="notRunning"]')
+    running = page.locator('[data-testid="stApp"][data-test-script-state="running"]')
+    while True:
+        await not_running.wait_for(timeout=timeout_ms)
+        try:
+            await running.wait_for(timeout=settle_ms)
+        except PlaywrightTimeoutError:
+            return  # the app settled
+
+
+async def _cell(page, row: int, column: int) -> typing.Tuple[float, float]:
+    """Position of the visible data editor cell, negative rows count from the bottom
+    (-1 is the trailing "add row" row of editors with dynamic rows)."""
+    box = await page.locator(DATA_EDITOR).first.bounding_box()
+    if box is None:
+        raise RuntimeError("Data editor is not visible")
+    x = box["x"] + COLUMN_WIDTH * column + COLUMN_WIDTH / 2
+    if row < 0:
+        y = box["y"] + box["height"] + ROW_HEIGHT * row + ROW_HEIGHT / 2
+    else:
+        y = box["y"] + ROW_HEIGHT * (row + 1) + ROW_HEIGHT / 2  # below the header row
+    return x, y
+
+
+async def run_step(page, step: typing.Dict[str, typing.Any]) -> None:
+    action = step["action"]
+    if action == "wait":
+        await page.wait_for_timeout(step.get("ms", 0))
+    elif action == "click":
+        await page.get_by_text(step["text"], exact=True).first.click()
+    elif action == "edit":
+        x, y = await _cell(page, step.get("row", 0), step.get("column", 0))
+        await page.mouse.dblclick(x, y)
+        await page.keyboard.press("Control+A")
+        await page.keyboard.type(str(step["value"]))
+        await page.keyboard.press("Enter")
+    elif action == "paste":
+        tsv = "\n".join("\t".join(str(value) for value in row) for row in step["rows"])
+        x, y = await _cell(page, step.get("row", -1), step.get("column", 0))
+        await page.mouse.click(x, y)
+        await page.evaluate("text => navigator.clipboard.writeText(text)", tsv)
+        await page.keyboard.press("Control+V")
+    else:
+        raise ValueError(f"Unknown workload action {action!r}")
+
+
+async def run_session(
+        browser, url: str, workload: typing.List[typing.Dict[str, typing.Any]],
+        iterations: int, settle_ms: int, timeout_ms: int,
+) -> typing.Dict[str, typing.Any]:
+    """Open a browser context, load the app & replay the workload, timing every step."""
+    context = await browser.new_context(permissions=["clipboard-read", "clipboard-write"])
+    latencies: typing.List[float] = []
+    errors: typing.List[str] = []
+    try:
+        page = await context.new_page()
+        started = time.perf_counter()
+        await page.goto(url)
+        await page.frame_locator(COMPONENT_FRAME).locator("body").wait_for(timeout=timeout_ms)
+        await wait_for_app(page, settle_ms, timeout_ms)
+        load_s = time.perf_counter() - started - settle_ms / 1000
+        for _ in range(iterations):
+            for step in workload:
+                started = time.perf_counter()
+                try:
+                    await run_step(page, step)
+                    if step["action"] != "wait":
+                        await wait_for_app(page, settle_ms, timeout_ms)
+                        latencies.append(time.perf_counter() - started - settle_ms / 1000)
+                except Exception as e:
+                    errors.append(f"{step['action']}: {e}".splitlines()[0])
+    except Exception as e:
+        load_s = None
+        errors.append(f"load: {e}".splitlines()[0])
+    finally:
+        await context.close()
+    return {"load_s": load_s, "latencies": latencies, "errors": errors}
+
+
+async def run_load(
+        url: str, sessions: int, workload: typing.List[typing.Dict[str, typing.Any]],
+        iterations: int, settle_ms: int, timeout_ms: int,
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=True)
+        try:
+            return await asyncio.gather(*[
+                run_session(browser, url, workload, iterations, settle_ms, timeout_ms)
+                for _ in range(sessions)
+            ])
+        finally:
+            await browser.close()
+
+
+def measure_sessions(
+        script: Path, sessions: int, workload: typing.List[typing.Dict[str, typing.Any]],
+        iterations: int = 1, settle_ms: int = 300, timeout_ms: int = 60000,
+) -> typing.Dict[str, typing.Any]:
+    """Run the workload in `sessions` concurrent sessions of a freshly started app."""
+    with StreamlitRunner(script, args=["--server.fileWatcherType=none"]) as runner:
+        with ResourceSampler(runner.pid) as sampler:
+            started = time.perf_counter()
+            results = asyncio.run(
+                run_load(runner.server_url, sessions, workload, iterations, settle_ms,
+                         timeout_ms)
+            )
+            duration = time.perf_counter() - started
+    latencies = [latency for result in results for latency in result["latencies"]]
+    loads = [result["load_s"] for result in results if result["load_s"] is not None]
+    errors = [error for result in results for error in result["errors"]]
+    resources = sampler.summary()
+    return {
+        "sessions": sessions,
+        "duration_s": duration,
+        "reruns": len(latencies),
+        "p50_ms": _ms(percentile(latencies, 50)),
+        "p95_ms": _ms(percentile(latencies, 95)),
+        "p99_ms": _ms(percentile(latencies, 99)),
+        "load_p50_ms": _ms(percentile(loads, 50)),
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+        **resources,
+        "rss_per_session_mb": (
+            resources["rss_peak_mb"] / sessions if resources["rss_peak_mb"] else None
+        ),
+    }
+
+
+def _ms(seconds: typing.Optional[float]) -> typing.Optional[float]:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+def report(results: typing.List[typing.Dict[str, typing.Any]]) -> str:
+    columns = ["sessions", "reruns", "p50_ms", "p95_ms", "p99_ms", "errors", "rss_peak_mb",
+               "rss_per_session_mb", "cpu_mean_percent"]
+    lines = ["  ".join(f"{column:>18}" for column in columns)]
+    for result in results:
+        values = [result[column] for column in columns]
+        lines.append("  ".join(
+            f"{value:>18.1f}" if isinstance(value, float) else f"{str(value):>18}"
+            for value in values
+        ))
+    return "\n".join(lines)
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--script", default=str(BASIC_EXAMPLE_FILE))
+    parser.add_argument("--sessions", default="1,10,50", help="session counts, e.g. 1,50,200")
+    parser.add_argument("--workload", help="JSON file with workload steps")
+    parser.add_argument("--iterations", type=int, default=1, help="workload runs per session")
+    parser.add_argument("--settle", type=int, default=300, help="ms without a script run")
+    parser.add_argument("--timeout", type=int, default=60000, help="ms per step")
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    workload = DEFAULT_WORKLOAD
+    if args.workload:
+        with open(args.workload) as f:
+            workload = json.load(f)
+    results = []
+    for sessions in [int(n) for n in args.sessions.split(",") if n.strip()]:
+        print(f"Running {sessions} session(s)...", file=sys.stderr)
+        results.append(measure_sessions(
+            Path(args.script), sessions, workload, args.iterations, args.settle, args.timeout
+        ))
+    print(report(results))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+    return 0 if not any(result["errors"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
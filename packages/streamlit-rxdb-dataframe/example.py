@@ -2,11 +2,13 @@ import json
 import os
 from typing import Dict, List
 import streamlit as st
-from streamlit.runtime.caching import cache_data
+from streamlit.runtime.caching import cache_data, cache_resource
 from rxdb_dataframe import (
     RXDB_COLLECTION_EDITOR_KEY,
+    LocalQuery,
     RxCollectionCreator,
     RxDBSessionState,
+    load_dump,
     rxdb_dataframe,
 )
 
@@ -17,7 +19,9 @@ data_dir = os.path.join(current_dir, "rxdb_dataframe/frontend/public/assets/data
 
 collection_name = "todo"
 todoSchema: Dict = json.load(open(os.path.join(data_dir, "todo.schema.json")))
-initial_docs: List = json.load(open(os.path.join(data_dir, "col.dump.json")))["docs"]
+# loaded once per process by a streaming parser, seed docs are sent only if needed, in chunks
+col_dump: Dict = cache_resource(load_dump)(os.path.join(data_dir, "col.dump.json"))
+initial_docs: List = col_dump["docs"]
 collection_config: RxCollectionCreator = {
     "name": collection_name,
     "schema": todoSchema,  # to auto load schema from remote url pass None
@@ -72,7 +76,12 @@ df = rxdb_dataframe(
     query=query,
     with_rev=False,
     on_change=on_change_dataframe,
+    schema_hash=col_dump["schemaHash"],
+    local_query=LocalQuery(),
 )
+if state.seed and not state.seed.get("done"):
+    loaded, total = state.seed.get("loaded", 0), state.seed.get("total", 0)
+    st.progress(loaded / total if total else 0.0, text=f"Seeding {loaded}/{total} docs")
 
 if display == "data_editor":
     try:
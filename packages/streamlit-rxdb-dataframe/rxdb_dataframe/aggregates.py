@@ -0,0 +1,226 @@
+"""
+Incrementally maintained aggregates over the collection dataframe.
+
+An `AggregateSpec` declares measures (`count`, `sum`, `min`, `max`, `mean` of a column) grouped
+by columns and/or a time bucket of a datetime column (e.g. `last_modified` or `createdAt`):
+
+    AggregateSpec(
+        {"todos": ("id", "count"), "done": ("completed", "sum"), "avg": ("estimate", "mean")},
+        by=["priority"],
+        time_column="createdAt",
+        freq="1D",
+    )
+
+`MaterializedAggregate` keeps per-group partial aggregates (row count, non-null count, sum,
+min, max). In `delta` mode they are updated from the change set only: removed rows (deleted &
+the previous version of updated ones) are subtracted and added rows (inserted & updated) added.
+Min & max are not invertible, so groups whose extremum was removed are recomputed from their
+rows of the patched dataframe. A full recompute happens on "full" change sets (initial load,
+resync) and when the dataframe was replaced by other means (non-delta modes).
+"""
+
+import weakref
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+AGGREGATE_FUNCTIONS = ("count", "sum", "min", "max", "mean")
+ROWS = "__rows"
+ALL = "__all"
+
+
+class AggregateSpec:
+    """
+    Declarative aggregate: `measures` (name -> `(column, function)`) grouped by the `by` columns
+    and the `freq` bucket (pandas offset alias, e.g. `"1h"`, `"1D"`) of the `time_column`.
+    Use `None` as the column of `count` to count rows.
+    """
+
+    def __init__(
+        self,
+        measures: Dict[str, Tuple[Optional[str], str]],
+        by: Optional[Sequence[str]] = None,
+        time_column: Optional[str] = None,
+        freq: Optional[str] = None,
+    ):
+        for name, (column, function) in measures.items():
+            if function not in AGGREGATE_FUNCTIONS:
+                raise ValueError(f"Unsupported aggregate function {function!r} of {name!r}")
+            if column is None and function != "count":
+                raise ValueError(f"Measure {name!r} needs a column")
+        if bool(time_column) != bool(freq):
+            raise ValueError("Time buckets need both `time_column` and `freq`")
+        self.measures = dict(measures)
+        self.by = list(by or [])
+        self.time_column = time_column
+        self.freq = freq
+
+    @property
+    def keys(self) -> List[str]:
+        """Names of the group keys (index levels of the result)"""
+        keys = list(self.by)
+        if self.time_column:
+            keys.append(self.time_column)
+        return keys or [ALL]
+
+    def columns(self, *functions: str) -> List[str]:
+        """Measured columns of the given functions"""
+        columns = {
+            column
+            for column, function in self.measures.values()
+            if column is not None and function in functions
+        }
+        return sorted(columns)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, AggregateSpec) and vars(self) == vars(other)
+
+    def __repr__(self) -> str:
+        return f"AggregateSpec({self.measures!r}, by={self.keys!r}, freq={self.freq!r})"
+
+
+class MaterializedAggregate:
+    """
+    Per-group partial aggregates of the `AggregateSpec`, maintained incrementally
+    """
+
+    def __init__(self, spec: AggregateSpec):
+        self.spec = spec
+        self.state: Optional[pd.DataFrame] = None
+        self.full_updates = 0
+        self.incremental_updates = 0
+        self._source: Optional[weakref.ref] = None
+
+    def _group_keys(self, df: pd.DataFrame) -> List[pd.Series]:
+        spec = self.spec
+        keys = [df[column] for column in spec.by]
+        if spec.time_column:
+            times = df[spec.time_column]
+            if times.dtype.kind != "M":
+                times = pd.to_datetime(times, utc=True)
+            keys.append(times.dt.floor(spec.freq).rename(spec.time_column))
+        return keys or [pd.Series(0, index=df.index, name=ALL)]
+
+    def _group_index(self, df: pd.DataFrame) -> pd.Index:
+        keys = self._group_keys(df)
+        return pd.MultiIndex.from_arrays(keys) if len(keys) > 1 else pd.Index(keys[0])
+
+    def partial(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Partial aggregates of the rows, by group"""
+        spec = self.spec
+        grouped = df.groupby(self._group_keys(df), dropna=False, sort=False, observed=True)
+        parts: Dict[str, pd.Series] = {ROWS: grouped.size()}
+        for column in spec.columns("count", "mean", "sum"):
+            parts[f"{column}:count"] = grouped[column].count()
+        for column in spec.columns("sum", "mean"):
+            parts[f"{column}:sum"] = grouped[column].sum()
+        for column in spec.columns("min"):
+            parts[f"{column}:min"] = grouped[column].min()
+        for column in spec.columns("max"):
+            parts[f"{column}:max"] = grouped[column].max()
+        return pd.DataFrame(parts)
+
+    def recompute(self, df: pd.DataFrame) -> None:
+        """Full recompute over the dataframe"""
+        self.state = self.partial(df)
+        self.full_updates += 1
+        self._source = weakref.ref(df)
+
+    def refresh(self, df: pd.DataFrame) -> None:
+        """Recompute, unless the aggregates are up to date with this very dataframe"""
+        if self.state is None or self._source is None or self._source() is not df:
+            self.recompute(df)
+
+    def update(self, df: pd.DataFrame, removed: pd.DataFrame, added: pd.DataFrame) -> None:
+        """
+        Apply the removed & added rows; `df` is the dataframe after the change, used to recompute
+        extrema of groups whose min or max row was removed.
+        """
+        if self.state is None:
+            return self.recompute(df)
+        old = self.state
+        minus, plus = self.partial(removed), self.partial(added)
+        index = old.index.union(plus.index, sort=False)
+        additive = [c for c in old.columns if c == ROWS or c.endswith((":count", ":sum"))]
+        state = old.reindex(index)
+        state[additive] = (
+            state[additive]
+            .fillna(0)
+            .add(plus[additive].reindex(index), fill_value=0)
+            .sub(minus[additive].reindex(index), fill_value=0)
+        )
+
+        stale = pd.Series(False, index=index)
+        for column in [c for c in old.columns if c.endswith((":min", ":max"))]:
+            lowest = column.endswith(":min")
+            current = pd.concat([state[column], plus[column].reindex(index)], axis=1)
+            state[column] = current.min(axis=1) if lowest else current.max(axis=1)
+            gone = minus[column].reindex(index)
+            previous = old[column].reindex(index)
+            hit = gone <= previous if lowest else gone >= previous
+            stale |= hit.fillna(False).astype(bool)
+
+        state = state[state[ROWS] > 0]
+        stale = stale.reindex(state.index, fill_value=False)
+        if stale.any():
+            rows = df[self._group_index(df).isin(state.index[stale])]
+            extrema = [c for c in state.columns if c.endswith((":min", ":max"))]
+            state.loc[stale[stale].index, extrema] = self.partial(rows)[extrema]
+        self.state = state
+        self.incremental_updates += 1
+        self._source = weakref.ref(df)
+
+    def result(self) -> pd.DataFrame:
+        """Measures by group (index levels named by `spec.keys`)"""
+        state = self.state
+        if state is None:
+            return pd.DataFrame(columns=list(self.spec.measures))
+        result = pd.DataFrame(index=state.index)
+        for name, (column, function) in self.spec.measures.items():
+            if column is None:
+                result[name] = state[ROWS].astype("int64")
+            elif function == "count":
+                result[name] = state[f"{column}:count"].astype("int64")
+            elif function == "mean":
+                result[name] = state[f"{column}:sum"] / state[f"{column}:count"]
+            else:
+                result[name] = state[f"{column}:{function}"]
+        if self.spec.keys == [ALL]:
+            result = result.reset_index(drop=True)
+        return result
+
+
+def changed_rows(
+    df: pd.DataFrame, changes: Dict[str, Any], primary_key: str
+) -> Tuple[pd.DataFrame, List[Any]]:
+    """
+    Returns rows of the primary-key indexed `df` (before the "delta" change set is applied)
+    the change set removes or replaces, and the primary keys of inserted & updated docs.
+    """
+    keys: List[Any] = []
+    for docs in (changes.get("inserted"), changes.get("updated")):
+        if isinstance(docs, pd.DataFrame):
+            keys.extend(docs[primary_key].tolist())
+        elif docs:
+            keys.extend(doc[primary_key] for doc in docs)
+    replaced = df.index.isin(list(changes.get("deleted") or []) + keys)
+    return df[replaced].copy(), keys
+
+
+def update_aggregates(
+    aggregates: Dict[str, MaterializedAggregate],
+    df: pd.DataFrame,
+    removed: Optional[pd.DataFrame] = None,
+    added_keys: Optional[List[Any]] = None,
+) -> None:
+    """
+    Update the aggregates with the change (`removed` rows & keys of the added ones in `df`),
+    or bring them up to date with `df` when the change is not known.
+    """
+    if removed is None or added_keys is None:
+        for aggregate in aggregates.values():
+            aggregate.refresh(df)
+        return
+    added = df[df.index.isin(added_keys)]
+    for aggregate in aggregates.values():
+        aggregate.update(df, removed, added)
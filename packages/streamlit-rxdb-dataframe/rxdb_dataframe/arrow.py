@@ -0,0 +1,97 @@
+"""
+Apache Arrow IPC transport for the RxDBDataframe component results.
+
+With `Transport("arrow")` the component encodes the result set columnar-wise as Arrow IPC
+stream (Arrow schema is derived from the RxJSONSchema), everything else (`info`, `query`,
+change set meta) travels as JSON in the Arrow schema metadata under `rxdb` key.
+"""
+
+import json
+from typing import Any, Dict
+
+import pandas as pd
+
+from .changes import RXDB_CHANGES_FULL
+
+RXDB_TRANSPORT_JSON = "json"
+RXDB_TRANSPORT_ARROW = "arrow"
+RXDB_ARROW_METADATA_KEY = b"rxdb"
+
+
+class Transport:
+    """
+    Transport of `rxdb_dataframe` results: `encoding` of the documents (`"json"`, or `"arrow"`
+    IPC stream), change sets instead of result sets (`delta`) & payload measuring of the JSON
+    encoding (`measure_payload`, costs another serialization in the browser).
+    """
+
+    def __init__(
+        self,
+        encoding: str = RXDB_TRANSPORT_JSON,
+        delta: bool = False,
+        measure_payload: bool = False,
+    ):
+        if encoding not in (RXDB_TRANSPORT_JSON, RXDB_TRANSPORT_ARROW):
+            raise ValueError(f"Unknown transport encoding {encoding!r}")
+        self.encoding = encoding
+        self.delta = delta
+        self.measure_payload = measure_payload
+
+    def to_args(self) -> Dict[str, Any]:
+        """Component args of the transport"""
+        return {
+            "transport": self.encoding,
+            "delta": self.delta,
+            "measure_payload": self.measure_payload,
+        }
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as e:  # pragma: no cover
+        raise ImportError("Arrow transport requires `pyarrow` to be installed") from e
+    return pa
+
+
+def arrow_table_to_dataframe(table) -> pd.DataFrame:
+    """
+    Convert `pyarrow.Table` to `pandas.DataFrame` without copying the data:
+    columns are backed by pyarrow (`pd.ArrowDtype`), dictionary-encoded (enum) columns
+    become `category`.
+    """
+    pa = _import_pyarrow()
+
+    def types_mapper(arrow_type):
+        if pa.types.is_dictionary(arrow_type):
+            return None
+        return pd.ArrowDtype(arrow_type)
+
+    return table.to_pandas(types_mapper=types_mapper)
+
+
+def read_arrow_result(payload: bytes, schema: dict) -> Dict[str, Any]:
+    """
+    Decode Arrow IPC component result into the same shape as JSON one,
+    except that documents (`docs`, `inserted`, `updated`) are `pandas.DataFrame`s.
+    """
+    pa = _import_pyarrow()
+    table = pa.ipc.open_stream(pa.py_buffer(payload)).read_all()
+    result = json.loads(table.schema.metadata[RXDB_ARROW_METADATA_KEY])
+    df = arrow_table_to_dataframe(table)
+
+    # objects & arrays cross the boundary as JSON strings
+    for column, prop in schema.get("properties", {}).items():
+        if prop.get("type") in ("object", "array") and column in df:
+            df[column] = df[column].map(json.loads, na_action="ignore")
+
+    changes = result.get("changes")
+    if changes is None:
+        result["docs"] = df
+    elif changes["type"] == RXDB_CHANGES_FULL:
+        changes["docs"] = df
+    else:
+        inserted = changes["inserted"]
+        changes["inserted"] = df.iloc[:inserted]
+        changes["updated"] = df.iloc[inserted:]
+    return result
@@ -0,0 +1,302 @@
+"""
+Change feed of RxDB collection events (insert, update, delete) forwarded by the component.
+
+With `change_feed=True` the component subscribes to the collection's change events and
+attaches the ones not acknowledged by Python yet to every value it sends:
+
+    {
+        ...,
+        "change_events": {
+            "instance": "k3x9",     # component instance, sequence numbers restart with it
+            "dropped": 0,           # events dropped by the component (its buffer overflowed)
+            "events": [{"seq": 7, "operation": "UPDATE", "key": "a", "doc": {...},
+                        "previous": {...}}, ...],
+        },
+    }
+
+Python publishes new events to the session's `ChangeFeed` and acknowledges the accepted ones.
+Every subscriber has a bounded buffer; the feed accepts only as many events as the fullest
+subscriber can take (backpressure), the rest stay buffered in the component and are re-sent.
+A `RESYNC` event tells consumers that events were lost (the component was reloaded or its
+buffer overflowed) and they should rescan the collection snapshot.
+
+Subscriptions are consumed from any thread with the (blocking) iterator, or with `async for`
+from an asyncio event loop:
+
+    feed = get_change_feed("todo")
+    with feed.subscribe(maxsize=100) as changes:
+        for event in changes.events(timeout=1.0):
+            ...
+"""
+
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, Iterator, List, Optional, Tuple
+
+DEFAULT_CHANGE_BUFFER = 1000
+RXDB_CHANGE_INSERT = "INSERT"
+RXDB_CHANGE_UPDATE = "UPDATE"
+RXDB_CHANGE_DELETE = "DELETE"
+RXDB_CHANGE_RESYNC = "RESYNC"
+
+
+class ChangeEvent:
+    """
+    Collection change: operation, primary key, the document (after the change) and the previous
+    version of it (for updates & deletes)
+    """
+
+    __slots__ = ("operation", "key", "doc", "previous", "seq", "collection")
+
+    def __init__(
+        self,
+        operation: str,
+        key: Any = None,
+        doc: Optional[Dict[str, Any]] = None,
+        previous: Optional[Dict[str, Any]] = None,
+        seq: Optional[int] = None,
+        collection: Optional[str] = None,
+    ):
+        self.operation = operation
+        self.key = key
+        self.doc = doc
+        self.previous = previous
+        self.seq = seq
+        self.collection = collection
+
+    @classmethod
+    def from_dict(cls, event: Dict[str, Any], collection: Optional[str] = None) -> "ChangeEvent":
+        return cls(
+            event["operation"],
+            event.get("key"),
+            event.get("doc"),
+            event.get("previous"),
+            event.get("seq"),
+            collection,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ChangeEvent) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"ChangeEvent({self.operation}, key={self.key!r}, seq={self.seq})"
+
+
+class ChangeSubscription:
+    """
+    Bounded buffer of change events of one consumer
+    """
+
+    def __init__(self, feed: "ChangeFeed", maxsize: int):
+        self.feed = feed
+        self.maxsize = maxsize
+        self._buffer: Deque[ChangeEvent] = deque()
+        self._cond = threading.Condition()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self.closed = False
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def free(self) -> int:
+        """Number of events the buffer can take"""
+        return max(self.maxsize - len(self._buffer), 0)
+
+    def _push(self, events: List[ChangeEvent]) -> None:
+        with self._cond:
+            self._buffer.extend(events)
+            self._cond.notify_all()
+            self._wake()
+
+    def _wake(self) -> None:
+        waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[ChangeEvent]:
+        """
+        Returns the next event, waiting up to `timeout` seconds (forever if `None`).
+        Returns `None` on timeout or when the subscription is closed.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._buffer or self.closed, timeout):
+                return None
+            return self._buffer.popleft() if self._buffer else None
+
+    def events(self, timeout: Optional[float] = None) -> Iterator[ChangeEvent]:
+        """
+        Yields events as they arrive, until the subscription is closed or no event arrived for
+        `timeout` seconds (if given).
+        """
+        while True:
+            event = self.get(timeout)
+            if event is None:
+                return
+            yield event
+
+    def __iter__(self) -> Iterator[ChangeEvent]:
+        return self.events()
+
+    def __aiter__(self) -> "ChangeSubscription":
+        return self
+
+    async def __anext__(self) -> ChangeEvent:
+        while True:
+            with self._cond:
+                if self._buffer:
+                    return self._buffer.popleft()
+                if self.closed:
+                    raise StopAsyncIteration
+                loop = asyncio.get_running_loop()
+                future = loop.create_future()
+                self._waiters.append((loop, future))
+            await future
+
+    def close(self) -> None:
+        """Stop the subscription, waiting consumers get the buffered events first"""
+        self.feed._unsubscribe(self)
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+            self._wake()
+
+    def __enter__(self) -> "ChangeSubscription":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class ChangeFeed:
+    """
+    Fan-out of the collection change events to the subscriptions, with backpressure
+    """
+
+    def __init__(self, collection: Optional[str] = None, maxsize: int = DEFAULT_CHANGE_BUFFER):
+        self.collection = collection
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._subscriptions: List[ChangeSubscription] = []
+        self.published = 0
+
+    @property
+    def subscriptions(self) -> List[ChangeSubscription]:
+        return list(self._subscriptions)
+
+    def subscribe(self, maxsize: Optional[int] = None) -> ChangeSubscription:
+        """
+        Subscribe to the events published from now on, buffering up to `maxsize` of them.
+        """
+        subscription = ChangeSubscription(self, maxsize or self.maxsize)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: ChangeSubscription) -> None:
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def publish(self, events: List[ChangeEvent]) -> int:
+        """
+        Publish the events to all subscriptions. Returns the number of (leading) events
+        accepted: no more than the fullest subscription can take. Without subscriptions all
+        events are accepted (and dropped).
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            accepted = min([len(events)] + [s.free for s in subscriptions])
+            for subscription in subscriptions:
+                subscription._push(events[:accepted])
+            self.published += accepted
+        return accepted
+
+    def close(self) -> None:
+        for subscription in self.subscriptions:
+            subscription.close()
+
+
+_feeds: Dict[Tuple[Hashable, Optional[str]], ChangeFeed] = {}
+_feeds_lock = threading.Lock()
+
+
+def session_change_feed(
+    session_id: Hashable, collection: Optional[str], maxsize: int = DEFAULT_CHANGE_BUFFER
+) -> ChangeFeed:
+    """
+    Returns the (process-wide registered) change feed of the session's collection.
+    """
+    with _feeds_lock:
+        feed = _feeds.get((session_id, collection))
+        if feed is None:
+            feed = _feeds[(session_id, collection)] = ChangeFeed(collection, maxsize)
+        return feed
+
+
+def drop_change_feeds(session_id: Hashable) -> None:
+    """Close & forget change feeds of the session"""
+    with _feeds_lock:
+        feeds = [key for key in _feeds if key[0] == session_id]
+        for key in feeds:
+            _feeds.pop(key).close()
+
+
+def drop_closed_change_feeds(is_active: Callable[[Hashable], bool]) -> int:
+    """
+    Close & forget change feeds of the sessions `is_active` reports as ended, returns their
+    number (the registry has no session-end hook of its own)
+    """
+    with _feeds_lock:
+        sessions = {session_id for session_id, _ in _feeds}
+    closed = [session_id for session_id in sessions if not is_active(session_id)]
+    for session_id in closed:
+        drop_change_feeds(session_id)
+    return len(closed)
+
+
+def publish_change_events(
+    feed: ChangeFeed, envelope: Optional[Dict[str, Any]], progress: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Publish new events of the component's `change_events` envelope and returns the updated
+    progress (`instance`, `ack`: last accepted sequence number, `dropped`), passed back to the
+    component as acknowledgement.
+    """
+    if not envelope:
+        return progress
+    instance, dropped = envelope.get("instance"), envelope.get("dropped", 0)
+    events: List[ChangeEvent] = []
+    current = progress
+    if instance != progress.get("instance"):
+        if progress.get("instance") is not None:
+            events.append(ChangeEvent(RXDB_CHANGE_RESYNC, collection=feed.collection))
+        current = {"instance": instance, "ack": 0, "dropped": 0}
+    if dropped > current.get("dropped", 0):
+        events.append(ChangeEvent(RXDB_CHANGE_RESYNC, collection=feed.collection))
+    markers = len(events)
+    events.extend(
+        ChangeEvent.from_dict(event, feed.collection)
+        for event in envelope.get("events") or []
+        if event["seq"] > current["ack"]
+    )
+    if not events:
+        return current
+    accepted = feed.publish(events)
+    if accepted < markers:
+        return progress  # unchanged, so the resync markers are published again next time
+    acked = [event.seq for event in events[markers:accepted]]
+    return {
+        "instance": instance,
+        "ack": acked[-1] if acked else current["ack"],
+        "dropped": dropped,
+    }
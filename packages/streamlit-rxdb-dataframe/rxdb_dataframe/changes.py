@@ -0,0 +1,127 @@
+"""
+Incremental change-set protocol between the RxDBDataframe component and Python.
+
+In `delta` mode the component does not send the whole result set on every collection
+change. Instead it sends a change set keyed by the schema's `primaryKey`:
+
+    {
+        "type": "delta",            # or "full" for the initial snapshot / resync
+        "seq": 42,                  # monotonically increasing sequence number
+        "inserted": [...docs],
+        "updated": [...docs],
+        "deleted": [...primary keys],
+        "docs": [...docs],          # only for "full"
+    }
+
+Both sides apply the change set the same way (drop deleted rows, replace updated rows in
+place, append inserted rows), so row positions in Python and in the browser stay aligned.
+"""
+
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from .aggregates import changed_rows, update_aggregates
+from .plan import ConversionPlan
+
+RXDB_CHANGES_FULL = "full"
+RXDB_CHANGES_DELTA = "delta"
+
+
+def get_primary_key(schema: dict) -> Optional[str]:
+    """
+    Returns the primary key field name of the given JSONSchema.
+    RxDB composite primary keys (`{"key": ..., "fields": [...]}`) resolve to their `key`.
+    """
+    primary_key = schema.get("primaryKey")
+    if isinstance(primary_key, dict):
+        return primary_key.get("key")
+    return primary_key
+
+
+def _indexed(df: pd.DataFrame, primary_key: str) -> pd.DataFrame:
+    df.index = pd.Index(df[primary_key].to_numpy())
+    return df
+
+
+def changes_to_dataframe(
+    changes: Dict[str, Any], plan: ConversionPlan, primary_key: str
+) -> pd.DataFrame:
+    """
+    Build the primary-key indexed `pandas.DataFrame` from a "full" change set.
+    """
+    docs = changes.get("docs")
+    return _indexed(plan.apply([] if docs is None else docs), primary_key)
+
+
+def apply_changes(
+    df: pd.DataFrame, changes: Dict[str, Any], plan: ConversionPlan, primary_key: str
+) -> pd.DataFrame:
+    """
+    Patch the primary-key indexed `df` with the given "delta" change set.
+    Deleted rows are dropped, updated rows are replaced in place and inserted rows are appended.
+    """
+    deleted = changes.get("deleted") or []
+    updated = changes.get("updated")
+    inserted = changes.get("inserted")
+    new_frames = []
+
+    if len(deleted):
+        df = df.drop(index=deleted, errors="ignore")
+
+    if inserted is not None and len(inserted):
+        new_frames.append(_indexed(plan.apply(inserted), primary_key))
+
+    if updated is not None and len(updated):
+        updated_df = _indexed(plan.apply(updated), primary_key)
+        known = updated_df.index.isin(df.index)
+        if known.any():
+            df.loc[updated_df.index[known], updated_df.columns] = updated_df[known]
+        if not known.all():
+            # the row was never seen by Python (e.g. it was deleted and re-added) -> insert it
+            new_frames.append(updated_df[~known])
+
+    if new_frames:
+        inserted_df = pd.concat(new_frames) if len(new_frames) > 1 else new_frames[0]
+        inserted_df = inserted_df[~inserted_df.index.isin(df.index)]
+        df = inserted_df if df.empty else pd.concat([df, inserted_df])
+
+    return df
+
+
+def apply_result_changes(
+    state: Any, result: Dict[str, Any], plan: ConversionPlan, primary_key: str
+) -> pd.DataFrame:
+    """
+    Apply the change set of a `delta` mode component result to the cached dataframe of the
+    session `state` (its `dataframe`, `seq`, `resync` counter, `aggregates` & `indexes`).
+    """
+    changes = result["changes"]
+    seq = changes["seq"]
+
+    df = state.dataframe
+
+    if seq == state.seq and df is not None:
+        pass  # already applied, the rerun was triggered by something else
+    elif changes["type"] == RXDB_CHANGES_FULL:
+        df = state.dataframe = changes_to_dataframe(changes, plan, primary_key)
+        state.seq = seq
+    elif (
+        changes["type"] == RXDB_CHANGES_DELTA
+        and df is not None
+        and state.seq is not None
+        and seq == state.seq + 1
+    ):
+        removed, added_keys = changed_rows(df, changes, primary_key)
+        previous, df = df, apply_changes(df, changes, plan, primary_key)
+        state.dataframe = df
+        state.seq = seq
+        update_aggregates(state.aggregates, df, removed, added_keys)
+        if state.indexes is not None:
+            state.indexes.update(previous, df, changes, primary_key)
+    elif state.seq is not None:
+        # sequence gap or evicted snapshot -> request a full resync on the next render
+        state.seq = None
+        state.resync += 1
+
+    return df if df is not None else plan.blueprint_df
@@ -0,0 +1,1042 @@
+"""
+Streamlit binding of `rxdb_dataframe`: the component, its session state & the `rxdb_*` calls.
+
+A thin layer over the headless core (`rxdb_dataframe.core`). The component is declared on first
+render, not at import.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import warnings
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import streamlit as st
+import streamlit.components.v1 as components
+from streamlit import session_state as ss
+from streamlit.elements.lib.column_config_utils import (
+    ColumnConfig,
+    ColumnConfigMappingInput as ColumnConfigMap,
+    ColumnDataKind,
+)
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching import cache_data, cache_resource
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from . import core
+from .aggregates import AggregateSpec, MaterializedAggregate, update_aggregates
+from .arrow import RXDB_TRANSPORT_ARROW, Transport, read_arrow_result
+from .changefeed import (
+    ChangeFeed,
+    drop_closed_change_feeds,
+    publish_change_events,
+    session_change_feed,
+)
+from .changes import apply_result_changes, get_primary_key
+from .core import RxCollectionCreator
+from .edits import editor_writes
+from .flatten import flatten_schema
+from .indexes import DataFrameIndexes, schema_indexes
+from .mango import LocalQuery, compile_selector, is_narrowing, query_dataframe, query_fields
+from .metrics import CallMetrics, logger
+from .paging import LazyRxDBFrame, page_range
+from .parallel import get_parallel_converter
+from .plan import Projection, compile_schema, project_properties, schema_digest
+from .query_cache import CachePolicy, QueryResultCache, cached_query_result, query_cache_key
+from .snapshots import snapshot_key, snapshot_result
+from .seed import DEFAULT_SEED_CHUNK_SIZE, config_digest, seed_args, split_seed
+from .store import get_session_store
+from .updates import UpdatePolicy
+from .validation import SchemaValidator
+
+
+class RxDBSessionState:
+    """
+    Represents the `session_state` wrapper object for RxDBDataframe component
+
+    Collection data (`dataframe`) is not kept in `session_state`, but in the bounded,
+    process-wide `SessionDataStore` (see `configure_session_store`).
+
+    `namespace` separates the state of collections rendered by `rxdb_collections` (see
+    `get_collection_state`), the default one belongs to `rxdb_dataframe`.
+    """
+
+    def __init__(self, namespace: Optional[str] = None):
+        key = RXDB_STATE_KEY if namespace is None else f"{RXDB_STATE_KEY}:{namespace}"
+        object.__setattr__(self, "_key", key)
+        if key not in ss:
+            ss[key] = {
+                "info": {},  # collection info
+                "with_rev": False,  # include revision in the result
+                "query": {"selector": {}, "sort": []},  # collection query
+                "column_config": None,  # ColumnConfig
+                "plan": None,  # ConversionPlan of the cached dataframe
+                "seq": None,  # last applied change set sequence number (`delta` mode)
+                "resync": 0,  # full resync requests counter (`delta` mode)
+                "paging": {},  # page cache bookkeeping (paging mode)
+                "editor": {},  # data editor write-back bookkeeping
+                "metrics": {},  # instrumentation of the last call
+                "config_hash": None,  # hash of the static config the component initialized with
+                "seed": {},  # seeding progress reported by the component
+                "change_feed": {},  # change feed progress: component instance & last ack
+                "aggregates": {},  # MaterializedAggregate by name
+                "indexes": None,  # DataFrameIndexes of the cached dataframe
+                "version": None,  # version of the held result (`rxdb_collections`)
+                "stale": False,  # the result is a persisted snapshot, live data not arrived yet
+                "snapshot": None,  # key of the stale snapshot held in the session store
+                "updates": {},  # update coalescing counters reported by the component
+                "protocol": RXDB_PROTOCOL_VERSION,  # protocol version reported by the component
+            }
+        if RXDB_COLLECTION_EDITOR_KEY not in st.session_state:
+            pass
+            ss[RXDB_COLLECTION_EDITOR_KEY] = {}
+
+    @property
+    def dataframe(self) -> Optional[pd.DataFrame]:
+        """Cached collection dataframe (reloaded from disk, if it was evicted)"""
+        return get_session_store().get(_get_session_id(), self._key)
+
+    @dataframe.setter
+    def dataframe(self, df: Optional[pd.DataFrame]):
+        if df is None:
+            get_session_store().drop(_get_session_id(), self._key)
+        else:
+            get_session_store().put(_get_session_id(), self._key, df)
+
+    @property
+    def query_cache(self) -> QueryResultCache:
+        """Per-session LRU cache of query results"""
+        cache = ss[self._key].get("query_cache")
+        if cache is None:
+            cache = QueryResultCache(session_id=_get_session_id(), namespace=self._key)
+            ss[self._key]["query_cache"] = cache
+        return cache
+
+    @property
+    def query_cache_stats(self) -> Dict[str, int]:
+        """Query result cache hits, misses, entries & bytes"""
+        return self.query_cache.stats()
+
+    @property
+    def docs(self) -> List[Dict[str, Any]]:
+        """
+        Deprecated, use `dataframe`: the raw documents are no longer kept in the session, they
+        are encoded back into RxDB JSON documents from the cached dataframe on every access
+        """
+        warnings.warn(
+            "RxDBSessionState.docs is deprecated, use RxDBSessionState.dataframe",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        df, plan = self.dataframe, self.plan
+        if df is None:
+            return []
+        return plan.encode(df) if plan is not None else df.to_dict("records")
+
+    @docs.setter
+    def docs(self, docs: List[Dict[str, Any]]):
+        warnings.warn(
+            "RxDBSessionState.docs is deprecated, use RxDBSessionState.dataframe",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        plan = self.plan
+        self.dataframe = plan.apply(docs) if plan is not None else pd.DataFrame(docs)
+
+    def __getattr__(self, key):
+        if key not in ss[self._key]:
+            ss[self._key][key] = {}
+        return ss[self._key][key]
+
+    def __getitem__(self, key):
+        if key not in ss[self._key]:
+            ss[self._key][key] = {}
+        return ss[self._key][key]
+
+    def __setattr__(self, key, value):
+        if isinstance(getattr(type(self), key, None), property):
+            object.__setattr__(self, key, value)
+        else:
+            ss[self._key][key] = value
+
+    def __setitem__(self, key, value):
+        ss[self._key][key] = value
+
+
+def _get_session_id() -> str:
+    """
+    Returns id of the current Streamlit session (or "default" when running in bare mode)
+    """
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else "default"
+
+
+def get_change_feed(
+    collection_name: Optional[str], session_id: Optional[str] = None
+) -> ChangeFeed:
+    """
+    Returns the change feed of the collection rendered with `change_feed=True` in the (current)
+    session. Subscribe in the script and pass the subscription to the consuming thread or task.
+    """
+    return session_change_feed(session_id or _get_session_id(), collection_name)
+
+
+def get_collection_state(
+    collection_name: str, key: Optional[str] = None
+) -> RxDBSessionState:
+    """
+    Returns the session state of the collection rendered by the `rxdb_collections` component
+    instance of the given `key`.
+    """
+    return RxDBSessionState(f"{key or RXDB_COLLECTIONS_KEY}/{collection_name}")
+
+
+# Create a _RELEASE constant. We'll set this to False while we're developing
+# the component, and True when we're ready to package and distribute it.
+_RELEASE = True
+
+_component_func: Optional[Callable[..., Any]] = None
+_component_lock = threading.Lock()
+
+
+def _declare_component() -> Callable[..., Any]:
+    """
+    Declares the component on first render instead of at import, so importing the package has
+    no side effects
+    """
+    global _component_func
+    with _component_lock:
+        if _component_func is None:
+            if not _RELEASE:  # NOSONAR
+                _component_func = components.declare_component(
+                    "rxdb_dataframe",
+                    url="http://localhost:4201",
+                )
+            else:
+                parent_dir = os.path.dirname(os.path.abspath(__file__))
+                dist = os.path.join(parent_dir, "frontend/build")
+                index_js_path = os.path.join(dist, "index.js")
+
+                if not os.path.exists(index_js_path):
+                    logger.warning(
+                        "RxDBDataframe component build is missing: %s, build it with "
+                        "`npx nx run streamlit-rxdb-dataframe-frontend:build`",
+                        index_js_path,
+                    )
+
+                _component_func = components.declare_component("rxdb_dataframe", path=dist)
+        return _component_func
+
+
+def _rxdb_dataframe(**kwargs) -> Any:
+    return _declare_component()(**kwargs)
+
+
+RXDB_STATE_KEY = "rxdb"
+# version of the args & values protocol, bumped with the frontend's `RXDB_PROTOCOL_VERSION`
+RXDB_PROTOCOL_VERSION = 1
+RXDB_COLLECTION_KEY = "rxdb_collection"
+RXDB_COLLECTION_EDITOR_KEY = "rxdb_collection_editor"
+RXDB_COLLECTIONS_KEY = "rxdb_collections"
+DEFAULT_DB_CONFIG = {
+    "name": "streamlit-rxdb",
+    "options": {"storageType": "dexie"},
+    "multiInstance": False,
+    "ignoreDuplicate": True,
+}
+
+# blueprint_df: pd.DataFrame = None
+
+
+get_dataframe_by_schema = cache_data(core.get_dataframe_by_schema)
+
+
+@cache_data
+def get_column_config(schema: dict) -> ColumnConfigMap:
+    """
+    Generates a (default) column configuration dictionary based on the given schema,
+    which can be used to configure streamlit dataframe or data_editor widgets.
+    Use own column config if default one is not suitable for your use case.
+
+    INFO: https://docs.streamlit.io/library/api-reference/data/st.column_config
+    """
+    properties = schema.get("properties", {})
+    column_config: ColumnConfigMap = {}
+    for key, prop in properties.items():
+        if prop.get("enum") and len(prop["enum"]) > 0:
+            column_config[key] = st.column_config.SelectboxColumn(options=prop["enum"])
+        elif prop["type"] == ColumnDataKind.STRING and prop.get("format") == "date-time":
+            column_config[key] = st.column_config.DatetimeColumn(
+                format="YYYY-MM-DD HH:mm",
+            )
+        elif prop["type"] == ColumnDataKind.STRING:
+            column_config[key] = st.column_config.TextColumn(max_chars=prop.get("maxLength", None))
+        elif prop["type"] == ColumnDataKind.BOOLEAN:
+            column_config[key] = st.column_config.CheckboxColumn()
+        elif prop["type"] == "object":
+            column_config[key] = st.column_config.Column()
+        elif prop["type"] == "array":
+            column_config[key] = st.column_config.ListColumn()
+        elif prop["type"] == ColumnDataKind.INTEGER and prop.get("format", None) == "time":
+            column_config[key] = st.column_config.DatetimeColumn(
+                format="YYYY-MM-DD HH:mm",
+            )  # epoch milliseconds are converted to datetime by the conversion plan
+        elif prop["type"] == ColumnDataKind.INTEGER:
+            column_config[key] = st.column_config.NumberColumn(
+                max_value=prop.get("max", None),
+                min_value=prop.get("min", None),
+                step=prop.get("multipleOf", None),
+            )
+        elif prop["type"] == "number":
+            column_config[key] = st.column_config.NumberColumn(
+                max_value=prop.get("max", None), min_value=prop.get("min", None)
+            )
+        try:
+            column: ColumnConfig = column_config[key]
+            column["label"] = prop.get("title", "")
+            column_type = (column.get("type_config") or {}).get("type", prop["type"])
+            column["help"] = "format: " + prop.get("format", column_type)
+            # column["disabled"] = prop.get("readOnly", False)
+            column["required"] = key in schema.get("required", [])
+        except Exception:
+            logger.warning("No column config for %r property", key, exc_info=True)
+
+    return column_config
+
+
+class SchemaArtifacts:
+    """
+    Schema-derived artifacts shared by all sessions using the same collection schema:
+    conversion plan (blueprint dtypes), primary key, default column config, index fields &
+    row validator, built for the projected `columns` (and the primary key) only, if given
+    """
+
+    def __init__(
+        self,
+        collection_name: Optional[str],
+        schema: dict,
+        schema_hash: str,
+        flatten: bool = False,
+        columns: Optional[Sequence[str]] = None,
+    ):
+        self.collection_name = collection_name
+        self.version = schema.get("version")
+        self.schema_hash = schema_hash
+        self.primary_key = get_primary_key(schema)
+        self.columns = _projection(columns, self.primary_key)
+        self.plan = compile_schema(schema, schema_hash, flatten, self.columns)
+        columns_schema = flatten_schema(schema) if flatten else schema
+        self.indexes = schema_indexes(schema, self.primary_key)
+        if self.columns is not None:
+            properties = project_properties(columns_schema.get("properties", {}), self.columns)
+            required = [
+                field for field in columns_schema.get("required", []) if field in self.columns
+            ]
+            columns_schema = {**columns_schema, "properties": properties, "required": required}
+            self.indexes = [fields for fields in self.indexes if set(fields) <= set(properties)]
+        self.column_config = get_column_config(columns_schema)
+        self.validator = SchemaValidator(columns_schema)
+
+    @property
+    def dtypes(self) -> Dict[str, Any]:
+        return self.plan.dtypes
+
+
+@cache_resource(show_spinner=False)
+def get_schema_artifacts(
+    collection_name: Optional[str],
+    schema_version: Any,
+    schema_hash: str,
+    _schema: dict,
+    flatten: bool = False,
+    columns: Optional[Tuple[str, ...]] = None,
+) -> SchemaArtifacts:
+    """
+    Returns process-wide `SchemaArtifacts`, built once per collection name, schema `version`
+    and schema hash (and flattening mode & column projection). Sessions only hold references
+    to them.
+    """
+    return SchemaArtifacts(collection_name, _schema, schema_hash, flatten, columns)
+
+
+def _schema_artifacts(
+    collection_config,
+    schema_hash: Optional[str] = None,
+    flatten: bool = False,
+    columns: Optional[Sequence[str]] = None,
+) -> SchemaArtifacts:
+    schema = collection_config["schema"]
+    return get_schema_artifacts(
+        collection_config.get("name"),
+        schema.get("version"),
+        schema_hash or schema_digest(schema),
+        schema,
+        flatten,
+        tuple(columns) if columns is not None else None,
+    )
+
+
+def _projection(
+    columns: Optional[Sequence[str]], primary_key: str
+) -> Optional[Tuple[str, ...]]:
+    """Projected columns, always with the primary key (edits are keyed by it)"""
+    if columns is None:
+        return None
+    return tuple(dict.fromkeys([primary_key, *columns]))
+
+
+def _is_projected(query: Optional[Dict[str, Any]], columns: Optional[Tuple[str, ...]]) -> bool:
+    """`True` if the query refers to projected columns only (or there is no projection)"""
+    if columns is None:
+        return True
+    return all(
+        field in columns or field.split(".")[0] in columns for field in query_fields(query)
+    )
+
+
+def rxdb_dataframe(
+    collection_config,
+    db_config: RxCollectionCreator = DEFAULT_DB_CONFIG,
+    query: Optional[Dict[str, Any]] = None,
+    with_rev: Optional[bool] = False,
+    on_change: Optional[Callable] = None,
+    transport: Optional[Transport] = None,
+    projection: Optional[Projection] = None,
+    cache: Optional[CachePolicy] = None,
+    local_query: Optional[LocalQuery] = None,
+    update_policy: Optional[UpdatePolicy] = None,
+    change_feed: Optional[bool] = False,
+    aggregates: Optional[Dict[str, AggregateSpec]] = None,
+    schema_hash: Optional[str] = None,
+    write_debounce: int = 300,
+    seed_chunk_size: int = DEFAULT_SEED_CHUNK_SIZE,
+) -> pd.DataFrame:
+    """
+    Render the RxDB collection component and return its documents as `pandas.DataFrame`.
+
+    `transport` (see `Transport`) chooses how results cross the iframe boundary. With
+    `Transport(delta=True)` the component only sends inserted, updated & deleted documents
+    (keyed by the schema's `primaryKey`) and the cached session dataframe is patched in place.
+    A full resync is requested only when a gap in the change set sequence is detected. With
+    `Transport("arrow")` the documents are sent as Arrow IPC stream and the resulting
+    dataframe columns are backed by pyarrow (requires `pyarrow`).
+
+    Documents are converted by the schema conversion plan, compiled once per process for the
+    collection name, schema `version` & `schema_hash` (e.g. `schemaHash` of the collection
+    dump) or stable digest of the schema, see `get_schema_artifacts`.
+
+    `projection` (see `Projection`) shapes the result. With `flatten=True` nested object
+    properties become typed columns named by their dotted path (e.g. `address.city`) and typed
+    arrays list-typed Arrow columns (requires `pyarrow`), see `child_frame` to explode them.
+    `columns` projects the result onto the given columns: the component strips all other fields
+    before encoding, only the primary key is always kept (edits are keyed by it). The
+    blueprint, column config, validator & secondary indexes are built for the projected columns
+    only.
+
+    `local_query` (see `LocalQuery`) evaluates a query narrowing the one the component is
+    already subscribed to (same selector conditions plus more, other sort, skip/limit) in
+    Python over the cached dataframe, without a browser round trip. Queries using unsupported
+    operators fall back to RxDB. With `secondary_indexes=True` the schema's `indexes` &
+    `internalIndexes` are maintained over the cached dataframe (`RxDBSessionState().indexes`,
+    patched with change sets in `delta` mode) and used for equality & range predicates and
+    sorting.
+
+    `cache` (see `CachePolicy`) controls result caching. With `query_results=True` (default,
+    except for `delta` mode) results are kept in a per-session LRU cache keyed by the
+    collection name, normalized query & `with_rev` (see `RxDBSessionState.query_cache`):
+    switching back to a cached query returns its frame at once and the component only confirms
+    it, instead of re-sending the documents. Any collection change invalidates the cache.
+    With `snapshot=True` the last live result is persisted per collection name, schema hash,
+    query & `with_rev` on the server (see `rxdb_dataframe.snapshots`): a new session returns
+    that snapshot at once, with `RxDBSessionState().stale` set until the live result arrives.
+    Snapshots are shared by all sessions, pass a scope instead (`snapshot=user_id`) when the
+    users' browser databases hold different data.
+
+    `update_policy` (see `UpdatePolicy`) coalesces bursts of collection changes into fewer
+    reruns: a minimum interval between updates with a trailing flush, a maximum batch of
+    pending changes and a pause while the data editor is in use. The component's counters of
+    merged & suppressed updates are available as `RxDBSessionState().updates`.
+
+    With `change_feed=True` the component forwards the collection's insert, update & delete
+    events (with the document & its primary key), which are published to the session's
+    `get_change_feed(collection_name)` subscribers, see `rxdb_dataframe.changefeed`.
+
+    `aggregates` (name -> `AggregateSpec`) are materialized over the collection dataframe and
+    kept in the session state (`RxDBSessionState().aggregates[name].result()`). In `delta` mode
+    they are updated from the changed rows only, otherwise recomputed when the data changes.
+
+    Edits of the `st.data_editor` keyed `RXDB_COLLECTION_EDITOR_KEY` are diffed against the
+    returned dataframe into a minimal primary key based write set. The component coalesces
+    write sets arriving within `write_debounce` milliseconds into one bulk write. Edited & added
+    rows violating the schema (`required`, `minLength`, `maxLength`, `enum`, `minimum`,
+    `maximum`, `pattern`) are not written; their errors are kept as
+    `RxDBSessionState().editor["rejected"]` (by primary key, then field).
+
+    The static config (`collection_config` without `options.initialDocs` & `db_config`) is
+    content-hashed and sent only until the component initialized with it. Seed documents
+    (`initialDocs`) are sent only if the collection is empty, in chunks of `seed_chunk_size`
+    documents; the progress is available as `RxDBSessionState().seed`. Use `load_dump` to load
+    them with a streaming parser.
+
+    Every call is instrumented: per-stage wall time, payload bytes (for JSON transport only
+    with `measure_payload=True`, as it costs another serialization in the browser), result
+    size, query cache hits and the component's query & encode timings are available as
+    `RxDBSessionState().metrics`, passed to the callbacks registered by `add_metrics_callback`
+    and logged by the `rxdb_dataframe` logger (`DEBUG` level).
+
+    With `configure_parallel_conversion(threshold=...)` results of at least `threshold`
+    documents are converted in parallel chunks; the timings of the chunks are part of the
+    metrics.
+    """
+    transport = transport or Transport()
+    projection = projection or Projection()
+    cache_policy = cache or CachePolicy()
+    local_query = local_query or LocalQuery(narrowing=False)
+    delta = transport.delta
+    state = RxDBSessionState()
+    metrics = CallMetrics("rxdb_dataframe", collection_config.get("name"))
+    _sync_aggregates(state, aggregates)
+
+    with metrics.stage("prepare"):
+        artifacts = _schema_artifacts(
+            collection_config, schema_hash, projection.flatten, projection.columns
+        )
+        plan = state.plan = artifacts.plan
+        result_df = plan.blueprint_df
+        state.column_config = artifacts.column_config
+        _sync_indexes(state, artifacts.indexes if local_query.secondary_indexes else None)
+
+        remote_query, local = query, None
+        if (
+            local_query.narrowing
+            and state.dataframe is not None
+            and is_narrowing(query, state.query)
+            and _is_projected(query, artifacts.columns)
+        ):
+            try:
+                compile_selector((query or {}).get("selector"))
+                remote_query, local = state.query, query
+            except NotImplementedError:
+                pass
+
+        cache = state.query_cache if cache_policy.query_results and not delta else None
+        cache_key = query_cache_key(
+            collection_config.get("name"), remote_query, with_rev, artifacts.columns
+        )
+        cache_stats = cache.stats() if cache is not None else None
+        writes = _editor_writes(state, artifacts)
+        static_args = _static_args(state, collection_config, db_config, seed_chunk_size)
+
+    with metrics.stage("component"):
+        result = _rxdb_dataframe(
+            **static_args,
+            query=remote_query,
+            with_rev=with_rev,
+            **transport.to_args(),
+            resync=state.resync if delta else 0,
+            cached_version=cache.version if cache is not None and cache_key in cache else None,
+            writes=writes,
+            write_debounce=write_debounce,
+            change_feed=state.change_feed if change_feed else None,
+            update_policy=(
+                update_policy.to_args(state.editor.get("edited_at")) if update_policy else None
+            ),
+            columns=list(artifacts.columns) if artifacts.columns is not None else None,
+            key=(RXDB_COLLECTION_KEY),
+        )
+
+    try:
+        if _control_message(state, result):
+            result = None
+        if result and transport.encoding == RXDB_TRANSPORT_ARROW and not isinstance(result, dict):
+            metrics.payload_bytes = len(result)
+            with metrics.stage("decode"):
+                result = read_arrow_result(result, collection_config["schema"])
+            _check_protocol(state, result)
+        if result and change_feed:
+            with metrics.stage("change_feed"):
+                _publish_changes(state, result, collection_config.get("name"))
+        with metrics.stage("convert"):
+            if result and delta:
+                result_df = apply_result_changes(state, result, plan, artifacts.primary_key)
+            elif result and cache is not None:
+                result_df = cached_query_result(
+                    state,
+                    cache,
+                    cache_key,
+                    result,
+                    plan,
+                    collection_config.get("name"),
+                    with_rev,
+                    metrics.chunks,
+                )
+            elif result:
+                result_df = get_parallel_converter().convert(plan, result["docs"], metrics.chunks)
+                state.dataframe = result_df
+        if state.aggregates and state.dataframe is not None:
+            with metrics.stage("aggregates"):
+                update_aggregates(state.aggregates, state.dataframe)
+        if state.indexes is not None and state.dataframe is not None:
+            with metrics.stage("indexes"):
+                state.indexes.refresh(state.dataframe)
+        if result:
+            timings = result.get("timings") or {}
+            metrics.frontend = timings
+            if result.get("updates") is not None:
+                state.updates = metrics.updates = result["updates"]
+            if metrics.payload_bytes is None:
+                metrics.payload_bytes = timings.get("payload_bytes")
+            state.info = result["info"]
+            state.query = result["query"]  # store query here from response, to prevent re-rendering
+            if on_change:
+                with metrics.stage("on_change"):
+                    on_change(state)
+        elif state.dataframe is not None:
+            result_df = state.dataframe
+        if cache_policy.snapshot:
+            with metrics.stage("snapshot"):
+                key = functools.partial(
+                    snapshot_key,
+                    artifacts.collection_name,
+                    artifacts.schema_hash,
+                    with_rev=with_rev,
+                    flatten=projection.flatten,
+                    columns=artifacts.columns,
+                    scope=cache_policy.snapshot_scope,
+                )
+                result_df = snapshot_result(
+                    state, result_df, _get_session_id(), remote_query, key
+                )
+        if local is not None:
+            with metrics.stage("local_query"):
+                indexes = state.indexes
+                if indexes is None or not indexes.indexes_frame(result_df):
+                    indexes = None
+                result_df = query_dataframe(result_df, local, artifacts.primary_key, indexes)
+        with metrics.stage("editor"):
+            _track_editor_rows(state, result_df, artifacts.primary_key)
+    except Exception as e:
+        metrics.error = str(e)
+        logger.exception("Failed to process RxDBDataframe component result")
+
+    if cache_stats is not None:
+        metrics.cache_hits = cache.hits - cache_stats["hits"]
+        metrics.cache_misses = cache.misses - cache_stats["misses"]
+    state.metrics = metrics.finish(result_df)
+    return result_df
+
+
+def _static_args(
+    state: RxDBSessionState,
+    collection_config: Dict[str, Any],
+    db_config: Dict[str, Any],
+    seed_chunk_size: int,
+) -> Dict[str, Any]:
+    """
+    Component args of the static config: the configs are sent only until the component reports
+    it initialized with the same content hash, seed docs only in chunks it asked for.
+    """
+    # the component value is available before the call, the answer is due in this very rerun
+    _control_message(state, ss.get(RXDB_COLLECTION_KEY))
+    static_config, seed_docs = split_seed(collection_config)
+    config_hash = config_digest(static_config, db_config)
+    send = state.config_hash != config_hash
+    return {
+        "collection_config": static_config if send else None,
+        "db_config": db_config if send else None,
+        "config_hash": config_hash,
+        "seed": seed_args(seed_docs, state.seed, seed_chunk_size),
+    }
+
+
+def _control_message(state: RxDBSessionState, result: Any) -> bool:
+    """
+    Handle the component's control message: the hash of the config it initialized with (`None`
+    when it needs the config) & seeding progress. Returns `True` for control messages.
+    """
+    _check_protocol(state, result)
+    if not isinstance(result, dict) or "config_hash" not in result:
+        return False
+    state.config_hash = result["config_hash"]
+    if result.get("seed"):
+        state.seed = result["seed"]
+        logger.debug("Seeding progress: %s", result["seed"])
+    return True
+
+
+_feeds_swept = 0.0
+CHANGE_FEED_SWEEP_INTERVAL = 60.0  # seconds
+
+
+def _drop_closed_change_feeds() -> None:
+    """Close the change feeds of ended sessions (at most every sweep interval)"""
+    global _feeds_swept
+    now = time.monotonic()
+    if now - _feeds_swept < CHANGE_FEED_SWEEP_INTERVAL or not Runtime.exists():
+        return
+    _feeds_swept = now
+    drop_closed_change_feeds(Runtime.instance().is_active_session)
+
+
+def _check_protocol(state: RxDBSessionState, value: Any) -> None:
+    """
+    Log an error (once per reported version) when the component value comes from a frontend
+    build made for another protocol version, e.g. a stale bundle: it would ignore the args it
+    does not know, never ask for the seed documents & drop edits.
+    """
+    if not isinstance(value, dict):
+        return  # Arrow payloads are checked once decoded
+    protocol = value.get("protocol")
+    if protocol != state.protocol and protocol != RXDB_PROTOCOL_VERSION:
+        logger.error(
+            "RxDBDataframe frontend speaks protocol %s, expected %s: rebuild the frontend "
+            "with `npx nx run streamlit-rxdb-dataframe-frontend:build`",
+            protocol,
+            RXDB_PROTOCOL_VERSION,
+        )
+    state.protocol = protocol
+
+
+def _publish_changes(state: RxDBSessionState, result: dict, collection_name: Optional[str]):
+    """
+    Publish change events forwarded by the component, the acknowledgement goes out with the
+    next rerun's args.
+    """
+    _drop_closed_change_feeds()
+    feed = get_change_feed(collection_name)
+    state.change_feed = publish_change_events(
+        feed, result.get("change_events"), state.change_feed
+    )
+
+
+def _sync_aggregates(
+    state: RxDBSessionState, specs: Optional[Dict[str, AggregateSpec]]
+) -> None:
+    """Materialize new (or changed) aggregate specs, forget the ones no longer declared"""
+    specs = specs or {}
+    materialized = state.aggregates
+    for name in [name for name in materialized if name not in specs]:
+        del materialized[name]
+    for name, spec in specs.items():
+        if name not in materialized or materialized[name].spec != spec:
+            materialized[name] = MaterializedAggregate(spec)
+
+
+def _sync_indexes(state: RxDBSessionState, fields: Optional[List[Tuple[str, ...]]]) -> None:
+    """Create (or drop) the session's secondary indexes of the given fields"""
+    if fields is None:
+        state.indexes = None
+    elif state.indexes is None or list(state.indexes.fields) != fields:
+        state.indexes = DataFrameIndexes(fields)
+
+
+def _editor_store_key():
+    return (RXDB_STATE_KEY, "editor")
+
+
+def _editor_writes(
+    state: RxDBSessionState, artifacts: SchemaArtifacts
+) -> Optional[Dict[str, Any]]:
+    """Returns the write set of the session's data editor edits, see `editor_writes`"""
+    return editor_writes(
+        state.editor,
+        ss.get(RXDB_COLLECTION_EDITOR_KEY) or {},
+        state.dataframe,
+        lambda: get_session_store().get(_get_session_id(), _editor_store_key()),
+        artifacts.plan,
+        artifacts.primary_key,
+        artifacts.validator,
+    )
+
+
+def _track_editor_rows(state: RxDBSessionState, df: pd.DataFrame, primary_key: str):
+    """
+    Remember primary keys of the returned rows, to resolve positional data editor edits.
+    New rows start a new editing session (keys of added rows are not reused).
+    """
+    if primary_key not in df.columns:
+        return
+    store = get_session_store()
+    keys = df[[primary_key]].reset_index(drop=True)
+    shown = store.get(_get_session_id(), _editor_store_key())
+    if shown is not None and shown[primary_key].equals(keys[primary_key]):
+        return
+    store.put(_get_session_id(), _editor_store_key(), keys)
+    state.editor["added"] = []
+
+
+def rxdb_lazy_dataframe(
+    collection_config,
+    db_config: RxCollectionCreator = DEFAULT_DB_CONFIG,
+    query: Optional[Dict[str, Any]] = None,
+    page_size: int = 100,
+    window: Optional[Tuple[int, int]] = None,
+    with_rev: Optional[bool] = False,
+    on_change: Optional[Callable] = None,
+    schema_hash: Optional[str] = None,
+    flatten: Optional[bool] = False,
+    seed_chunk_size: int = DEFAULT_SEED_CHUNK_SIZE,
+    change_feed: Optional[bool] = False,
+) -> LazyRxDBFrame:
+    """
+    Render the RxDB collection component in paging mode and return a lazy, page-cached frame.
+
+    Only requested pages cross the iframe boundary (`skip`/`limit` are pushed down to the
+    RxDB query) and the total is reported by an RxDB count query, so first-paint latency does
+    not depend on the collection size. Rows of `window` (defaults to the first page) are
+    prefetched. Other pages are requested on first access: the script is rerun (`st.rerun`) to
+    pass the request to the component, which answers it at once, and `page()` returns `None`
+    until the page arrived. Cached pages are dropped when the query or the collection changes.
+
+    With `change_feed=True` the collection's change events are published to the session's
+    `get_change_feed(collection_name)`, see `rxdb_dataframe`.
+    """
+    state = RxDBSessionState()
+    metrics = CallMetrics("rxdb_lazy_dataframe", collection_config.get("name"))
+
+    with metrics.stage("prepare"):
+        artifacts = _schema_artifacts(collection_config, schema_hash, flatten)
+        plan = artifacts.plan
+        state.column_config = artifacts.column_config
+
+        paging = state.paging
+        query_key = _query_key(query)
+        if paging.get("query") != query_key or paging.get("page_size") != page_size:
+            _drop_pages(paging)
+            paging.update(query=query_key, page_size=page_size, version=None, count=None)
+            paging.update(pages=[], requested=[])
+
+        window = window or (0, page_size)
+        requested = set(paging["requested"]) | set(page_range(*window, page_size))
+        requested -= set(paging["pages"])
+        static_args = _static_args(state, collection_config, db_config, seed_chunk_size)
+
+    with metrics.stage("component"):
+        result = _rxdb_dataframe(
+            **static_args,
+            query=query,
+            with_rev=with_rev,
+            page_size=page_size,
+            pages=sorted(requested),
+            change_feed=state.change_feed if change_feed else None,
+            key=(RXDB_COLLECTION_KEY),
+        )
+
+    try:
+        if _control_message(state, result):
+            result = None
+        if result and change_feed:
+            with metrics.stage("change_feed"):
+                _publish_changes(state, result, collection_config.get("name"))
+        if result and _query_key(result["query"]) == query_key:
+            metrics.frontend = result.get("timings") or {}
+            with metrics.stage("convert"):
+                if result["version"] != paging["version"]:
+                    _drop_pages(paging)
+                    paging["version"] = result["version"]
+                for index, docs in result["pages"].items():
+                    _put_page(paging, int(index), plan.apply(docs))
+            paging["count"] = result["count"]
+            paging["requested"] = sorted(requested - set(paging["pages"]))
+            state.info = result["info"]
+            state.query = result["query"]
+            if on_change:
+                with metrics.stage("on_change"):
+                    on_change(state)
+    except Exception as e:
+        metrics.error = str(e)
+        logger.exception("Failed to process RxDBDataframe component result")
+
+    metrics.rows, metrics.columns = paging["count"], len(plan.columns)
+    state.metrics = metrics.finish()
+
+    def request_pages(indexes: Iterable[int]):
+        # the pending requests went out with this run's args, new ones need another run
+        new = set(indexes) - set(paging["requested"])
+        paging["requested"] = sorted(set(paging["requested"]) | new)
+        if new:
+            _request_rerun()
+
+    return LazyRxDBFrame(
+        plan, page_size, paging["count"], lambda index: _get_page(paging, index), request_pages
+    )
+
+
+def _request_rerun() -> None:
+    """Rerun the script (not in bare mode), e.g. to pass new page requests to the component"""
+    if get_script_run_ctx() is not None:
+        st.rerun()
+
+
+def _query_key(query: Optional[Dict[str, Any]]) -> str:
+    return json.dumps(query or {}, sort_keys=True, default=str)
+
+
+def _page_store_key(index: int):
+    return (RXDB_STATE_KEY, "page", index)
+
+
+def _get_page(paging: dict, index: int) -> Optional[pd.DataFrame]:
+    if index not in paging["pages"]:
+        return None
+    df = get_session_store().get(_get_session_id(), _page_store_key(index))
+    if df is None:
+        paging["pages"].remove(index)  # evicted -> will be requested again
+    return df
+
+
+def _put_page(paging: dict, index: int, df: pd.DataFrame):
+    if index in paging["pages"]:
+        return
+    df.index = pd.RangeIndex(index * paging["page_size"], index * paging["page_size"] + len(df))
+    get_session_store().put(_get_session_id(), _page_store_key(index), df)
+    paging["pages"].append(index)
+
+
+def _drop_pages(paging: dict):
+    for index in paging.get("pages", []):
+        get_session_store().drop(_get_session_id(), _page_store_key(index))
+    paging["pages"] = []
+
+
+def rxdb_collections(
+    collection_configs: List[Dict[str, Any]],
+    db_config: RxCollectionCreator = DEFAULT_DB_CONFIG,
+    queries: Optional[Dict[str, Dict[str, Any]]] = None,
+    with_rev: Optional[bool] = False,
+    on_change: Optional[Callable] = None,
+    flatten: Optional[bool] = False,
+    seed_chunk_size: int = DEFAULT_SEED_CHUNK_SIZE,
+    key: str = RXDB_COLLECTIONS_KEY,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Render several RxDB collections of one database in a single component instance and return
+    their documents as `pandas.DataFrame`s by collection name.
+
+    The database is initialized once and every collection is queried with its own query
+    (`queries` by collection name, all documents by default). The component sends the results
+    of all collections as one batched value per change: changes arriving together are
+    coalesced, and only the results Python does not hold yet carry documents, so a change of one
+    collection costs the transfer & conversion of that one only.
+
+    The session state of every collection is namespaced, see `get_collection_state(name, key)`;
+    `on_change` is called with the state of each collection whose result changed. Static config
+    & seed documents are handled like in `rxdb_dataframe`. Render more instances with distinct
+    `key`s. Only the JSON transport is supported.
+    """
+    state = RxDBSessionState(key)
+    configs = {config["name"]: config for config in collection_configs}
+    states = {name: get_collection_state(name, key) for name in configs}
+    metrics = CallMetrics("rxdb_collections", ",".join(configs))
+
+    with metrics.stage("prepare"):
+        artifacts = {
+            name: _schema_artifacts(config, flatten=flatten) for name, config in configs.items()
+        }
+        for name, collection_state in states.items():
+            collection_state.column_config = artifacts[name].column_config
+            collection_state.plan = artifacts[name].plan
+        static_args = _collections_static_args(state, configs, db_config, seed_chunk_size, key)
+
+    def process(value: Any):
+        if not isinstance(value, dict) or _control_message(state, value):
+            return
+        with metrics.stage("convert"):
+            changed = _collection_results(states, artifacts, value.get("results") or {})
+        if on_change:
+            with metrics.stage("on_change"):
+                for name in changed:
+                    on_change(states[name])
+
+    # the batched value is available before the call, so the held versions sent with this very
+    # rerun already include it (and the component does not re-send the documents)
+    value = ss.get(key)
+    try:
+        process(value)
+        with metrics.stage("component"):
+            result = _rxdb_dataframe(
+                **static_args,
+                collections=list(configs),
+                queries={name: (queries or {}).get(name) or {} for name in configs},
+                with_rev=with_rev,
+                held=_held_versions(states),
+                key=key,
+            )
+        if result is not value:
+            process(result)
+    except Exception as e:
+        metrics.error = str(e)
+        logger.exception("Failed to process RxDBCollections component result")
+
+    frames = {}
+    for name, collection_state in states.items():
+        df = collection_state.dataframe
+        frames[name] = df if df is not None else artifacts[name].plan.blueprint_df
+    metrics.rows = sum(len(df) for df in frames.values())
+    metrics.columns = sum(len(df.columns) for df in frames.values())
+    state.metrics = metrics.finish()
+    return frames
+
+
+def _collections_static_args(
+    state: RxDBSessionState,
+    configs: Dict[str, Dict[str, Any]],
+    db_config: Dict[str, Any],
+    seed_chunk_size: int,
+    key: str,
+) -> Dict[str, Any]:
+    """
+    Component args of the static config of `rxdb_collections`: one content hash over all
+    collection configs & the db config, seed docs chunks by collection name.
+    """
+    _control_message(state, ss.get(key))
+    static_configs, seeds = {}, {}
+    for name, config in configs.items():
+        static_configs[name], docs = split_seed(config)
+        seeds[name] = seed_args(docs, state.seed.get(name) or {}, seed_chunk_size)
+    config_hash = config_digest(static_configs, db_config)
+    send = state.config_hash != config_hash
+    return {
+        "collection_configs": static_configs if send else None,
+        "db_config": db_config if send else None,
+        "config_hash": config_hash,
+        "seed": seeds,
+    }
+
+
+def _collection_results(
+    states: Dict[str, RxDBSessionState],
+    artifacts: Dict[str, SchemaArtifacts],
+    results: Dict[str, Dict[str, Any]],
+) -> List[str]:
+    """
+    Convert the collection results of a batched value, which carry documents of a version not
+    held yet. Returns names of the changed collections.
+    """
+    changed = []
+    for name, result in results.items():
+        collection_state = states.get(name)
+        if collection_state is None or "docs" not in result:
+            continue
+        if result["version"] == collection_state.version and collection_state.dataframe is not None:
+            continue
+        converter = get_parallel_converter()
+        collection_state.dataframe = converter.convert(artifacts[name].plan, result["docs"])
+        collection_state.version = result["version"]
+        collection_state.info = result["info"]
+        collection_state.query = result["query"]
+        changed.append(name)
+    return changed
+
+
+def _held_versions(states: Dict[str, RxDBSessionState]) -> Dict[str, str]:
+    """Versions of the collection results held in the session (not evicted meanwhile)"""
+    return {
+        name: collection_state.version
+        for name, collection_state in states.items()
+        if collection_state.version is not None and collection_state.dataframe is not None
+    }
+
@@ -0,0 +1,189 @@
+"""
+Headless core of `rxdb_dataframe`: the pure data layer, without Streamlit.
+
+Schema to dtype compilation, conversion of component results & change sets, Mango query
+evaluation, diffing, validation and the stores are usable from batch jobs and worker processes
+without paying Streamlit's import cost. Importing this module imports neither Streamlit nor
+pandas; the names below are loaded from their modules on first access (PEP 562).
+
+The Streamlit binding (`rxdb_dataframe.component`) is a thin layer over this module.
+"""
+
+import importlib
+from typing import Any, Callable, Dict, List, Optional, Union
+
+# public name -> module (relative to the package) it is loaded from on first access
+_LAZY = {
+    "AggregateSpec": ".aggregates",
+    "MaterializedAggregate": ".aggregates",
+    "changed_rows": ".aggregates",
+    "update_aggregates": ".aggregates",
+    "RXDB_TRANSPORT_ARROW": ".arrow",
+    "RXDB_TRANSPORT_JSON": ".arrow",
+    "Transport": ".arrow",
+    "read_arrow_result": ".arrow",
+    "RXDB_CHANGE_DELETE": ".changefeed",
+    "RXDB_CHANGE_INSERT": ".changefeed",
+    "RXDB_CHANGE_RESYNC": ".changefeed",
+    "RXDB_CHANGE_UPDATE": ".changefeed",
+    "ChangeEvent": ".changefeed",
+    "ChangeFeed": ".changefeed",
+    "ChangeSubscription": ".changefeed",
+    "publish_change_events": ".changefeed",
+    "session_change_feed": ".changefeed",
+    "RXDB_CHANGES_DELTA": ".changes",
+    "RXDB_CHANGES_FULL": ".changes",
+    "apply_changes": ".changes",
+    "changes_to_dataframe": ".changes",
+    "get_primary_key": ".changes",
+    "WriteSet": ".edits",
+    "apply_editing_state": ".edits",
+    "diff_dataframes": ".edits",
+    "child_frame": ".flatten",
+    "flatten_schema": ".flatten",
+    "DataFrameIndexes": ".indexes",
+    "SortedIndex": ".indexes",
+    "schema_indexes": ".indexes",
+    "LocalQuery": ".mango",
+    "compile_selector": ".mango",
+    "is_narrowing": ".mango",
+    "normalize_query": ".mango",
+    "query_dataframe": ".mango",
+    "query_fields": ".mango",
+    "CallMetrics": ".metrics",
+    "add_metrics_callback": ".metrics",
+    "remove_metrics_callback": ".metrics",
+    "LazyRxDBFrame": ".paging",
+    "page_range": ".paging",
+    "ParallelConverter": ".parallel",
+    "configure_parallel_conversion": ".parallel",
+    "get_parallel_converter": ".parallel",
+    "ConversionPlan": ".plan",
+    "Projection": ".plan",
+    "compile_schema": ".plan",
+    "schema_digest": ".plan",
+    "CachePolicy": ".query_cache",
+    "QueryResultCache": ".query_cache",
+    "query_cache_key": ".query_cache",
+    "ReplicationServer": ".replication",
+    "SQLiteReplicationStore": ".replication",
+    "replication_options": ".replication",
+    "DEFAULT_SEED_CHUNK_SIZE": ".seed",
+    "SeedDocs": ".seed",
+    "config_digest": ".seed",
+    "iter_dump": ".seed",
+    "load_dump": ".seed",
+    "seed_args": ".seed",
+    "split_seed": ".seed",
+    "SnapshotCache": ".snapshots",
+    "configure_snapshot_cache": ".snapshots",
+    "get_snapshot_cache": ".snapshots",
+    "snapshot_key": ".snapshots",
+    "SessionDataStore": ".store",
+    "configure_session_store": ".store",
+    "get_session_store": ".store",
+    "UpdatePolicy": ".updates",
+    "SchemaValidator": ".validation",
+    "ValidationResult": ".validation",
+}
+
+__all__ = ["RxJsonSchema", "RxCollectionCreator", "get_dataframe_by_schema", *_LAZY]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __package__), name)
+    globals()[name] = value  # resolved once
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals(), *_LAZY})
+
+
+class RxJsonSchema:
+    def __init__(
+        self,
+        version: int,
+        primaryKey: Any,
+        type: Union["object", str],
+        properties: Dict[str, Dict[str, Any]],
+        required: Optional[List[str]] = None,
+        indexes: Optional[List[Union[str, List[str]]]] = None,  # noqa: TAE002
+        internalIndexes: Optional[List[List[str]]] = None,  # noqa: TAE002
+        encrypted: Optional[List[str]] = None,
+        keyCompression: Optional[bool] = None,
+        additionalProperties: Optional[bool] = None,
+        title: Optional[str] = None,
+        description: Optional[str] = None,
+        # attachments: Optional[Dict[str, Any]] = None,
+        # crdt: Optional["CRDTSchemaOptions"] = None,
+    ):
+        self.title = title
+        self.description = description
+        self.version = version
+        self.primaryKey = primaryKey
+        self.type = type
+        self.properties = properties
+        self.required = required
+        self.indexes = indexes
+        self.internalIndexes = internalIndexes
+        self.encrypted = encrypted
+        self.keyCompression = keyCompression
+        self.additionalProperties = additionalProperties
+        # self.attachments = attachments
+        # self.crdt = crdt
+
+
+class RxCollectionCreator:
+    def __init__(
+        self,
+        schema: RxJsonSchema,
+        instanceCreationOptions: Optional[Any] = None,
+        autoMigrate: Optional[bool] = None,
+        attachments: Optional[Dict[str, Callable]] = None,
+        options: Optional[Any] = None,
+        localDocuments: Optional[bool] = None,
+        # migrationStrategies: Optional['MigrationStrategies'] = None,
+        # cacheReplacementPolicy: Optional['RxCacheReplacementPolicy'] = None,
+        # conflictHandler: Optional['RxConflictHandler'] = None
+    ):
+        self.schema = schema
+        self.instanceCreationOptions = instanceCreationOptions
+        self.autoMigrate = autoMigrate
+        self.attachments = attachments
+        self.options = options
+        self.localDocuments = localDocuments
+        # self.migrationStrategies = migrationStrategies
+        # self.cacheReplacementPolicy = cacheReplacementPolicy
+        # self.conflictHandler = conflictHandler
+
+
+def get_dataframe_by_schema(schema: dict) -> "pd.DataFrame":  # noqa: F821
+    """
+    Create a `pandas.DataFrame` based on the given JSONSchema.
+    """
+    import pandas as pd
+
+    df = pd.DataFrame()
+    properties = schema.get("properties", {})
+    for column, prop in properties.items():
+        if prop["type"] == "string" and prop.get("format") == "date-time":
+            df[column] = pd.Series(dtype="datetime64[ns]")
+        elif prop["type"] == "string":
+            df[column] = pd.Series(dtype="object")
+        elif prop["type"] == "boolean":
+            df[column] = pd.Series(dtype="bool")
+        elif prop["type"] == "object":
+            df[column] = pd.Series(dtype="category")
+        elif prop.get("enum") and len(prop["enum"]) > 0:
+            df[column] = pd.Series(dtype="category")
+        elif prop["type"] == "integer" and prop.get("format") == "time":
+            df[column] = pd.Series(dtype="int")  # pd.Timestamp.now()
+        elif prop["type"] == "integer":
+            df[column] = pd.Series(dtype="int")
+        elif prop["type"] == "number":
+            df[column] = pd.Series(dtype="float")
+    return df
@@ -0,0 +1,238 @@
+"""
+Write-back of `st.data_editor` edits to the RxDB collection.
+
+Edits are diffed against the baseline snapshot by primary key, with vectorized column
+comparison, into a minimal write set:
+
+    {
+        "id": 3,                # write set id, the component skips already written ones
+        "upsert": [...docs],    # added rows (whole documents)
+        "patch": [...docs],     # primary key & changed fields of updated rows
+        "remove": [...keys],    # primary keys of deleted rows
+    }
+
+Write sets are cumulative (edited rows vs. the same baseline), so the component coalesces the
+ones arriving within its debounce window and flushes only the latest one: a single bulk upsert
+and a single bulk remove.
+"""
+
+import json
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .metrics import logger
+from .plan import DATETIME_DTYPE, ConversionPlan
+from .validation import SchemaValidator
+
+
+class WriteSet:
+    """
+    Minimal, primary key based set of writes
+    """
+
+    def __init__(
+        self,
+        upsert: Optional[List[Dict[str, Any]]] = None,
+        patch: Optional[List[Dict[str, Any]]] = None,
+        remove: Optional[List[Any]] = None,
+    ):
+        self.upsert = upsert or []
+        self.patch = patch or []
+        self.remove = remove or []
+
+    def __bool__(self) -> bool:
+        return bool(self.upsert or self.patch or self.remove)
+
+    def __len__(self) -> int:
+        return len(self.upsert) + len(self.patch) + len(self.remove)
+
+    def to_dict(self, write_id: int) -> Dict[str, Any]:
+        return {"id": write_id, "upsert": self.upsert, "patch": self.patch, "remove": self.remove}
+
+
+def _is_nested(series: pd.Series) -> bool:
+    return isinstance(series.dtype, pd.ArrowDtype) and series.dtype.pyarrow_dtype.num_fields > 0
+
+
+def _changed(edited: pd.Series, baseline: pd.Series) -> np.ndarray:
+    """
+    Returns mask of changed values, missing values (`None`, `NaN`, `NA`, `NaT`) are equal.
+    """
+    edited_na = edited.isna().to_numpy()
+    baseline_na = baseline.isna().to_numpy()
+    if _is_nested(edited) or _is_nested(baseline):
+        # Arrow lists & structs are compared as Python values
+        pairs = zip(edited.tolist(), baseline.tolist(), edited_na | baseline_na)
+        ne = np.array([not missing and a != b for a, b, missing in pairs], dtype=bool)
+    else:
+        try:
+            ne = edited.ne(baseline).to_numpy(dtype=bool, na_value=True)
+        except (TypeError, ValueError):
+            # e.g. categoricals with different categories or mixed types
+            ne = edited.astype(object).ne(baseline.astype(object)).to_numpy(dtype=bool)
+    return np.where(edited_na | baseline_na, edited_na != baseline_na, ne)
+
+
+def diff_dataframes(
+    edited: pd.DataFrame, baseline: pd.DataFrame, plan: ConversionPlan, primary_key: str
+) -> WriteSet:
+    """
+    Compute minimal write set turning `baseline` rows into `edited` ones, matched by primary key:
+    rows with a new primary key are upserted, rows missing in `edited` are removed and only
+    changed fields of the other rows are patched.
+    """
+    baseline_keys = pd.Index(baseline[primary_key])
+    edited_keys = pd.Index(edited[primary_key])
+    known = edited_keys.isin(baseline_keys) & edited_keys.notna()
+
+    removed = baseline_keys[~baseline_keys.isin(edited_keys) & baseline_keys.notna()]
+    upsert = plan.encode(edited[~known])
+
+    updated = edited[known]
+    original = baseline.iloc[baseline_keys.get_indexer(edited_keys[known])]
+    columns = [
+        column
+        for column in plan.columns
+        if column != primary_key and column in updated.columns and column in original.columns
+    ]
+    patch: List[Dict[str, Any]] = []
+    if columns and len(updated):
+        updated_values = updated.reset_index(drop=True)
+        original_values = original.reset_index(drop=True)
+        mask = np.column_stack(
+            [_changed(updated_values[column], original_values[column]) for column in columns]
+        )
+        rows = mask.any(axis=1)
+        for doc, changed in zip(plan.encode(updated[rows]), mask[rows]):
+            # nested (flattened) fields are patched with their whole top-level object
+            fields = [column.split(".")[0] for column, c in zip(columns, changed) if c]
+            patch.append({primary_key: doc[primary_key], **{f: doc.get(f) for f in fields}})
+
+    return WriteSet(upsert=upsert, patch=patch, remove=removed.tolist())
+
+
+def _coerce(plan: ConversionPlan, column: str, values: Sequence[Any]) -> pd.Series:
+    series = pd.Series(list(values), dtype=object)
+    if plan.dtypes.get(column) == DATETIME_DTYPE:
+        # the editor returns datetime cells as ISO strings, also for epoch ms columns
+        return pd.to_datetime(series, utc=True, format="ISO8601")
+    return plan.coercers[column](series)
+
+
+def apply_editing_state(
+    baseline: pd.DataFrame,
+    editing_state: Dict[str, Any],
+    plan: ConversionPlan,
+    primary_key: str,
+    added_keys: Sequence[Any] = (),
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Apply positional `st.data_editor` editing state (`edited_rows`, `added_rows`,
+    `deleted_rows`) to the `baseline` rows shown in the editor.
+
+    Returns `(edited, original)` frames of the touched rows only, ready for `diff_dataframes`.
+    Added rows without primary key get the corresponding `added_keys`.
+    """
+    edited_rows = editing_state.get("edited_rows") or {}
+    edited_rows = {int(i): change for i, change in edited_rows.items()}
+    deleted = {int(i) for i in editing_state.get("deleted_rows") or []}
+    added_rows = editing_state.get("added_rows") or []
+    positions = sorted(i for i in set(edited_rows) | deleted if 0 <= i < len(baseline))
+
+    original = baseline.iloc[positions]
+    edited = original.copy()
+    for column in plan.columns:
+        if column not in edited.columns:
+            continue
+        rows = [n for n, i in enumerate(positions) if column in edited_rows.get(i, {})]
+        if rows:
+            values = _coerce(plan, column, [edited_rows[positions[n]][column] for n in rows])
+            dtype = edited[column].dtype
+            edited[column] = edited[column].astype(object)
+            edited.iloc[rows, edited.columns.get_loc(column)] = values.to_numpy(dtype=object)
+            edited[column] = edited[column].astype(dtype)
+    edited = edited[[i not in deleted for i in positions]]
+
+    if added_rows:
+        added = pd.DataFrame(
+            {
+                column: _coerce(plan, column, [row.get(column) for row in added_rows])
+                for column in plan.columns
+            },
+            columns=plan.columns,
+        )
+        keys = added[primary_key].astype(object).to_numpy()
+        for n, key in enumerate(keys):
+            if pd.isna(key) and n < len(added_keys):
+                keys[n] = added_keys[n]
+        added[primary_key] = plan.coercers[primary_key](pd.Series(keys, dtype=object))
+        edited = pd.concat([edited, added], ignore_index=True) if len(edited) else added
+
+    return edited, original
+
+
+def editor_writes(
+    editor: Dict[str, Any],
+    editing_state: Dict[str, Any],
+    df: Optional[pd.DataFrame],
+    shown: Callable[[], Optional[pd.DataFrame]],
+    plan: ConversionPlan,
+    primary_key: str,
+    validator: SchemaValidator,
+) -> Optional[Dict[str, Any]]:
+    """
+    Returns the write set of the data editor's `editing_state` over the dataframe `df` (the
+    last one, if the edits did not change). `editor` keeps the editing session: digest of the
+    edits, keys of added rows, rejected rows & the last write set. `shown` returns the primary
+    keys of the rows shown in the editor (edits are positional), it is called on change only.
+    """
+    digest = json.dumps(editing_state, sort_keys=True, default=str)
+    if not any(editing_state.values()) or digest == editor.get("digest"):
+        return editor.get("writes")
+    editor["digest"] = digest
+    editor["edited_at"] = time.time()
+
+    keys = shown()
+    if keys is None or df is None:
+        return editor.get("writes")
+
+    # rows shown in the editor by their primary keys
+    positions = pd.Index(df[primary_key]).get_indexer(keys[primary_key])
+    baseline = df.iloc[positions[positions >= 0]]
+    added = editor.setdefault("added", [])
+    added_rows = editing_state.get("added_rows") or []
+    added += [str(uuid.uuid4()) for _ in range(len(added_rows) - len(added))]
+
+    edited, original = apply_editing_state(baseline, editing_state, plan, primary_key, added)
+    validation = validator.validate(edited, stamped_rows(edited, original, plan, primary_key))
+    editor["rejected"] = validation.errors(edited[primary_key])
+    if editor["rejected"]:
+        logger.warning("Rejected %d invalid data editor row(s)", len(editor["rejected"]))
+        rejected = edited[primary_key][validation.invalid]
+        edited = edited[validation.valid]
+        original = original[~original[primary_key].isin(rejected)]
+    write_set = diff_dataframes(edited, original, plan, primary_key)
+    if write_set:
+        editor["id"] = editor.get("id", 0) + 1
+        editor["writes"] = write_set.to_dict(editor["id"])
+    return editor.get("writes")
+
+
+def stamped_rows(
+    edited: pd.DataFrame, original: pd.DataFrame, plan: ConversionPlan, primary_key: str
+) -> Dict[str, np.ndarray]:
+    """
+    Rows of the fields the browser stamps on write (see `writeBack`): `createdAt` of added
+    rows, `last_modified` of every written one
+    """
+    properties = plan.schema.get("properties", {})
+    stamped: Dict[str, np.ndarray] = {}
+    if "createdAt" in properties:
+        stamped["createdAt"] = ~edited[primary_key].isin(original[primary_key]).to_numpy()
+    if "last_modified" in properties:
+        stamped["last_modified"] = np.ones(len(edited), dtype=bool)
+    return stamped
@@ -0,0 +1,131 @@
+"""
+Schema-driven flattening of nested `object` & `array` properties.
+
+With flattening enabled, nested object properties become typed columns named by their dotted
+path (e.g. `address.city`), compiled from the RxJSONSchema, so every column is extracted in one
+pass over the documents instead of per-row `json_normalize`. Arrays with typed `items` become
+list-typed Arrow columns (`pd.ArrowDtype(pa.list_(...))`), which can be exploded into a child
+frame with `child_frame()` without leaving Arrow.
+"""
+
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+_ARROW_SCALAR_TYPES = {
+    "string": "string",
+    "integer": "int64",
+    "number": "float64",
+    "boolean": "bool_",
+}
+
+
+def flatten_schema(schema: dict) -> dict:
+    """
+    Returns copy of the JSONSchema with nested object properties flattened into dotted paths,
+    (`required` is flattened too, nested fields are required only if their parents are).
+    """
+    properties: Dict[str, Any] = {}
+    required = []
+
+    def walk(props: Dict[str, Any], prefix: str, required_props, parent_required: bool):
+        for name, prop in props.items():
+            path = prefix + name
+            is_required = parent_required and name in (required_props or [])
+            if prop.get("type") == "object" and prop.get("properties"):
+                walk(prop["properties"], path + ".", prop.get("required"), is_required)
+            else:
+                properties[path] = prop
+                if is_required:
+                    required.append(path)
+
+    walk(schema.get("properties", {}), "", schema.get("required"), True)
+    return {**schema, "properties": properties, "required": required}
+
+
+def arrow_type(prop: Dict[str, Any]):
+    """
+    Returns `pyarrow.DataType` of the JSONSchema property, or `None` if it has no typed
+    Arrow counterpart (or `pyarrow` is not installed).
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:  # pragma: no cover
+        return None
+
+    prop_type = prop.get("type")
+    if isinstance(prop_type, list):
+        prop_type = next((t for t in prop_type if t != "null"), None)
+    if prop_type in _ARROW_SCALAR_TYPES:
+        return getattr(pa, _ARROW_SCALAR_TYPES[prop_type])()
+    if prop_type == "array" and isinstance(prop.get("items"), dict):
+        item_type = arrow_type(prop["items"])
+        return pa.list_(item_type) if item_type is not None else None
+    if prop_type == "object" and prop.get("properties"):
+        fields = [(name, arrow_type(p)) for name, p in prop["properties"].items()]
+        if any(t is None for _, t in fields):
+            return None
+        return pa.struct(fields)
+    return None
+
+
+def to_arrow_list(pa_type):
+    """
+    Returns coercion function of a list column into the given Arrow list type.
+    """
+
+    def coerce(series: pd.Series) -> pd.Series:
+        import pyarrow as pa
+
+        if isinstance(series.dtype, pd.ArrowDtype):
+            return series
+        values = [value if isinstance(value, list) else None for value in series.tolist()]
+        try:
+            array = pa.array(values, type=pa_type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return series  # items not matching the schema are kept as Python lists
+        return pd.Series(
+            pd.arrays.ArrowExtensionArray(array), index=series.index, name=series.name
+        )
+
+    return coerce
+
+
+def from_arrow_list(series: pd.Series) -> pd.Series:
+    """Encode list column values as Python lists"""
+    return pd.Series(series.tolist(), index=series.index, dtype=object)
+
+
+def child_frame(
+    df: pd.DataFrame, column: str, primary_key: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Explode the array column into a child frame: one row per item, with the parent's primary key
+    (or the parent row label, when `primary_key` is not given). Items of object type are split
+    into dotted-path columns. List-typed Arrow columns are exploded by Arrow kernels.
+    """
+    parent = df[primary_key] if primary_key else pd.Series(df.index, index=df.index)
+    parent_name = primary_key or "parent"
+    series = df[column]
+
+    if not isinstance(series.dtype, pd.ArrowDtype):
+        child = pd.DataFrame({parent_name: parent.to_numpy(), column: series.to_numpy()})
+        child = child.explode(column, ignore_index=True)
+        return child[child[column].notna()].reset_index(drop=True)
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    array = pa.chunked_array(series.array.__arrow_array__()).combine_chunks()
+    parents = pc.list_parent_indices(array).to_numpy()
+    values = pc.list_flatten(array)
+    child = pd.DataFrame({parent_name: parent.to_numpy()[parents]})
+    if pa.types.is_struct(values.type):
+        for index in range(values.type.num_fields):
+            field = values.type.field(index)
+            child[f"{column}.{field.name}"] = pd.Series(
+                pd.arrays.ArrowExtensionArray(values.field(index))
+            )
+    else:
+        child[column] = pd.Series(pd.arrays.ArrowExtensionArray(values))
+    return child
@@ -0,0 +1,94 @@
+import {
+  RxDatabaseCreatorExtended,
+  getRxDatabaseCreator,
+  type RxCollectionCreatorExtended,
+} from '@ngx-odm/rxdb/config';
+import { RxDBService } from '@ngx-odm/rxdb/core';
+import { NgxRxdbUtils } from '@ngx-odm/rxdb/utils';
+import React, { ReactNode, useEffect, useRef, useState } from 'react';
+import { Subscription } from 'rxjs';
+import { ComponentProps, Streamlit } from 'streamlit-component-lib';
+import { RXDB_PROTOCOL_VERSION, RxDBCollectionsArgs } from './RxDBDataframeArgs';
+import { RxDBCollectionsBatch } from './collections';
+import { useNullableRenderData } from './useNullableRenderData';
+
+const { logger, isEmptyObject } = NgxRxdbUtils;
+
+/**
+ * Several collections of one database in one component instance: the database is initialized
+ * once and the query results of all collections are sent as one batched value.
+ * @param props
+ */
+export const RxDBCollections: React.FC<ComponentProps> = props => {
+  const [inited, setInited] = useState<boolean>();
+  const subRef = useRef<Subscription>();
+  if (!subRef.current) {
+    subRef.current = new Subscription();
+  }
+  const renderData = useNullableRenderData<RxDBCollectionsArgs>(subRef.current);
+  const { collection_configs, db_config, config_hash, seed, queries, with_rev, held } =
+    renderData?.['args'] || ({} as RxDBCollectionsArgs);
+  // static config is sent by Python only until the component reports it initialized with it
+  const configRef = useRef<{
+    collectionConfigs: Record<string, RxCollectionCreatorExtended>;
+    dbConfig: RxDatabaseCreatorExtended;
+    hash: string;
+  }>();
+  if (collection_configs && db_config && config_hash) {
+    configRef.current = {
+      collectionConfigs: collection_configs,
+      dbConfig: db_config,
+      hash: config_hash,
+    };
+  }
+  const initStartedRef = useRef(false);
+  const configRequestedRef = useRef(false);
+  const batchRef = useRef<RxDBCollectionsBatch>();
+  const dbServiceRef = useRef<RxDBService>();
+  if (!dbServiceRef.current) {
+    dbServiceRef.current = new RxDBService();
+  }
+
+  useEffect(() => {
+    batchRef.current?.seed(seed ?? {}).catch(logger.log);
+  }, [seed]);
+
+  useEffect(() => {
+    if (inited && queries) {
+      batchRef.current!.query(queries);
+    }
+  }, [inited, queries]);
+
+  // Python reports the results it holds with every rerun - re-send the ones it lost
+  useEffect(() => {
+    if (inited) {
+      batchRef.current!.hold(held ?? {});
+    }
+  }, [inited, held]);
+
+  if (isEmptyObject(renderData)) {
+    return null;
+  }
+
+  const config = configRef.current;
+  if (!inited && !initStartedRef.current && config) {
+    initStartedRef.current = true;
+    const batch = new RxDBCollectionsBatch(dbServiceRef.current, config.hash, with_rev);
+    batchRef.current = batch;
+    dbServiceRef
+      .current!.initDb(getRxDatabaseCreator(config.dbConfig))
+      .then(() => batch.init(config.collectionConfigs, queries ?? {}, seed ?? {}))
+      .then(sub => {
+        subRef.current!.add(sub);
+        setInited(true);
+        logger.log('Collections initialized', Object.keys(config.collectionConfigs));
+      })
+      .catch(logger.log);
+  } else if (!config && !configRequestedRef.current) {
+    // (re)mounted after Python stopped sending the static config - ask for it
+    configRequestedRef.current = true;
+    Streamlit.setComponentValue({ config_hash: null, protocol: RXDB_PROTOCOL_VERSION });
+  }
+
+  return props.args.element as ReactNode;
+};
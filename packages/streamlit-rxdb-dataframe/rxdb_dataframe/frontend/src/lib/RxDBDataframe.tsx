@@ -5,19 +5,36 @@ import {
   type RxCollectionCreatorExtended,
 } from '@ngx-odm/rxdb/config';
 import { RxDBService } from '@ngx-odm/rxdb/core';
-import { NgxRxdbUtils } from '@ngx-odm/rxdb/utils';
+import { NgxRxdbUtils, type Entity } from '@ngx-odm/rxdb/utils';
 import equal from 'fast-deep-equal';
 import React, { ReactNode, useCallback, useEffect, useRef, useState } from 'react';
-import { MangoQuery } from 'rxdb';
-import { BehaviorSubject, Subscription, distinctUntilChanged, withLatestFrom } from 'rxjs';
+import { MangoQuery, getPrimaryFieldOfPrimaryKey } from 'rxdb';
+import {
+  BehaviorSubject,
+  Subscription,
+  combineLatestWith,
+  distinctUntilChanged,
+  switchMap,
+  withLatestFrom,
+} from 'rxjs';
 import {
   ComponentProps,
   Streamlit,
   withStreamlitConnection,
 } from 'streamlit-component-lib';
-import { RxDBDataframeArgs } from './RxDBDataframeArgs';
-import { useEditedState } from './useEditingState';
+import { RxDBCollections } from './RxDBCollections';
+import { RXDB_PROTOCOL_VERSION, RxDBDataframeArgs, RxDBSeed } from './RxDBDataframeArgs';
+import { RxDBComponentValue, encodeComponentValue } from './arrow';
+import { RxDBChangeFeed } from './changefeed';
+import { RxDBChangeTracker } from './changes';
+import { fetchPages } from './paging';
+import { projectDocs, projectSchema, projectionFields } from './projection';
+import { withReplication } from './replication';
+import { RxDBSeeder } from './seed';
+import { RxDBTimings, elapsed } from './timings';
+import { RxDBUpdateCoalescer } from './updates';
 import { useNullableRenderData } from './useNullableRenderData';
+import { useWriteBack } from './useWriteBack';
 
 const { logger, isEmptyObject, tapOnce } = NgxRxdbUtils;
 
@@ -37,8 +54,86 @@ const RxDBDataframe: React.FC<ComponentProps> = props => {
   }
   const renderData = useNullableRenderData(subRef.current);
   // Parse the render data
-  const { editing_state, collection_config, db_config, query, with_rev } =
-    renderData?.['args'] || ({} as RxDBDataframeArgs);
+  const {
+    collection_config,
+    db_config,
+    config_hash,
+    seed,
+    query,
+    with_rev,
+    delta,
+    resync,
+    cached_version,
+    transport,
+    page_size,
+    pages,
+    writes,
+    write_debounce,
+    measure_payload,
+    change_feed,
+    update_policy,
+    columns,
+  } = renderData?.['args'] || ({} as RxDBDataframeArgs);
+  // `initCollection` keeps the closure of the first render (before any render data),
+  // its subscriptions read the args through this ref
+  const argsRef = useRef<RxDBDataframeArgs>({} as RxDBDataframeArgs);
+  argsRef.current = renderData?.['args'] || ({} as RxDBDataframeArgs);
+  // columns projected by Python, documents are stripped to them before encoding
+  const columnsSubjectRef = useRef<BehaviorSubject<string[] | null>>();
+  if (!columnsSubjectRef.current) {
+    columnsSubjectRef.current = new BehaviorSubject<string[] | null>(columns ?? null);
+  }
+  // static config is sent by Python only until the component reports it initialized with it
+  const configRef = useRef<{
+    collectionConfig: RxCollectionCreatorExtended;
+    dbConfig: RxDatabaseCreatorExtended;
+    hash: string;
+  }>();
+  if (collection_config && db_config && config_hash) {
+    configRef.current = {
+      collectionConfig: collection_config,
+      dbConfig: db_config,
+      hash: config_hash,
+    };
+  }
+  const projectedSchema = (projection?: string[] | null) => {
+    const { schema } = configRef.current!.collectionConfig;
+    const primaryKey = getPrimaryFieldOfPrimaryKey(schema.primaryKey) as string;
+    return projectSchema(schema, projectionFields(projection, primaryKey, with_rev));
+  };
+  const initStartedRef = useRef(false);
+  const configRequestedRef = useRef(false);
+  const seederRef = useRef<RxDBSeeder>();
+  const trackerRef = useRef<RxDBChangeTracker<Entity>>();
+  const infoRef = useRef<unknown>();
+  // start of the (re-)query, caused by query or collection change
+  const queryStartedRef = useRef(performance.now());
+  // paging mode: total count of query results & collection changes counter
+  const [count, setCount] = useState<number>();
+  const [version, setVersion] = useState(0);
+  const pagingRequestRef = useRef<unknown>();
+  // query result cache: collection version & the last sent result (Python may hold it cached)
+  const versionRef = useRef<string>();
+  const cachedVersionRef = useRef<string | null>();
+  cachedVersionRef.current = cached_version ?? null;
+  const lastResultRef = useRef<RxDBComponentValue<Entity> & { cached?: boolean }>();
+  // change feed: pending change events ride along every component value (with the protocol)
+  const changeFeedRef = useRef<RxDBChangeFeed<Entity>>();
+  const withMeta = <V extends object>(value: V) => {
+    const feed = changeFeedRef.current;
+    const meta = { ...value, protocol: RXDB_PROTOCOL_VERSION };
+    return feed ? { ...meta, change_events: feed.pending() } : meta;
+  };
+  // query results are coalesced into component values by the update policy
+  const updatesRef = useRef<RxDBUpdateCoalescer>();
+  if (!updatesRef.current) {
+    updatesRef.current = new RxDBUpdateCoalescer();
+    subRef.current.add(() => updatesRef.current!.cancel());
+  }
+  const sendValue = (build: () => unknown) => {
+    Streamlit.setComponentValue(build());
+    changeFeedRef.current?.sent(() => Streamlit.setComponentValue(build()));
+  };
 
   const dbServiceRef = useRef<RxDBService>();
   const collectionServiceRef = useRef<RxDBCollectionService>();
@@ -47,7 +142,28 @@ const RxDBDataframe: React.FC<ComponentProps> = props => {
   }
   const collectionService = () => collectionServiceRef.current!;
 
-  const [, setEntities] = useEditedState(editing_state, collectionService());
+  useWriteBack(writes, write_debounce, collectionServiceRef.current);
+
+  useEffect(() => {
+    changeFeedRef.current?.ack(change_feed);
+  }, [change_feed]);
+
+  useEffect(() => {
+    updatesRef.current!.configure(update_policy);
+  }, [update_policy]);
+
+  useEffect(() => {
+    if (!equal(columns ?? null, columnsSubjectRef.current!.value)) {
+      columnsSubjectRef.current!.next(columns ?? null);
+    }
+  }, [columns]);
+
+  // import the chunk of seed documents sent by Python
+  useEffect(() => {
+    if (seederRef.current && collectionServiceRef.current) {
+      seederRef.current.import(collectionServiceRef.current, seed).catch(logger.log);
+    }
+  }, [seed]);
 
   const initDb = useCallback((dbConfig: RxDatabaseCreatorExtended) => {
     const parsedDbConfig = getRxDatabaseCreator(dbConfig);
@@ -55,31 +171,161 @@ const RxDBDataframe: React.FC<ComponentProps> = props => {
   }, []);
 
   const initCollection = useCallback(
-    async (collectionConfig: RxCollectionCreatorExtended) => {
+    async (
+      collectionConfig: RxCollectionCreatorExtended,
+      configHash: string,
+      initialSeed?: RxDBSeed | null
+    ) => {
       if (!collectionServiceRef.current) {
         collectionServiceRef.current = new RxDBCollectionService(
-          collectionConfig,
+          withReplication(collectionConfig),
           dbServiceRef.current!
         );
       }
+      seederRef.current = new RxDBSeeder(configHash);
+      await seederRef.current.start(collectionService(), initialSeed);
+      // replicate in the background, if `options.replication` is set
+      collectionService().sync().catch(logger.log);
+      const { with_rev, page_size, change_feed } = argsRef.current;
+      if (change_feed) {
+        changeFeedRef.current = new RxDBChangeFeed<Entity>(with_rev);
+        const feedsub = changeFeedRef.current.subscribe(
+          collectionService().initialized$.pipe(
+            switchMap(() => collectionService().collection.$)
+          )
+        );
+        subRef.current!.add(feedsub);
+      }
       const query$ = querySubjectRef.current!.pipe(distinctUntilChanged(equal));
+      if (page_size) {
+        // paging mode: only count is live, pages are fetched on request from Python
+        const countsub = query$
+          .pipe(
+            switchMap(q => collectionService().count(q)),
+            tapOnce(() => setInited(true))
+          )
+          .subscribe(setCount);
+        const changesub = collectionService()
+          .initialized$.pipe(switchMap(() => collectionService().collection.$))
+          .subscribe(() => setVersion(v => v + 1));
+        subRef.current!.add(countsub);
+        subRef.current!.add(changesub);
+        logger.log('Collection & count subscription initialized, with', query, page_size);
+        return;
+      }
+      // every collection change bumps the version, which invalidates Python's cached results
+      const instance = Math.random().toString(36).slice(2);
+      let changes = 0;
+      let sentChanges = 0;
+      versionRef.current = `${instance}:${changes}`;
+      const versionsub = collectionService()
+        .initialized$.pipe(switchMap(() => collectionService().collection.$))
+        .subscribe(() => {
+          versionRef.current = `${instance}:${++changes}`;
+          queryStartedRef.current = performance.now();
+        });
+      subRef.current!.add(versionsub);
+      const updates = updatesRef.current!;
+      const columns$ = columnsSubjectRef.current!.pipe(distinctUntilChanged(equal));
+      const primaryKey = getPrimaryFieldOfPrimaryKey(collectionConfig.schema.primaryKey);
+      let trackedColumns: string[] | null = null;
       const docssub = collectionService()
         .docs(query$, with_rev)
         .pipe(
           //
           tapOnce(() => setInited(true)),
+          combineLatestWith(columns$),
           withLatestFrom(collectionService().info())
         )
-        .subscribe(([docs, info]) => {
-          if (!docs) {
+        .subscribe(([[result, projection], info]) => {
+          if (!result) {
             return;
           }
-          setEntities(docs);
-          Streamlit.setComponentValue({
-            docs,
-            info,
-            query: querySubjectRef.current!.value,
-          });
+          infoRef.current = info;
+          const fields = projectionFields(projection, primaryKey as string, with_rev);
+          const schema = projectSchema(collectionConfig.schema, fields);
+          const docs = projectDocs(result, fields);
+          const timings: RxDBTimings = { query_ms: elapsed(queryStartedRef.current) };
+          // built when sent, so it covers all the results merged into it
+          const send = () => {
+            const currentQuery = querySubjectRef.current!.value;
+            const stats = { ...updates.stats };
+            sentChanges = changes;
+            if (!argsRef.current.delta) {
+              const version = versionRef.current;
+              const cached = cachedVersionRef.current === version;
+              lastResultRef.current = {
+                docs,
+                info,
+                query: currentQuery,
+                version,
+                columns: projection,
+                cached,
+              };
+              sendValue(() =>
+                cached
+                  ? withMeta({
+                      cached,
+                      info,
+                      query: currentQuery,
+                      version,
+                      columns: projection,
+                      timings,
+                      updates: stats,
+                    })
+                  : encodeComponentValue(
+                      argsRef.current.transport,
+                      schema,
+                      withMeta({
+                        docs,
+                        info,
+                        query: currentQuery,
+                        version,
+                        columns: projection,
+                        timings,
+                        updates: stats,
+                      }),
+                      with_rev,
+                      argsRef.current.measure_payload
+                    )
+              );
+              return true;
+            }
+            if (!trackerRef.current) {
+              trackerRef.current = new RxDBChangeTracker<Entity>(
+                primaryKey as keyof Entity
+              );
+            }
+            const tracker = trackerRef.current;
+            const diffStarted = performance.now();
+            // a new projection replaces all the rows
+            const reproject = !equal(projection, trackedColumns);
+            trackedColumns = projection;
+            const changeSet =
+              tracker.seq && !reproject ? tracker.delta(docs) : tracker.full(docs);
+            if (!changeSet) {
+              return false;
+            }
+            timings.diff_ms = elapsed(diffStarted);
+            sendValue(() =>
+              encodeComponentValue(
+                argsRef.current.transport,
+                schema,
+                withMeta({
+                  changes: changeSet,
+                  info,
+                  query: currentQuery,
+                  columns: projection,
+                  timings,
+                  updates: stats,
+                }),
+                with_rev,
+                argsRef.current.measure_payload
+              )
+            );
+            return true;
+          };
+          updates.push(send, changes - sentChanges);
           Streamlit.setFrameHeight();
         });
       subRef.current!.add(docssub);
@@ -93,21 +339,104 @@ const RxDBDataframe: React.FC<ComponentProps> = props => {
       return;
     }
     if (query) {
+      if (!equal(query, querySubjectRef.current!.value)) {
+        queryStartedRef.current = performance.now();
+      }
       querySubjectRef.current!.next(query);
     }
   }, [inited, query]);
 
+  // paging mode: answer page requests from Python, re-send on collection or count changes
+  useEffect(() => {
+    if (!inited || !page_size || count === undefined) {
+      return;
+    }
+    const currentQuery = querySubjectRef.current!.value;
+    const request = [pages, version, count, currentQuery];
+    if (equal(request, pagingRequestRef.current)) {
+      return;
+    }
+    pagingRequestRef.current = request;
+    const { collection } = collectionService();
+    const started = performance.now();
+    fetchPages(collection, currentQuery, pages ?? [], page_size, with_rev)
+      .then(async result => {
+        const timings: RxDBTimings = { query_ms: elapsed(started) };
+        const info = await collectionService().info();
+        sendValue(() =>
+          withMeta({ pages: result, count, version, info, query: currentQuery, timings })
+        );
+        Streamlit.setFrameHeight();
+      })
+      .catch(logger.log);
+  }, [inited, page_size, pages, version, count, query]);
+
+  // Python lost the result it confirmed as cached - send the documents
+  useEffect(() => {
+    const last = lastResultRef.current;
+    if (!inited || !last?.cached || cached_version === last.version) {
+      return;
+    }
+    const { docs, info, query: lastQuery, version, columns: lastColumns } = last;
+    lastResultRef.current = { ...last, cached: false };
+    sendValue(() =>
+      encodeComponentValue(
+        transport,
+        projectedSchema(lastColumns),
+        withMeta({ docs, info, query: lastQuery, version, columns: lastColumns }),
+        with_rev
+      )
+    );
+  }, [inited, cached_version]);
+
+  // Python lost track of the change set sequence (`resync` counter is bumped) - send a full resync
+  useEffect(() => {
+    const tracker = trackerRef.current;
+    if (!inited || !delta || !resync || !tracker?.seq) {
+      return;
+    }
+    const changes = tracker.full(tracker.docs);
+    const info = infoRef.current;
+    const currentQuery = querySubjectRef.current!.value;
+    const currentColumns = columnsSubjectRef.current!.value;
+    sendValue(() =>
+      encodeComponentValue(
+        transport,
+        projectedSchema(currentColumns),
+        withMeta({ changes, info, query: currentQuery, columns: currentColumns }),
+        with_rev
+      )
+    );
+  }, [inited, delta, resync]);
+
   if (isEmptyObject(renderData)) {
     return null;
   } // Don't do anything at all
 
-  if (!inited) {
-    initDb(db_config)
-      .then(() => initCollection(collection_config))
+  const config = configRef.current;
+  if (!inited && !initStartedRef.current && config) {
+    initStartedRef.current = true;
+    initDb(config.dbConfig)
+      .then(() => initCollection(config.collectionConfig, config.hash, seed))
       .catch(logger.log);
+  } else if (!config && !configRequestedRef.current) {
+    // (re)mounted after Python stopped sending the static config - ask for it
+    configRequestedRef.current = true;
+    Streamlit.setComponentValue({ config_hash: null, protocol: RXDB_PROTOCOL_VERSION });
   }
 
   return props.args.element as ReactNode;
 };
 
-export const RxDBDataframeComponent = withStreamlitConnection(RxDBDataframe);
+/**
+ * Renders several collections (`rxdb_collections`) or a single one (`rxdb_dataframe`)
+ * @param props
+ */
+const RxDBComponent: React.FC<ComponentProps> = props =>
+  Array.isArray(props.args?.collections) ? (
+    <RxDBCollections {...props} />
+  ) : (
+    <RxDBDataframe {...props} />
+  );
+
+export const RxDBDataframeComponent = withStreamlitConnection(RxDBComponent);
@@ -5,19 +5,75 @@ import type {
 import type { Entity, EntityId } from '@ngx-odm/rxdb/utils';
 import { MangoQuery } from 'rxdb';
 import { ArrowTable } from 'streamlit-component-lib';
+import type { RxDBChangeFeedAck } from './changefeed';
+import type { RxDBUpdatePolicy } from './updates';
 
-export type DataframeEditingState = {
-  edited_rows: Record<EntityId, Entity>;
-  added_rows: Entity[];
-  deleted_rows: number[];
+export type RxDBWriteSet = {
+  id: number;
+  upsert: Entity[];
+  patch: Entity[];
+  remove: EntityId[];
+};
+
+export type RxDBDataframeTransport = 'json' | 'arrow';
+
+/**
+ * Version of the args & values protocol, sent with every component value, so Python can tell
+ * a frontend build made for another version (`RXDB_PROTOCOL_VERSION` in Python)
+ */
+export const RXDB_PROTOCOL_VERSION = 1;
+
+/**
+ * Seed documents (`initialDocs`): digest & total, with the requested chunk
+ */
+export type RxDBSeed = {
+  digest: string;
+  total: number;
+  offset?: number;
+  docs?: Entity[];
 };
 
 export interface RxDBDataframeArgs {
-  collection_config: RxCollectionCreatorExtended;
+  // static config, sent only until the component reports it was initialized with `config_hash`
+  collection_config?: RxCollectionCreatorExtended | null;
+  config_hash?: string;
+  seed?: RxDBSeed | null;
   query?: MangoQuery;
   with_rev?: boolean;
-  db_config: RxDatabaseCreatorExtended;
+  delta?: boolean;
+  resync?: number;
+  cached_version?: string | null;
+  transport?: RxDBDataframeTransport;
+  page_size?: number;
+  pages?: number[];
+  db_config?: RxDatabaseCreatorExtended | null;
   dataframe: ArrowTable;
   data: Entity[];
-  editing_state: DataframeEditingState;
+  writes?: RxDBWriteSet | null;
+  write_debounce?: number;
+  measure_payload?: boolean;
+  // change feed progress, `null` when the change feed is disabled
+  change_feed?: RxDBChangeFeedAck | null;
+  // coalescing of query results into component values (reruns), `null` sends every result
+  update_policy?: RxDBUpdatePolicy | null;
+  // projected columns (with the primary key), `null` sends all fields
+  columns?: string[] | null;
+}
+
+/**
+ * Args of the `rxdb_collections` component instance: several collections of one database,
+ * configs, queries & seed documents by collection name
+ */
+export interface RxDBCollectionsArgs {
+  // names of the collections, always sent (tells this component mode apart)
+  collections: string[];
+  // static config, sent only until the component reports it was initialized with `config_hash`
+  collection_configs?: Record<string, RxCollectionCreatorExtended> | null;
+  db_config?: RxDatabaseCreatorExtended | null;
+  config_hash?: string;
+  seed?: Record<string, RxDBSeed | null>;
+  queries?: Record<string, MangoQuery>;
+  with_rev?: boolean;
+  // result versions held by Python, by collection name
+  held?: Record<string, string>;
 }
@@ -0,0 +1,150 @@
+import type { Entity } from '@ngx-odm/rxdb/utils';
+import {
+  Bool,
+  DataType,
+  Dictionary,
+  Float64,
+  Int32,
+  Int64,
+  Table,
+  TimestampMillisecond,
+  Utf8,
+  tableToIPC,
+  vectorFromArray,
+} from 'apache-arrow';
+import type { RxJsonSchema } from 'rxdb';
+import type { RxDBDataframeTransport } from './RxDBDataframeArgs';
+import type { RxDBChangeEvents } from './changefeed';
+import type { RxDBChangeSet } from './changes';
+import { RxDBTimings, elapsed } from './timings';
+import type { RxDBUpdateStats } from './updates';
+
+/** Schema metadata key holding the JSON encoded non-columnar part of the payload */
+export const RXDB_ARROW_METADATA_KEY = 'rxdb';
+
+type JsonSchemaProperty = {
+  type?: string | string[];
+  format?: string;
+  enum?: unknown[];
+};
+
+type ColumnEncoder = {
+  type: DataType;
+  value: (v: any) => any;
+};
+
+const nullable = (fn: (v: any) => any) => (v: any) =>
+  v === undefined || v === null ? null : fn(v);
+
+/**
+ * Returns Arrow data type & value encoder for the given RxJsonSchema property
+ * @param prop
+ */
+const getColumnEncoder = (prop: JsonSchemaProperty): ColumnEncoder => {
+  const type = Array.isArray(prop.type) ? prop.type.find(t => t !== 'null') : prop.type;
+  if (prop.enum?.length) {
+    return { type: new Dictionary(new Utf8(), new Int32()), value: nullable(String) };
+  }
+  switch (type) {
+    case 'string':
+      return prop.format === 'date-time'
+        ? { type: new TimestampMillisecond('UTC'), value: nullable(Date.parse) }
+        : { type: new Utf8(), value: nullable(String) };
+    case 'boolean':
+      return { type: new Bool(), value: nullable(Boolean) };
+    case 'integer':
+      return { type: new Int64(), value: nullable(v => BigInt(Math.trunc(v))) };
+    case 'number':
+      return { type: new Float64(), value: nullable(Number) };
+    default:
+      // objects & arrays cross the boundary as JSON strings
+      return { type: new Utf8(), value: nullable(JSON.stringify) };
+  }
+};
+
+/**
+ * Encode documents columnar-wise as Arrow IPC stream, using Arrow schema derived from RxJsonSchema.
+ * Everything that is not a document (collection info, query, change set meta) is stored
+ * in the Arrow schema metadata as JSON.
+ * @param docs
+ * @param schema
+ * @param metadata
+ * @param withRev - also encode `_rev` column
+ */
+export const encodeArrowIPC = <T extends Entity>(
+  docs: T[],
+  schema: RxJsonSchema<T>,
+  metadata: Record<string, unknown>,
+  withRev = false
+): Uint8Array => {
+  const properties: Record<string, JsonSchemaProperty> = {
+    ...(schema.properties as Record<string, JsonSchemaProperty>),
+    ...(withRev ? { _rev: { type: 'string' } } : {}),
+  };
+  const started = performance.now();
+  const columns: Record<string, any> = {};
+  for (const [name, prop] of Object.entries(properties)) {
+    const { type, value } = getColumnEncoder(prop);
+    const values = docs.map(doc => value((doc as any)[name]));
+    columns[name] = vectorFromArray(values, type);
+  }
+  const table = new Table(columns);
+  const timings = { ...(metadata.timings as RxDBTimings), encode_ms: elapsed(started) };
+  table.schema.metadata.set(
+    RXDB_ARROW_METADATA_KEY,
+    JSON.stringify({ ...metadata, timings })
+  );
+  return tableToIPC(table, 'stream');
+};
+
+export type RxDBComponentValue<T extends Entity = Entity> = {
+  docs?: T[];
+  changes?: RxDBChangeSet<T>;
+  info: unknown;
+  query: unknown;
+  version?: string;
+  columns?: string[] | null;
+  protocol?: number;
+  timings?: RxDBTimings;
+  change_events?: RxDBChangeEvents<T>;
+  updates?: RxDBUpdateStats;
+};
+
+/**
+ * Returns component value as is for `json` transport, or as Arrow IPC bytes for `arrow` one.
+ *
+ * For change sets the encoded rows are `inserted` followed by `updated` docs
+ * (or all `docs` for a "full" change set) and `inserted` meta holds the count of inserted rows.
+ * @param transport
+ * @param schema
+ * @param value
+ * @param withRev
+ * @param measurePayload - report JSON payload size (costs another serialization)
+ */
+export const encodeComponentValue = <T extends Entity>(
+  transport: RxDBDataframeTransport | undefined,
+  schema: RxJsonSchema<T>,
+  value: RxDBComponentValue<T>,
+  withRev = false,
+  measurePayload = false
+): RxDBComponentValue<T> | Uint8Array => {
+  if (transport !== 'arrow') {
+    const timings: RxDBTimings = { ...value.timings, encode_ms: 0 };
+    if (measurePayload) {
+      timings.payload_bytes = new TextEncoder().encode(JSON.stringify(value)).length;
+    }
+    return { ...value, timings };
+  }
+  const { docs, changes, ...meta } = value;
+  if (!changes) {
+    return encodeArrowIPC(docs!, schema, meta, withRev);
+  }
+  const { docs: all, inserted = [], updated = [], ...changesMeta } = changes;
+  const rows = changes.type === 'full' ? all! : [...inserted, ...updated];
+  return encodeArrowIPC(
+    rows,
+    schema,
+    { ...meta, changes: { ...changesMeta, inserted: inserted.length } },
+    withRev
+  );
+};
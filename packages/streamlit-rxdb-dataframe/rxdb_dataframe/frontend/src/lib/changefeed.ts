@@ -0,0 +1,160 @@
+import type { Entity, EntityId } from '@ngx-odm/rxdb/utils';
+import type { RxChangeEvent } from 'rxdb';
+import { Observable, Subscription } from 'rxjs';
+
+export type RxDBChangeOperation = 'INSERT' | 'UPDATE' | 'DELETE';
+
+/**
+ * Collection change event forwarded to Python, numbered by the component instance
+ */
+export type RxDBChangeEvent<T extends Entity = Entity> = {
+  seq: number;
+  operation: RxDBChangeOperation;
+  key: EntityId;
+  doc: T | null;
+  previous: T | null;
+};
+
+/**
+ * Change events not acknowledged by Python yet, attached to every component value
+ */
+export type RxDBChangeEvents<T extends Entity = Entity> = {
+  instance: string;
+  dropped: number;
+  events: RxDBChangeEvent<T>[];
+};
+
+/**
+ * Change feed progress sent back by Python (`change_feed` arg): last accepted `seq`
+ */
+export type RxDBChangeFeedAck = {
+  instance?: string | null;
+  ack?: number;
+  dropped?: number;
+};
+
+export const DEFAULT_CHANGE_FEED_BUFFER = 10000;
+// events not followed by a data emission are sent after this delay
+const FLUSH_DELAY_MS = 50;
+// unacknowledged events (Python's subscribers are full) are re-sent at this interval
+const RETRY_MS = 1000;
+const INTERNAL_FIELDS = ['_meta', '_attachments', '_deleted'];
+
+/**
+ * Buffers the collection's change events until Python acknowledges them.
+ *
+ * Events ride along every component value. When no value follows an event, the last value is
+ * re-sent with it; events Python could not accept (backpressure) are re-sent periodically.
+ * When the buffer overflows, the oldest events are dropped and counted, so Python can tell
+ * its subscribers to resync.
+ */
+export class RxDBChangeFeed<T extends Entity = Entity> {
+  readonly instance = Math.random().toString(36).slice(2);
+  private events: RxDBChangeEvent<T>[] = [];
+  private seq = 0;
+  private sentSeq = 0;
+  private sentAt = 0;
+  private dropped = 0;
+  private resend?: () => void;
+  private timer?: ReturnType<typeof setTimeout>;
+
+  constructor(
+    private readonly withRev = false,
+    private readonly maxBuffered = DEFAULT_CHANGE_FEED_BUFFER
+  ) {}
+
+  /**
+   * Buffer the change events of the collection
+   * @param changes$ - `collection.$`
+   */
+  subscribe(changes$: Observable<RxChangeEvent<T>>): Subscription {
+    const sub = changes$.subscribe(event => {
+      if (event.isLocal) {
+        return;
+      }
+      this.events.push({
+        seq: ++this.seq,
+        operation: event.operation,
+        key: event.documentId,
+        doc: this.strip(event.documentData),
+        previous: this.strip(event.previousDocumentData),
+      });
+      const overflow = this.events.length - this.maxBuffered;
+      if (overflow > 0) {
+        this.events.splice(0, overflow);
+        this.dropped += overflow;
+      }
+      this.schedule(FLUSH_DELAY_MS);
+    });
+    sub.add(() => this.cancel());
+    return sub;
+  }
+
+  /**
+   * Drop the events acknowledged by Python
+   * @param progress
+   */
+  ack(progress?: RxDBChangeFeedAck | null) {
+    if (progress?.instance !== this.instance) {
+      return;
+    }
+    const acked = progress.ack ?? 0;
+    this.events = this.events.filter(event => event.seq > acked);
+    if (!this.events.length) {
+      this.cancel();
+    }
+  }
+
+  /** Events to attach to the component value */
+  pending(): RxDBChangeEvents<T> {
+    return { instance: this.instance, dropped: this.dropped, events: [...this.events] };
+  }
+
+  /**
+   * The component value was sent with the pending events
+   * @param resend - sends the value again, with the events pending by then
+   */
+  sent(resend: () => void) {
+    this.resend = resend;
+    this.sentSeq = this.seq;
+    this.sentAt = performance.now();
+    this.cancel();
+    if (this.events.length) {
+      this.schedule(RETRY_MS);
+    }
+  }
+
+  private schedule(delay: number) {
+    if (this.timer || !this.resend) {
+      return;
+    }
+    this.timer = setTimeout(() => {
+      this.timer = undefined;
+      const fresh = this.seq > this.sentSeq;
+      const due = performance.now() - this.sentAt >= RETRY_MS;
+      if (this.events.length && (fresh || due)) {
+        const resend = this.resend!;
+        resend();
+        this.sent(resend);
+      } else if (this.events.length) {
+        this.schedule(RETRY_MS);
+      }
+    }, delay);
+  }
+
+  private cancel() {
+    clearTimeout(this.timer);
+    this.timer = undefined;
+  }
+
+  private strip(data?: Record<string, unknown> | null): T | null {
+    if (!data) {
+      return null;
+    }
+    const doc = { ...data };
+    for (const field of this.withRev ? INTERNAL_FIELDS : [...INTERNAL_FIELDS, '_rev']) {
+      delete doc[field];
+    }
+    return doc as T;
+  }
+}
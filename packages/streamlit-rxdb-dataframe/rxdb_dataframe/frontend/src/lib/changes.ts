@@ -0,0 +1,83 @@
+import type { Entity, EntityId } from '@ngx-odm/rxdb/utils';
+import equal from 'fast-deep-equal';
+
+export type RxDBChangeSetType = 'full' | 'delta';
+
+/**
+ * Change set sent to Python in `delta` mode, keyed by the schema's `primaryKey`
+ */
+export type RxDBChangeSet<T extends Entity = Entity> = {
+  type: RxDBChangeSetType;
+  seq: number;
+  docs?: T[];
+  inserted?: T[];
+  updated?: T[];
+  deleted?: EntityId[];
+};
+
+/**
+ * Keeps the last known result set and produces change sets against it.
+ *
+ * Rows are ordered exactly the way Python patches its dataframe (deleted rows dropped,
+ * updated rows replaced in place, inserted rows appended), so that row positions of
+ * `st.data_editor` editing state resolve to the same documents on both sides.
+ */
+export class RxDBChangeTracker<T extends Entity = Entity> {
+  /** sequence number of the last emitted change set */
+  seq = 0;
+  private entities: T[] = [];
+  private byId = new Map<EntityId, T>();
+
+  constructor(private readonly primaryKey: keyof T & string) {}
+
+  /** Current result set in Python's row order */
+  get docs(): T[] {
+    return this.entities;
+  }
+
+  /**
+   * Replace the tracked result set and return a "full" change set
+   * @param docs
+   */
+  full(docs: T[]): RxDBChangeSet<T> {
+    this.entities = docs;
+    this.byId = new Map(docs.map(doc => [doc[this.primaryKey] as EntityId, doc]));
+    this.seq += 1;
+    return { type: 'full', seq: this.seq, docs };
+  }
+
+  /**
+   * Diff the given result set against the tracked one and return a "delta" change set,
+   * or `null` if nothing has changed
+   * @param docs
+   */
+  delta(docs: T[]): RxDBChangeSet<T> | null {
+    const inserted: T[] = [];
+    const updated: T[] = [];
+    const next = new Map<EntityId, T>();
+    for (const doc of docs) {
+      const id = doc[this.primaryKey] as EntityId;
+      const prev = this.byId.get(id);
+      next.set(id, doc);
+      if (!prev) {
+        inserted.push(doc);
+      } else if (!equal(prev, doc)) {
+        updated.push(doc);
+      }
+    }
+    const deleted = [...this.byId.keys()].filter(id => !next.has(id));
+    if (!inserted.length && !updated.length && !deleted.length) {
+      return null;
+    }
+
+    this.entities = [
+      ...this.entities
+        .filter(doc => next.has(doc[this.primaryKey] as EntityId))
+        .map(doc => next.get(doc[this.primaryKey] as EntityId)!),
+      ...inserted,
+    ];
+    this.byId = next;
+    this.seq += 1;
+    return { type: 'delta', seq: this.seq, inserted, updated, deleted };
+  }
+}
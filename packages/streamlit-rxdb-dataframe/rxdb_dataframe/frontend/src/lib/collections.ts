@@ -0,0 +1,170 @@
+import { RxDBCollectionService } from '@ngx-odm/rxdb/collection';
+import type { RxCollectionCreatorExtended } from '@ngx-odm/rxdb/config';
+import type { RxDBService } from '@ngx-odm/rxdb/core';
+import { NgxRxdbUtils, type Entity } from '@ngx-odm/rxdb/utils';
+import equal from 'fast-deep-equal';
+import { MangoQuery } from 'rxdb';
+import {
+  BehaviorSubject,
+  Subscription,
+  auditTime,
+  combineLatest,
+  distinctUntilChanged,
+  filter,
+  map,
+  withLatestFrom,
+} from 'rxjs';
+import { Streamlit } from 'streamlit-component-lib';
+import { RXDB_PROTOCOL_VERSION, type RxDBSeed } from './RxDBDataframeArgs';
+import { withReplication } from './replication';
+import { RxDBSeedProgress, RxDBSeeder } from './seed';
+
+const { logger } = NgxRxdbUtils;
+
+/** Results of collections changing within this window are sent as one batched value */
+export const RXDB_BATCH_WINDOW_MS = 20;
+
+/**
+ * Result of one collection in the batched value; `docs` are left out if Python already holds
+ * the result of that `version`
+ */
+export type RxDBCollectionResult<T extends Entity = Entity> = {
+  docs?: T[];
+  info: unknown;
+  query: MangoQuery<T>;
+  version: string;
+};
+
+/**
+ * Several collections of one database, each queried with its own query, whose results are
+ * sent to Python as one batched value (`{ results: { [name]: result } }`).
+ *
+ * Every emitted result gets a new `version`. Python reports the versions it holds, so only
+ * the collections whose results changed carry documents.
+ */
+export class RxDBCollectionsBatch {
+  private readonly services = new Map<string, RxDBCollectionService>();
+  private readonly queries = new Map<string, BehaviorSubject<MangoQuery>>();
+  private readonly seeders = new Map<string, RxDBSeeder>();
+  private readonly progress: Record<string, RxDBSeedProgress | null> = {};
+  private results: Record<string, RxDBCollectionResult> = {};
+  private held: Record<string, string> = {};
+
+  constructor(
+    private readonly dbService: RxDBService,
+    private readonly configHash: string,
+    private readonly withRev = false
+  ) {}
+
+  /**
+   * Create (or reuse) the collections, seed them & subscribe to their query results
+   * @param configs - collection configs by name
+   * @param queries - queries by collection name
+   * @param seed - seed documents by collection name
+   */
+  async init(
+    configs: Record<string, RxCollectionCreatorExtended>,
+    queries: Record<string, MangoQuery>,
+    seed: Record<string, RxDBSeed | null> = {}
+  ): Promise<Subscription> {
+    const names = Object.keys(configs);
+    for (const name of names) {
+      const config = withReplication(configs[name]);
+      this.services.set(name, new RxDBCollectionService(config, this.dbService));
+      this.queries.set(name, new BehaviorSubject<MangoQuery>(queries[name] ?? {}));
+      this.seeders.set(
+        name,
+        new RxDBSeeder(this.configHash, progress => this.reportSeed(name, progress))
+      );
+    }
+    await Promise.all(
+      names.map(name => this.seeders.get(name)!.start(this.services.get(name)!, seed[name]))
+    );
+    // replicate in the background the collections with `options.replication`
+    for (const service of this.services.values()) {
+      service.sync().catch(logger.log);
+    }
+    return combineLatest(names.map(name => this.results$(name)))
+      .pipe(auditTime(RXDB_BATCH_WINDOW_MS))
+      .subscribe(results => {
+        this.results = Object.fromEntries(names.map((name, i) => [name, results[i]]));
+        this.send();
+      });
+  }
+
+  /**
+   * Apply the queries sent by Python
+   * @param queries - queries by collection name
+   */
+  query(queries: Record<string, MangoQuery>) {
+    for (const [name, subject] of this.queries) {
+      subject.next(queries[name] ?? {});
+    }
+  }
+
+  /**
+   * Import the chunks of seed documents sent by Python
+   * @param seed - seed documents by collection name
+   */
+  async seed(seed: Record<string, RxDBSeed | null> = {}) {
+    await Promise.all(
+      [...this.seeders].map(([name, seeder]) =>
+        seeder.import(this.services.get(name)!, seed[name])
+      )
+    );
+  }
+
+  /**
+   * Remember the result versions Python holds & re-send the ones it does not hold
+   * @param held - versions by collection name
+   */
+  hold(held: Record<string, string>) {
+    this.held = held;
+    const missing = Object.entries(this.results).some(
+      ([name, result]) => held[name] !== result.version
+    );
+    if (missing) {
+      this.send();
+    }
+  }
+
+  private results$(name: string) {
+    const service = this.services.get(name)!;
+    const query = this.queries.get(name)!;
+    const instance = Math.random().toString(36).slice(2);
+    let emitted = 0;
+    return service.docs(query.pipe(distinctUntilChanged(equal)), this.withRev).pipe(
+      filter(docs => !!docs),
+      withLatestFrom(service.info()),
+      map(
+        ([docs, info]): RxDBCollectionResult => ({
+          docs: docs as Entity[],
+          info,
+          query: query.value,
+          version: `${instance}:${++emitted}`,
+        })
+      )
+    );
+  }
+
+  private send() {
+    const results = Object.fromEntries(
+      Object.entries(this.results).map(([name, result]) => {
+        const { docs, ...meta } = result;
+        return [name, this.held[name] === result.version ? meta : { ...meta, docs }];
+      })
+    );
+    Streamlit.setComponentValue({ results, protocol: RXDB_PROTOCOL_VERSION });
+    Streamlit.setFrameHeight();
+  }
+
+  private reportSeed(name: string, progress: RxDBSeedProgress | null) {
+    this.progress[name] = progress;
+    const seed = { ...this.progress };
+    Streamlit.setComponentValue({
+      config_hash: this.configHash,
+      seed,
+      protocol: RXDB_PROTOCOL_VERSION,
+    });
+  }
+}
@@ -0,0 +1,31 @@
+import type { Entity } from '@ngx-odm/rxdb/utils';
+import type { MangoQuery, RxCollection } from 'rxdb';
+
+export type RxDBPages<T extends Entity = Entity> = Record<number, T[]>;
+
+/**
+ * Executes the query for each requested page with `skip`/`limit` pushed down to RxDB storage
+ * @param collection
+ * @param query
+ * @param pages - indexes of requested pages
+ * @param pageSize
+ * @param withRev
+ */
+export const fetchPages = async <T extends Entity>(
+  collection: RxCollection<T>,
+  query: MangoQuery<T>,
+  pages: number[],
+  pageSize: number,
+  withRev = false
+): Promise<RxDBPages<T>> => {
+  const result: RxDBPages<T> = {};
+  await Promise.all(
+    pages.map(async index => {
+      const docs = await collection
+        .find({ ...query, skip: index * pageSize, limit: pageSize })
+        .exec();
+      result[index] = docs.map(doc => doc.toMutableJSON(withRev as true) as T);
+    })
+  );
+  return result;
+};
@@ -0,0 +1,67 @@
+import type { Entity } from '@ngx-odm/rxdb/utils';
+import type { RxJsonSchema } from 'rxdb';
+
+/**
+ * Returns the document fields to keep for the columns projected by Python (`columns` arg,
+ * dotted paths of flattened columns keep their top-level property), or `null` to keep all.
+ * The primary key is always kept (edits are keyed by it), `_rev` if requested.
+ * @param columns
+ * @param primaryKey
+ * @param withRev
+ */
+export const projectionFields = (
+  columns: string[] | null | undefined,
+  primaryKey: string,
+  withRev = false
+): Set<string> | null => {
+  if (!columns) {
+    return null;
+  }
+  const fields = new Set(columns.map(column => column.split('.')[0]));
+  fields.add(primaryKey);
+  if (withRev) {
+    fields.add('_rev');
+  }
+  return fields;
+};
+
+/**
+ * Strip the documents down to the projected fields
+ * @param docs
+ * @param fields
+ */
+export const projectDocs = <T extends Entity>(
+  docs: T[],
+  fields: Set<string> | null
+): T[] => {
+  if (!fields) {
+    return docs;
+  }
+  return docs.map(doc => {
+    const projected: Entity = {};
+    for (const field of fields) {
+      if (field in doc) {
+        projected[field] = doc[field];
+      }
+    }
+    return projected as T;
+  });
+};
+
+/**
+ * Returns the schema with the projected properties only (encoded as Arrow columns)
+ * @param schema
+ * @param fields
+ */
+export const projectSchema = <T extends Entity>(
+  schema: RxJsonSchema<T>,
+  fields: Set<string> | null
+): RxJsonSchema<T> => {
+  if (!fields) {
+    return schema;
+  }
+  const properties = Object.fromEntries(
+    Object.entries(schema.properties).filter(([name]) => fields.has(name))
+  );
+  return { ...schema, properties } as RxJsonSchema<T>;
+};
@@ -0,0 +1,98 @@
+import type { RxCollectionCreatorExtended } from '@ngx-odm/rxdb/config';
+import type { RxCollection, RxReplicationPullStreamItem } from 'rxdb';
+import { replicateRxCollection } from 'rxdb/plugins/replication';
+import { Subject } from 'rxjs';
+
+/**
+ * `options.replication` of the collection config (see `replication_options` in Python)
+ */
+export type RxDBReplicationOptions = {
+  url: string;
+  live?: boolean;
+  batchSize?: number;
+  /** secret of the server, sent with every request */
+  token?: string;
+};
+
+export type RxDBReplicationCheckpoint = {
+  id: string;
+  updatedAt: number;
+};
+
+const fetchJson = async (input: string, init?: RequestInit) => {
+  const response = await fetch(input, init);
+  if (!response.ok) {
+    // rejected handlers are retried by the replication
+    throw new Error(`${init?.method ?? 'GET'} ${input}: ${response.status}`);
+  }
+  return response.json();
+};
+
+/**
+ * Returns the replication state factory of a collection replicated with the HTTP endpoint
+ * at `url` (checkpoint based `pull`, `push` & server-sent events `pullStream`)
+ * @param options
+ */
+export const httpReplicationFactory =
+  ({ url, live = true, batchSize = 100, token }: RxDBReplicationOptions) =>
+  (collection: RxCollection) => {
+    // in the query, as `EventSource` can not send headers
+    const endpoint = (path: string, params = new URLSearchParams()) => {
+      if (token) {
+        params.set('token', token);
+      }
+      return `${url}/${path}?${params}`;
+    };
+    const pullStream$ = new Subject<RxReplicationPullStreamItem<any, any>>();
+    const source = live ? new EventSource(endpoint('pullStream')) : undefined;
+    if (source) {
+      source.onmessage = event => pullStream$.next(JSON.parse(event.data));
+      // events may have been missed while reconnecting
+      source.onerror = () => pullStream$.next('RESYNC');
+    }
+    const replicationState = replicateRxCollection<any, RxDBReplicationCheckpoint>({
+      collection,
+      replicationIdentifier: `streamlit-rxdb-http-${url}`,
+      live,
+      pull: {
+        async handler(checkpoint, size) {
+          const params = new URLSearchParams({ batchSize: String(size) });
+          if (checkpoint) {
+            params.set('id', checkpoint.id);
+            params.set('updatedAt', String(checkpoint.updatedAt));
+          }
+          return fetchJson(endpoint('pull', params));
+        },
+        batchSize,
+        stream$: pullStream$.asObservable(),
+      },
+      push: {
+        async handler(rows) {
+          return fetchJson(endpoint('push'), {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(rows),
+          });
+        },
+        batchSize,
+      },
+    });
+    replicationState.canceled$.subscribe(canceled => canceled && source?.close());
+    return replicationState;
+  };
+
+/**
+ * Returns the collection config with the replication state factory, if the config has
+ * JSON `options.replication` (functions can not be passed from Python)
+ * @param config
+ */
+export const withReplication = (
+  config: RxCollectionCreatorExtended
+): RxCollectionCreatorExtended => {
+  const options = config.options as { replication?: RxDBReplicationOptions } | undefined;
+  if (!options?.replication) {
+    return config;
+  }
+  const replicationStateFactory = httpReplicationFactory(options.replication);
+  return { ...config, options: { ...config.options, replicationStateFactory } };
+};
@@ -0,0 +1,98 @@
+import { RxDBCollectionService } from '@ngx-odm/rxdb/collection';
+import { firstValueFrom } from 'rxjs';
+import { Streamlit } from 'streamlit-component-lib';
+import { RXDB_PROTOCOL_VERSION, RxDBSeed } from './RxDBDataframeArgs';
+
+/**
+ * Seeding progress reported to Python, which answers with the next chunk
+ */
+export type RxDBSeedProgress = {
+  digest: string;
+  total: number;
+  loaded: number;
+  done: boolean;
+};
+
+/**
+ * Imports seed documents (`initialDocs`), which Python sends in bounded chunks on request,
+ * instead of passing them with the collection config on every rerun.
+ *
+ * The collection is seeded only if it is empty. Every control message sent to Python carries
+ * the hash of the static config the component was initialized with, so Python stops sending it.
+ */
+export class RxDBSeeder {
+  private progress: RxDBSeedProgress | null = null;
+  private importing = false;
+  private resolve!: () => void;
+  /** resolves once the collection is seeded (or does not need to be) */
+  readonly seeded = new Promise<void>(resolve => (this.resolve = resolve));
+
+  /**
+   * @param configHash
+   * @param onProgress - report the progress instead of sending it as the component value
+   */
+  constructor(
+    private readonly configHash: string,
+    private readonly onProgress?: (progress: RxDBSeedProgress | null) => void
+  ) {}
+
+  /**
+   * Check if the collection needs seeding & report it to Python
+   * @param collectionService
+   * @param seed - digest & total of the seed documents
+   */
+  async start(collectionService: RxDBCollectionService, seed?: RxDBSeed | null) {
+    const total = seed?.total ?? 0;
+    const count = total ? await firstValueFrom(collectionService.count()) : 0;
+    const done = !total || count > 0;
+    this.progress = total ? { digest: seed!.digest, total, loaded: 0, done } : null;
+    this.report();
+    if (done) {
+      this.resolve();
+    }
+    return this.seeded;
+  }
+
+  /**
+   * Import the chunk of seed documents sent by Python & report the progress
+   * @param collectionService
+   * @param seed
+   */
+  async import(collectionService: RxDBCollectionService, seed?: RxDBSeed | null) {
+    const progress = this.progress;
+    if (
+      this.importing ||
+      !progress ||
+      progress.done ||
+      !seed?.docs ||
+      seed.digest !== progress.digest ||
+      seed.offset !== progress.loaded
+    ) {
+      return;
+    }
+    this.importing = true;
+    try {
+      await collectionService.upsertBulk(seed.docs);
+      progress.loaded += seed.docs.length;
+      progress.done = !seed.docs.length || progress.loaded >= progress.total;
+    } finally {
+      this.importing = false;
+    }
+    this.report();
+    if (progress.done) {
+      this.resolve();
+    }
+  }
+
+  private report() {
+    if (this.onProgress) {
+      this.onProgress(this.progress && { ...this.progress });
+      return;
+    }
+    Streamlit.setComponentValue({
+      config_hash: this.configHash,
+      seed: this.progress && { ...this.progress },
+      protocol: RXDB_PROTOCOL_VERSION,
+    });
+  }
+}
@@ -0,0 +1,18 @@
+/**
+ * Timings reported to Python alongside collection `info`
+ * (`query_ms` - RxDB query time, `diff_ms` - change set computation time in `delta` mode,
+ * `encode_ms` - result encoding time).
+ */
+export type RxDBTimings = {
+  query_ms?: number;
+  diff_ms?: number;
+  encode_ms?: number;
+  payload_bytes?: number;
+};
+
+/**
+ * Returns milliseconds elapsed since `started` (a `performance.now()` value).
+ * @param started
+ */
+export const elapsed = (started: number): number =>
+  Math.round((performance.now() - started) * 1000) / 1000;
@@ -0,0 +1,107 @@
+/**
+ * Update policy of `rxdb_dataframe` (`update_policy` arg, see `UpdatePolicy` in Python)
+ * (`min_interval` - milliseconds between updates, `trailing` - flush the last update held back
+ * within the interval, `max_batch` - flush at once when that many collection changes are
+ * pending, `pause_ms` - hold updates back for that long, while the data editor is in use).
+ */
+export type RxDBUpdatePolicy = {
+  min_interval?: number;
+  trailing?: boolean;
+  max_batch?: number | null;
+  pause_ms?: number;
+};
+
+/**
+ * Update counters reported to Python alongside the component value
+ * (`emitted` - query results, `sent` - component values, `merged` - results superseded by
+ * a later one within the window, `suppressed` - results dropped without a trailing flush).
+ */
+export type RxDBUpdateStats = {
+  emitted: number;
+  sent: number;
+  merged: number;
+  suppressed: number;
+};
+
+/**
+ * Coalesces query results into component values (every value triggers a script rerun).
+ *
+ * Only the latest result is kept: it is sent at once, unless the last value was sent less than
+ * `min_interval` ago or updates are paused; then it is sent at the end of the window (if
+ * `trailing`, dropped otherwise) or as soon as `max_batch` collection changes are pending.
+ * The update is built when it is sent, so change sets cover all the changes merged into it.
+ */
+export class RxDBUpdateCoalescer {
+  readonly stats: RxDBUpdateStats = { emitted: 0, sent: 0, merged: 0, suppressed: 0 };
+  private policy: RxDBUpdatePolicy = {};
+  private pending?: () => boolean;
+  private batch = 0;
+  private sentAt = -Infinity;
+  private pausedUntil = 0;
+  private timer?: ReturnType<typeof setTimeout>;
+
+  /**
+   * Apply the policy sent by Python (on every render, `pause_ms` is relative to it)
+   * @param policy
+   */
+  configure(policy?: RxDBUpdatePolicy | null) {
+    this.policy = policy ?? {};
+    this.pausedUntil = this.policy.pause_ms ? performance.now() + this.policy.pause_ms : 0;
+    this.schedule();
+  }
+
+  /**
+   * Queue the update, superseding the pending one
+   * @param send - sends the component value, returns `false` if there was nothing to send
+   * @param batch - collection changes since the last sent value
+   */
+  push(send: () => boolean, batch = 1) {
+    this.stats.emitted++;
+    if (this.pending) {
+      this.stats.merged++;
+    }
+    this.pending = send;
+    this.batch = batch;
+    this.schedule();
+  }
+
+  /** Cancel the pending update */
+  cancel() {
+    clearTimeout(this.timer);
+    this.timer = undefined;
+    this.pending = undefined;
+  }
+
+  private schedule() {
+    clearTimeout(this.timer);
+    this.timer = undefined;
+    if (!this.pending) {
+      return;
+    }
+    const { min_interval = 0, trailing = true, max_batch } = this.policy;
+    const now = performance.now();
+    const paused = this.pausedUntil > now;
+    const full = !!max_batch && this.batch >= max_batch;
+    const due = full ? now : this.sentAt + min_interval;
+    const wait = (paused ? this.pausedUntil : due) - now;
+    if (wait <= 0) {
+      this.flush();
+    } else if (!trailing && !paused) {
+      this.pending = undefined;
+      this.stats.suppressed++;
+    } else {
+      this.timer = setTimeout(() => this.schedule(), wait);
+    }
+  }
+
+  private flush() {
+    const send = this.pending!;
+    this.pending = undefined;
+    this.stats.sent++; // reported with the value
+    if (send()) {
+      this.sentAt = performance.now();
+    } else {
+      this.stats.sent--;
+    }
+  }
+}
@@ -7,14 +7,14 @@ import { RxDBDataframeArgs } from './RxDBDataframeArgs';
  * Returns `RenderData` received from Streamlit after the first render event received.
  * @param sub Subscriptions holder
  */
-export const useNullableRenderData = (
+export const useNullableRenderData = <A = RxDBDataframeArgs>(
   sub: Subscription
-): RenderData<RxDBDataframeArgs> | undefined => {
-  const [renderData, setRenderData] = useState<RenderData<RxDBDataframeArgs>>();
+): RenderData<A> | undefined => {
+  const [renderData, setRenderData] = useState<RenderData<A>>();
 
   useEffect(() => {
     const onRenderEvent = (event: Event): void => {
-      const renderEvent = event as CustomEvent<RenderData>;
+      const renderEvent = event as CustomEvent<RenderData<A>>;
       setRenderData(renderEvent.detail);
     };
 
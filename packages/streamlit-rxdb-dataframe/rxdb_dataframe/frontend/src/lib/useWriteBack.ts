@@ -0,0 +1,92 @@
+import { RxDBCollectionService } from '@ngx-odm/rxdb/collection';
+import { NgxRxdbUtils, type Entity } from '@ngx-odm/rxdb/utils';
+import { useEffect, useRef } from 'react';
+import { RxDBWriteSet } from './RxDBDataframeArgs';
+
+const { logger, isEmpty } = NgxRxdbUtils;
+
+/**
+ * Apply the write set: one bulk upsert (added docs & patched ones) and one bulk remove.
+ * Patches are merged into the stored documents, `null` fields are removed.
+ * @param collectionService
+ * @param writes
+ */
+export const writeBack = async (
+  collectionService: RxDBCollectionService,
+  writes: RxDBWriteSet
+) => {
+  const { collection } = collectionService;
+  const { primaryPath, jsonSchema } = collection.schema;
+  const now = Date.now();
+  const properties = jsonSchema.properties as Record<string, unknown>;
+  const stamp = (doc: Entity, added = false): Entity => ({
+    ...(added && 'createdAt' in properties && !doc['createdAt']
+      ? { createdAt: new Date(now).toISOString() }
+      : {}),
+    ...doc,
+    ...('last_modified' in properties ? { last_modified: now } : {}),
+  });
+
+  const docs = writes.upsert.map(doc => stamp(doc, true));
+  if (!isEmpty(writes.patch)) {
+    const ids = writes.patch.map(patch => patch[primaryPath] as string);
+    const found = await collection.findByIds(ids).exec();
+    writes.patch.forEach(patch => {
+      const doc = found.get(patch[primaryPath] as string);
+      if (!doc) {
+        return;
+      }
+      const merged: Entity = { ...doc.toMutableJSON(), ...patch };
+      Object.keys(patch)
+        .filter(key => patch[key] === null)
+        .forEach(key => delete merged[key]);
+      docs.push(stamp(merged));
+    });
+  }
+
+  if (docs.length) {
+    await collectionService.upsertBulk(docs);
+  }
+  if (writes.remove.length) {
+    await collectionService.removeBulk(writes.remove as string[]);
+  }
+};
+
+/**
+ * Custom hook that writes data editor edits (write sets computed by Python) back to the
+ * collection. Write sets are cumulative, so the ones arriving within the debounce window are
+ * coalesced: only the latest one is written, in a single flush.
+ * @param writes - The latest write set.
+ * @param debounce - Debounce window in milliseconds.
+ * @param collectionService - The service used to interact with the RxDB collection.
+ */
+export const useWriteBack = (
+  writes: RxDBWriteSet | null | undefined,
+  debounce: number | undefined,
+  collectionService: RxDBCollectionService | undefined
+) => {
+  const pendingRef = useRef<RxDBWriteSet>();
+  const writtenRef = useRef<number>();
+  const timerRef = useRef<ReturnType<typeof setTimeout>>();
+
+  useEffect(() => {
+    if (
+      !writes ||
+      !collectionService ||
+      writes.id === writtenRef.current ||
+      writes.id === pendingRef.current?.id
+    ) {
+      return;
+    }
+    pendingRef.current = writes;
+    clearTimeout(timerRef.current);
+    timerRef.current = setTimeout(() => {
+      const pending = pendingRef.current!;
+      pendingRef.current = undefined;
+      writtenRef.current = pending.id;
+      writeBack(collectionService, pending).catch(error => logger.log('writeBack', error));
+    }, debounce ?? 0);
+  }, [writes, debounce, collectionService]);
+
+  useEffect(() => () => clearTimeout(timerRef.current), []);
+};
@@ -0,0 +1,347 @@
+"""
+Secondary indexes over the cached collection dataframe, declared by the schema's `indexes` and
+`internalIndexes` (including compound ones).
+
+Like RxDB, every index ends with the primary key, so keys are unique and index order is total.
+An index is a sorted position array: row positions ordered by the index fields, with the sorted
+field values next to it. Equality on a prefix of the fields and a range on the next field are
+answered by binary search in O(log n + k), sort by the index fields (all ascending or all
+descending) is the position array itself (or reversed). Rows with a missing value in any of the
+index fields are not indexed (RxDB requires indexed fields to be set); queries on such indexes
+still work, as the index only narrows the candidate rows.
+
+In `delta` mode the indexes are patched with the change set (removed entries dropped, positions
+shifted, new entries merged in) instead of being rebuilt.
+"""
+
+import weakref
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .mango import _coerce_value
+
+Fields = Tuple[str, ...]
+# changes adding more than this fraction of the index are applied by rebuilding it
+REBUILD_FRACTION = 0.125
+# candidates of more than this fraction of the rows are not worth gathering, scan instead
+SELECTIVITY = 0.1
+RANGE_OPERATORS = ("$gt", "$gte", "$lt", "$lte")
+
+
+def schema_indexes(schema: dict, primary_key: Optional[str] = None) -> List[Fields]:
+    """
+    Returns fields of the schema's `indexes` & `internalIndexes`, each ending with the primary
+    key. Internal fields (`_deleted`, `_meta.lwt`, ...) are skipped.
+    """
+    indexes: List[Fields] = []
+    for index in list(schema.get("indexes") or []) + list(schema.get("internalIndexes") or []):
+        fields = [index] if isinstance(index, str) else list(index)
+        fields = [field for field in fields if not field.startswith("_")]
+        if primary_key and primary_key not in fields:
+            fields.append(primary_key)
+        if fields and tuple(fields) not in indexes:
+            indexes.append(tuple(fields))
+    return indexes
+
+
+def _sortable(series: pd.Series) -> np.ndarray:
+    """Values of the (non-null) series as a NumPy array ordered like the column values"""
+    if series.dtype.kind == "M":
+        return series.to_numpy(dtype="datetime64[ns]").view("int64")
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(object).to_numpy()
+    numpy_dtype = getattr(series.dtype, "numpy_dtype", None)
+    if numpy_dtype is not None and numpy_dtype.kind in "biuf":
+        return series.to_numpy(dtype=numpy_dtype)
+    return series.to_numpy()
+
+
+def _lexorder(keys: Sequence[np.ndarray]) -> np.ndarray:
+    """Positions ordering the rows by the keys (the first key is the primary one)"""
+    codes = [
+        pd.factorize(key, sort=True)[0] if key.dtype == object else key for key in reversed(keys)
+    ]
+    return np.lexsort(codes)
+
+
+class SortedIndex:
+    """
+    Row positions of the dataframe sorted by the index `fields`
+    """
+
+    def __init__(self, fields: Fields):
+        self.fields = tuple(fields)
+        self.positions = np.empty(0, dtype=np.int64)
+        self.keys: List[np.ndarray] = []
+        self.rows = 0  # rows of the indexed dataframe (indexed or not)
+        self._probes: List[pd.Series] = []
+        self._rank: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def _entries(self, df: pd.DataFrame, positions: np.ndarray) -> Tuple[np.ndarray, List]:
+        columns = [df[field].iloc[positions] for field in self.fields]
+        notna = np.logical_and.reduce([column.notna().to_numpy() for column in columns])
+        return positions[notna], [_sortable(column[notna]) for column in columns]
+
+    def build(self, df: pd.DataFrame) -> "SortedIndex":
+        self._probes = [df[field].iloc[:0] for field in self.fields]
+        positions, keys = self._entries(df, np.arange(len(df), dtype=np.int64))
+        order = _lexorder(keys)
+        self.positions = positions[order]
+        self.keys = [key[order] for key in keys]
+        self.rows = len(df)
+        self._rank = None
+        return self
+
+    def _key(self, i: int, value: Any) -> Any:
+        probe = self._probes[i]
+        value = _coerce_value(probe, value)
+        return value.value if probe.dtype.kind == "M" else value
+
+    def bounds(
+        self,
+        prefix: Sequence[Any] = (),
+        lower: Any = None,
+        upper: Any = None,
+        lower_inclusive: bool = True,
+        upper_inclusive: bool = True,
+    ) -> Tuple[int, int]:
+        """
+        Returns the slice of the index matching equality on the leading fields (`prefix`) and
+        the optional range on the next field
+        """
+        lo, hi = 0, len(self.positions)
+        for i, value in enumerate(prefix):
+            part, key = self.keys[i][lo:hi], self._key(i, value)
+            lo, hi = (
+                lo + int(np.searchsorted(part, key, "left")),
+                lo + int(np.searchsorted(part, key, "right")),
+            )
+        if lower is None and upper is None:
+            return lo, hi
+        i = len(prefix)
+        part = self.keys[i][lo:hi]
+        start, end = lo, hi
+        if lower is not None:
+            side = "left" if lower_inclusive else "right"
+            start = lo + int(np.searchsorted(part, self._key(i, lower), side))
+        if upper is not None:
+            side = "right" if upper_inclusive else "left"
+            end = lo + int(np.searchsorted(part, self._key(i, upper), side))
+        return start, max(start, end)
+
+    def lookup(self, *values: Any) -> np.ndarray:
+        """Row positions with the leading index fields equal to `values`, in index order"""
+        lo, hi = self.bounds(values)
+        return self.positions[lo:hi]
+
+    def range(self, prefix: Sequence[Any] = (), **bounds: Any) -> np.ndarray:
+        """Row positions in the range (see `bounds`) of the field following `prefix`"""
+        lo, hi = self.bounds(prefix, **bounds)
+        return self.positions[lo:hi]
+
+    @property
+    def complete(self) -> bool:
+        """All rows are indexed (no missing values in the index fields)"""
+        return len(self.positions) == self.rows
+
+    @property
+    def rank(self) -> np.ndarray:
+        """Index order of every row position (inverse of `positions`)"""
+        if self._rank is None:
+            self._rank = np.empty(self.rows, dtype=np.int64)
+            self._rank[self.positions] = np.arange(len(self.positions))
+        return self._rank
+
+    def _insertion_point(self, key: Sequence[Any]) -> int:
+        lo, hi = 0, len(self.positions)
+        for column, value in zip(self.keys, key):
+            part = column[lo:hi]
+            left, right = np.searchsorted(part, value, "left"), np.searchsorted(part, value, "right")
+            if left == right:
+                return lo + int(left)
+            lo, hi = lo + int(left), lo + int(right)
+        return hi
+
+    def update(
+        self,
+        df: pd.DataFrame,
+        removed: np.ndarray,
+        deleted: np.ndarray,
+        added: np.ndarray,
+    ) -> None:
+        """
+        Patch the index of the previous dataframe to index `df`: drop entries of the `removed`
+        positions (deleted & replaced rows), shift positions following the `deleted` ones and
+        merge in entries of the `added` positions (of `df`).
+        """
+        if len(added) > REBUILD_FRACTION * max(len(self.positions), 1):
+            self.build(df)
+            return
+        keep = ~np.isin(self.positions, removed)
+        positions = self.positions[keep]
+        keys = [key[keep] for key in self.keys]
+        positions -= np.searchsorted(np.sort(deleted), positions)
+
+        new_positions, new_keys = self._entries(df, np.asarray(added, dtype=np.int64))
+        if len(new_positions):
+            order = _lexorder(new_keys)
+            new_positions = new_positions[order]
+            new_keys = [key[order] for key in new_keys]
+            self.positions, self.keys = positions, keys
+            if len(keys) == 1:
+                points = np.searchsorted(keys[0], new_keys[0], "right")
+            else:
+                points = np.array(
+                    [self._insertion_point(key) for key in zip(*new_keys)], dtype=np.int64
+                )
+            positions = np.insert(positions, points, new_positions)
+            keys = [np.insert(key, points, new) for key, new in zip(keys, new_keys)]
+        self.positions, self.keys = positions, keys
+        self.rows = len(df)
+        self._rank = None
+
+
+def _conditions(selector: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Top-level (and `$and`-ed) field conditions usable by indexes: scalar `$eq` & ranges"""
+    conditions: Dict[str, Dict[str, Any]] = {}
+    parts = [selector or {}]
+    while parts:
+        for field, condition in parts.pop().items():
+            if field == "$and":
+                parts.extend(condition)
+                continue
+            if field.startswith("$"):
+                continue
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            usable = {
+                op: value
+                for op, value in condition.items()
+                if value is not None
+                and not isinstance(value, (list, dict))
+                and (op == "$eq" or op in RANGE_OPERATORS)
+            }
+            conditions.setdefault(field, {}).update(usable)
+    return conditions
+
+
+class DataFrameIndexes:
+    """
+    Secondary indexes of a dataframe, kept up to date with it
+    """
+
+    def __init__(self, indexes: Iterable[Fields]):
+        self.fields: List[Fields] = [tuple(fields) for fields in indexes]
+        self.indexes: Dict[Fields, SortedIndex] = {
+            fields: SortedIndex(fields) for fields in self.fields
+        }
+        self._source: Optional[weakref.ref] = None
+        self.builds = 0
+        self.updates = 0
+
+    def __getitem__(self, fields) -> SortedIndex:
+        return self.indexes[(fields,) if isinstance(fields, str) else tuple(fields)]
+
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+    def indexes_frame(self, df: pd.DataFrame) -> bool:
+        """The indexes are up to date with this very dataframe"""
+        return self._source is not None and self._source() is df
+
+    def build(self, df: pd.DataFrame) -> None:
+        self.indexes = {
+            fields: SortedIndex(fields).build(df)
+            for fields in self.fields
+            if all(field in df.columns for field in fields)
+        }
+        self._source = weakref.ref(df)
+        self.builds += 1
+
+    def refresh(self, df: pd.DataFrame) -> None:
+        """Rebuild the indexes, unless they are up to date with this very dataframe"""
+        if not self.indexes_frame(df):
+            self.build(df)
+
+    def update(
+        self,
+        previous: pd.DataFrame,
+        df: pd.DataFrame,
+        changes: Dict[str, Any],
+        primary_key: str,
+    ) -> None:
+        """
+        Patch the indexes of the primary-key indexed `previous` dataframe with the "delta"
+        change set applied to it, resulting in `df`
+        """
+        if self._source is None or self._source() is not previous:
+            return self.build(df)
+        deleted_keys = list(changes.get("deleted") or [])
+        added_keys: List[Any] = []
+        for docs in (changes.get("inserted"), changes.get("updated")):
+            if isinstance(docs, pd.DataFrame):
+                added_keys.extend(docs[primary_key].tolist())
+            elif docs:
+                added_keys.extend(doc[primary_key] for doc in docs)
+        removed = previous.index.get_indexer(deleted_keys + added_keys)
+        deleted = previous.index.get_indexer(deleted_keys)
+        added = np.unique(df.index.get_indexer(added_keys))
+        for index in self.indexes.values():
+            index.update(df, removed[removed >= 0], deleted[deleted >= 0], added[added >= 0])
+        self._source = weakref.ref(df)
+        self.updates += 1
+
+    def candidates(self, selector: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """
+        Row positions possibly matching the selector, narrowed by the best index (longest
+        equality prefix, then a range), or `None` if no index applies or it narrows the rows
+        to more than `SELECTIVITY` of them. Positions are in index order, the full selector
+        still has to be evaluated over them.
+        """
+        conditions = _conditions(selector)
+        best: Optional[Tuple[int, SortedIndex, List[Any], Dict[str, Any]]] = None
+        for index in self.indexes.values():
+            prefix: List[Any] = []
+            for field in index.fields:
+                if "$eq" not in conditions.get(field, {}):
+                    break
+                prefix.append(conditions[field]["$eq"])
+            bounds: Dict[str, Any] = {}
+            if len(prefix) < len(index.fields):
+                ranges = conditions.get(index.fields[len(prefix)], {})
+                for op, value in ranges.items():
+                    if op in ("$gt", "$gte"):
+                        bounds.update(lower=value, lower_inclusive=op == "$gte")
+                    elif op in ("$lt", "$lte"):
+                        bounds.update(upper=value, upper_inclusive=op == "$lte")
+            score = 2 * len(prefix) + (1 if bounds else 0)
+            if score and (best is None or score > best[0]):
+                best = (score, index, prefix, bounds)
+        if best is None:
+            return None
+        _, index, prefix, bounds = best
+        try:
+            lo, hi = index.bounds(prefix, **bounds)
+        except TypeError:
+            return None  # values not comparable with the column, e.g. string vs number
+        if hi - lo > SELECTIVITY * index.rows:
+            return None
+        return index.positions[lo:hi]
+
+    def order(self, sort: Sequence[Tuple[str, str]]) -> Optional[np.ndarray]:
+        """
+        Row positions sorted by `sort` (`(field, "asc" | "desc")` pairs, in one direction), if
+        an index has exactly the sort fields and covers all rows, else `None`. Index fields end
+        with the primary key, which `query_dataframe` appends to the sort as well.
+        """
+        fields = tuple(field for field, _ in sort)
+        directions = {direction for _, direction in sort}
+        index = self.indexes.get(fields)
+        if index is None or len(directions) != 1 or not index.complete:
+            return None
+        return index.positions[::-1] if "desc" in directions else index.positions
@@ -0,0 +1,354 @@
+"""
+Vectorized evaluation of RxDB MangoQuery over a cached `pandas.DataFrame`.
+
+Selectors are compiled to pandas/NumPy boolean masks, following RxDB (mingo) semantics:
+missing values and `null` are the same thing (`NaN`/`None`/`NA` in the frame), they match
+`{"$eq": None}` & `{"$ne": <value>}` but never match range operators.
+
+Supported: `$eq`, `$ne`, `$gt`, `$gte`, `$lt`, `$lte`, `$in`, `$nin`, `$regex` (+ `$options`),
+`$exists`, `$and`, `$or`, `$nor`, `$not`, plus `sort`, `skip` and `limit`.
+Unsupported operators raise `NotImplementedError`, so callers can fall back to RxDB.
+"""
+
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+Mask = np.ndarray
+Predicate = Callable[[pd.DataFrame], Mask]
+
+_REGEX_FLAGS = {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL, "x": re.VERBOSE}
+
+
+def _column(df: pd.DataFrame, path: str) -> pd.Series:
+    """
+    Returns values of the (dotted) field path: a column or a nested value of an object column.
+    """
+    if path in df.columns:
+        return df[path]
+    head, _, rest = path.partition(".")
+    if not rest or head not in df.columns:
+        return pd.Series(None, index=df.index, dtype=object)
+
+    def get(value):
+        for key in rest.split("."):
+            value = value.get(key) if isinstance(value, dict) else None
+        return value
+
+    return df[head].map(get)
+
+
+def _coerce_value(series: pd.Series, value: Any) -> Any:
+    """
+    Coerce query value to the column dtype, e.g. ISO string or epoch ms to `Timestamp`.
+    """
+    if value is None or series.dtype.kind != "M":
+        return value
+    tz = getattr(series.dtype, "tz", None) or getattr(
+        getattr(series.dtype, "pyarrow_dtype", None), "tz", None
+    )
+    if isinstance(value, (int, float)):
+        stamp = pd.Timestamp(value, unit="ms", tz="UTC")
+    else:
+        stamp = pd.Timestamp(value)
+        stamp = stamp.tz_localize("UTC") if stamp.tzinfo is None else stamp
+    return stamp if tz else stamp.tz_convert(None)
+
+
+def _mask(result) -> Mask:
+    if isinstance(result, pd.Series):
+        return result.to_numpy(dtype=bool, na_value=False)
+    return np.asarray(result, dtype=bool)
+
+
+def _comparable(series: pd.Series) -> pd.Series:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(object)
+    return series
+
+
+def _eq(series: pd.Series, value: Any) -> Mask:
+    if value is None:
+        return _mask(series.isna())
+    if isinstance(value, (list, dict)):
+        return _mask(series.map(lambda v: v == value))
+    return _mask(series.eq(_coerce_value(series, value)))
+
+
+def _compare(op: str) -> Callable[[pd.Series, Any], Mask]:
+    def compare(series: pd.Series, value: Any) -> Mask:
+        if value is None:
+            return np.zeros(len(series), dtype=bool)
+        series = _comparable(series)
+        value = _coerce_value(series, value)
+        try:
+            return _mask(getattr(series, op)(value))
+        except TypeError:
+            # mixed types are never matched by range operators
+            return _mask(series.map(lambda v: _safe_compare(op, v, value)))
+
+    return compare
+
+
+def _safe_compare(op: str, left: Any, right: Any) -> bool:
+    try:
+        return bool(getattr(left, f"__{op}__")(right) is True)
+    except TypeError:
+        return False
+
+
+def _in(series: pd.Series, values: List[Any]) -> Mask:
+    if not isinstance(values, list):
+        raise ValueError("$in/$nin expects a list")
+    scalars = [_coerce_value(series, v) for v in values if v is not None]
+    mask = _mask(_comparable(series).isin(scalars))
+    if any(v is None for v in values):
+        mask |= _mask(series.isna())
+    return mask
+
+
+def _regex(series: pd.Series, pattern: str, options: str = "") -> Mask:
+    flags = 0
+    for option in options or "":
+        flags |= _REGEX_FLAGS.get(option, 0)
+    compiled = re.compile(pattern, flags)
+    return _mask(series.map(lambda v: isinstance(v, str) and compiled.search(v) is not None))
+
+
+def _compile_field(path: str, condition: Any) -> Predicate:
+    """
+    Compile field condition: a value (implicit `$eq`) or an operator expression.
+    """
+    if not isinstance(condition, dict) or not any(k.startswith("$") for k in condition):
+        return lambda df: _eq(_column(df, path), condition)
+
+    predicates: List[Predicate] = []
+    for op, value in condition.items():
+        if op == "$options":
+            continue
+        if op == "$eq":
+            predicates.append(lambda df, v=value: _eq(_column(df, path), v))
+        elif op == "$ne":
+            predicates.append(lambda df, v=value: ~_eq(_column(df, path), v))
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            compare = _compare(op[1:].replace("gte", "ge").replace("lte", "le"))
+            predicates.append(lambda df, v=value, c=compare: c(_column(df, path), v))
+        elif op == "$in":
+            predicates.append(lambda df, v=value: _in(_column(df, path), v))
+        elif op == "$nin":
+            predicates.append(lambda df, v=value: ~_in(_column(df, path), v))
+        elif op == "$regex":
+            options = condition.get("$options", "")
+            predicates.append(lambda df, v=value, o=options: _regex(_column(df, path), v, o))
+        elif op == "$exists":
+            predicates.append(lambda df, v=value: _mask(_column(df, path).notna()) == bool(v))
+        elif op == "$not":
+            inner = _compile_field(path, value)
+            predicates.append(lambda df, p=inner: ~p(df))
+        else:
+            raise NotImplementedError(f"Mango operator {op} is not supported")
+    return _all(predicates)
+
+
+def _all(predicates: List[Predicate]) -> Predicate:
+    def predicate(df: pd.DataFrame) -> Mask:
+        mask = np.ones(len(df), dtype=bool)
+        for p in predicates:
+            mask &= p(df)
+        return mask
+
+    return predicate
+
+
+def _any(predicates: List[Predicate]) -> Predicate:
+    def predicate(df: pd.DataFrame) -> Mask:
+        mask = np.zeros(len(df), dtype=bool)
+        for p in predicates:
+            mask |= p(df)
+        return mask
+
+    return predicate
+
+
+def compile_selector(selector: Optional[Dict[str, Any]]) -> Predicate:
+    """
+    Compile Mango selector into a function returning boolean mask of matching rows.
+    """
+    predicates: List[Predicate] = []
+    for key, condition in (selector or {}).items():
+        if key == "$and":
+            predicates.append(_all([compile_selector(s) for s in condition]))
+        elif key == "$or":
+            predicates.append(_any([compile_selector(s) for s in condition]))
+        elif key == "$nor":
+            inner = _any([compile_selector(s) for s in condition])
+            predicates.append(lambda df, p=inner: ~p(df))
+        elif key.startswith("$"):
+            raise NotImplementedError(f"Mango operator {key} is not supported")
+        else:
+            predicates.append(_compile_field(key, condition))
+    return _all(predicates)
+
+
+class LocalQuery:
+    """
+    Local query evaluation of `rxdb_dataframe` over the cached dataframe: queries narrowing the
+    subscribed one are evaluated in Python (`narrowing`), & the schema's indexes are maintained
+    over the frame for equality & range predicates and sorting (`secondary_indexes`).
+    """
+
+    def __init__(self, narrowing: bool = True, secondary_indexes: bool = False):
+        self.narrowing = narrowing
+        self.secondary_indexes = secondary_indexes
+
+
+def query_dataframe(
+    df: pd.DataFrame,
+    query: Optional[Dict[str, Any]],
+    primary_key: Optional[str] = None,
+    indexes=None,
+) -> pd.DataFrame:
+    """
+    Evaluate MangoQuery (`selector`, `sort`, `skip`, `limit`) over the dataframe.
+    Like RxDB, the primary key is used as the last sort field to get a deterministic order (also
+    without `sort`, so `skip`/`limit` page like the browser) and missing values sort lowest:
+    first in ascending, last in descending order.
+
+    With secondary `indexes` of this very dataframe (see `rxdb_dataframe.indexes`), the selector
+    is evaluated only over the rows the best matching index narrows it to, and the sort is taken
+    from the index order when an index has exactly the sort fields.
+    """
+    query = query or {}
+    predicate = compile_selector(query.get("selector"))
+
+    sort = [next(iter(part.items())) for part in query.get("sort") or []]
+    if primary_key and primary_key in df.columns and primary_key not in dict(sort):
+        sort.append((primary_key, "asc"))
+
+    positions, presorted = None, False
+    if indexes is not None:
+        candidates = indexes.candidates(query.get("selector"))
+        ordered = indexes.order(sort) if sort else None
+        presorted = ordered is not None
+        if presorted and candidates is not None:
+            index = indexes[tuple(field for field, _ in sort)]
+            positions = index.positions[np.sort(index.rank[candidates])]
+            positions = positions[::-1] if sort[0][1] == "desc" else positions
+        elif presorted:
+            positions = ordered
+        elif candidates is not None:
+            positions = np.sort(candidates)
+    if positions is not None:
+        view = df.iloc[positions]
+        result = view[predicate(view)]
+    else:
+        result = df[predicate(df)]
+
+    if sort and not presorted:
+        result = _sort_frame(result, sort)
+
+    skip = query.get("skip") or 0
+    limit = query.get("limit")
+    if skip or limit is not None:
+        result = result.iloc[skip : None if limit is None else skip + limit]
+    return result
+
+
+def _sort_frame(df: pd.DataFrame, sort: List[Tuple[str, str]]) -> pd.DataFrame:
+    """
+    Sort by the `(field, direction)` pairs with missing values lowest, i.e. `na_position` per
+    direction (one stable sort per field, from the last one)
+    """
+    if len(sort) == 1 and sort[0][1] == "asc" and df[sort[0][0]].is_monotonic_increasing:
+        return df  # already in primary key order, e.g. as sent by the browser
+    for field, direction in reversed(sort):
+        ascending = direction == "asc"
+        df = df.sort_values(
+            by=field,
+            ascending=ascending,
+            kind="stable",
+            na_position="first" if ascending else "last",
+        )
+    return df
+
+
+def _normalize_selector(selector: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    normalized: Dict[str, Any] = {}
+    for key, condition in (selector or {}).items():
+        if key in ("$and", "$or", "$nor"):
+            normalized[key] = [_normalize_selector(s) for s in condition]
+        elif isinstance(condition, dict) and any(k.startswith("$") for k in condition):
+            normalized[key] = {
+                op: _normalize_condition(op, value) for op, value in condition.items()
+            }
+        else:
+            normalized[key] = {"$eq": condition}  # implicit equality
+    return normalized
+
+
+def _normalize_condition(op: str, value: Any) -> Any:
+    if op in ("$in", "$nin") and isinstance(value, list):
+        return sorted(value, key=lambda v: json.dumps(v, sort_keys=True, default=str))
+    if op == "$not" and isinstance(value, dict):
+        return {k: _normalize_condition(k, v) for k, v in value.items()}
+    return value
+
+
+def normalize_query(query: Optional[Dict[str, Any]]) -> str:
+    """
+    Returns canonical string form of the query, equal for equivalent queries:
+    sorted keys, implicit equality as `$eq`, sorted `$in`/`$nin` values, no default
+    `sort`/`skip`/`limit`.
+    """
+    normalized = {
+        key: value
+        for key, value in (query or {}).items()
+        if key not in ("selector", "sort", "skip", "limit")
+    }
+    normalized["selector"] = _normalize_selector((query or {}).get("selector"))
+    if (query or {}).get("sort"):
+        normalized["sort"] = query["sort"]
+    if (query or {}).get("skip"):
+        normalized["skip"] = query["skip"]
+    if (query or {}).get("limit") is not None:
+        normalized["limit"] = query["limit"]
+    return json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def is_narrowing(query: Optional[Dict[str, Any]], base: Optional[Dict[str, Any]]) -> bool:
+    """
+    Returns `True` if results of `query` are a subset of `base` query results, so `query` can be
+    evaluated over `base` results: `base` has no `skip`/`limit` and every `base` selector
+    condition is also present in `query` selector.
+    """
+    base = base or {}
+    if base.get("skip") or base.get("limit") is not None:
+        return False
+    selector = (query or {}).get("selector") or {}
+    return all(
+        key in selector and selector[key] == condition
+        for key, condition in (base.get("selector") or {}).items()
+    )
+
+
+def query_fields(query: Optional[Dict[str, Any]]) -> Set[str]:
+    """
+    Returns the (dotted) field paths the query's selector & sort refer to.
+    """
+    fields: Set[str] = set()
+
+    def collect(selector: Dict[str, Any]):
+        for key, condition in selector.items():
+            if key in ("$and", "$or", "$nor"):
+                for sub in condition:
+                    collect(sub)
+            else:
+                fields.add(key)
+
+    collect((query or {}).get("selector") or {})
+    for part in (query or {}).get("sort") or []:
+        fields.update(part if isinstance(part, dict) else [part])
+    return fields
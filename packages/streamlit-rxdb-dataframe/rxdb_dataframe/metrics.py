@@ -0,0 +1,114 @@
+"""
+Instrumentation of `rxdb_dataframe()` calls.
+
+Every call records wall time per stage, payload bytes, rows & columns of the result, query cache
+hits and the timings reported by the component (browser query & encode time). The metrics of
+a call are a flat, JSON-serializable dict, handed to the registered metrics callbacks (e.g. to
+feed Prometheus or OpenTelemetry instruments) and logged on `DEBUG` level by the
+`rxdb_dataframe` logger, under the `rxdb_metrics` record attribute.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger("rxdb_dataframe")
+
+MetricsCallback = Callable[[Dict[str, Any]], None]
+
+_callbacks: List[MetricsCallback] = []
+
+
+def add_metrics_callback(callback: MetricsCallback) -> None:
+    """
+    Register a callback receiving the metrics dict of every call.
+    """
+    if callback not in _callbacks:
+        _callbacks.append(callback)
+
+
+def remove_metrics_callback(callback: MetricsCallback) -> None:
+    if callback in _callbacks:
+        _callbacks.remove(callback)
+
+
+class CallMetrics:
+    """
+    Metrics of a single call: per-stage wall time (seconds), payload & result size, cache hits
+    """
+
+    def __init__(self, name: str, collection: Optional[str] = None):
+        self.name = name
+        self.collection = collection
+        self.stages: Dict[str, float] = {}
+        self.payload_bytes: Optional[int] = None
+        self.rows: Optional[int] = None
+        self.columns: Optional[int] = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.frontend: Dict[str, Any] = {}  # timings reported by the component
+        self.chunks: List[Dict[str, Any]] = []  # rows & seconds per converted chunk
+        self.updates: Dict[str, int] = {}  # update coalescing counters of the component
+        self.error: Optional[str] = None
+        self._started = time.perf_counter()
+        self._total: Optional[float] = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Measure wall time of the stage (repeated stages are summed up)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+    def finish(self, df: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+        """
+        Stop the clock, record the result size & emit the metrics. Returns the metrics dict.
+        """
+        self._total = time.perf_counter() - self._started
+        if df is not None:
+            self.rows, self.columns = df.shape
+        metrics = self.to_dict()
+        emit_metrics(metrics)
+        return metrics
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "collection": self.collection,
+            "total_s": self._total,
+            "stages": dict(self.stages),
+            "payload_bytes": self.payload_bytes,
+            "rows": self.rows,
+            "columns": self.columns,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "frontend": dict(self.frontend),
+            "chunks": list(self.chunks),
+            "updates": dict(self.updates),
+            "error": self.error,
+        }
+
+
+def emit_metrics(metrics: Dict[str, Any]) -> None:
+    """
+    Hand the metrics to the registered callbacks & log them (`DEBUG` level).
+    Failing callbacks are logged, they never break the app.
+    """
+    for callback in list(_callbacks):
+        try:
+            callback(metrics)
+        except Exception:
+            logger.exception("Metrics callback %r failed", callback)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "%s: %.1f ms, %s rows",
+            metrics["name"],
+            (metrics["total_s"] or 0) * 1000,
+            metrics["rows"],
+            extra={"rxdb_metrics": metrics},
+        )
@@ -0,0 +1,114 @@
+"""
+Windowed/paginated loading of RxDB query results.
+
+In paging mode the component does not send the whole result set. Python requests pages
+(`skip`/`limit` pushed down to the RxDB query) and the component answers with just those
+pages and the total from an RxDB count query. `LazyRxDBFrame` is the facade over the page
+cache: pages are fetched on first access and served from the cache afterwards.
+
+A page accessed after the component was rendered can only reach the component with the next
+rerun's args: `rxdb_lazy_dataframe` requests that rerun (`st.rerun`), the component answers
+the request at once and its value triggers another rerun, in which the page is cached.
+"""
+
+from typing import Callable, Iterable, List, Optional
+
+import pandas as pd
+
+from .plan import ConversionPlan
+
+
+def page_range(start: int, stop: int, page_size: int) -> range:
+    """
+    Returns indexes of the pages covering rows `[start, stop)`.
+    """
+    if stop <= start:
+        return range(0)
+    return range(start // page_size, (stop - 1) // page_size + 1)
+
+
+class LazyRxDBFrame:
+    """
+    Lazy, page-cached view of RxDB query result.
+
+    Pages that are not cached yet are requested from the browser (all pages missing in one
+    access at once) and returned on one of the next reruns; until then `page` returns `None`
+    and `rows` omits their rows. Use `pending` to check for missing pages.
+    """
+
+    def __init__(
+        self,
+        plan: ConversionPlan,
+        page_size: int,
+        total: Optional[int],
+        get_page: Callable[[int], Optional[pd.DataFrame]],
+        request_pages: Callable[[Iterable[int]], None],
+    ):
+        self.plan = plan
+        self.page_size = page_size
+        self.total = total
+        self._get_page = get_page
+        self._request_pages = request_pages
+        self._missing: List[int] = []
+
+    def __len__(self) -> int:
+        return self.total or 0
+
+    def __getitem__(self, key: slice) -> pd.DataFrame:
+        if not isinstance(key, slice) or key.step not in (None, 1):
+            raise TypeError("LazyRxDBFrame supports only contiguous row slices, e.g. `lazy[0:50]`")
+        start, stop, _ = key.indices(len(self))
+        return self.rows(start, stop)
+
+    @property
+    def columns(self) -> pd.Index:
+        return pd.Index(self.plan.columns)
+
+    @property
+    def shape(self):
+        return len(self), len(self.plan.columns)
+
+    @property
+    def num_pages(self) -> int:
+        return -(-len(self) // self.page_size)
+
+    @property
+    def pending(self) -> bool:
+        """`True` if some of the accessed pages are not loaded yet"""
+        return bool(self._missing)
+
+    def page(self, index: int) -> Optional[pd.DataFrame]:
+        """
+        Returns the page by its index, `None` while it is loading.
+        """
+        return self._pages([index])[0]
+
+    def _pages(self, indexes: Iterable[int]) -> List[Optional[pd.DataFrame]]:
+        indexes = list(indexes)
+        pages = [self._get_page(index) for index in indexes]
+        missing = [index for index, df in zip(indexes, pages) if df is None]
+        if missing:
+            self._missing.extend(missing)
+            self._request_pages(missing)
+        return pages
+
+    def rows(self, start: int, stop: int) -> pd.DataFrame:
+        """
+        Returns rows `[start, stop)`, fetching the pages covering them (missing rows are omitted).
+        """
+        stop = min(stop, len(self)) if self.total is not None else stop
+        pages = self._pages(page_range(start, stop, self.page_size))
+        pages = [df for df in pages if df is not None and not df.empty]
+        if not pages:
+            return self.plan.blueprint_df
+        df = pd.concat(pages) if len(pages) > 1 else pages[0]
+        return df[(df.index >= start) & (df.index < stop)]
+
+    def head(self, n: int = 5) -> pd.DataFrame:
+        return self.rows(0, n)
+
+    def to_pandas(self) -> pd.DataFrame:
+        """
+        Returns all rows of the result (requests every missing page).
+        """
+        return self.rows(0, len(self))
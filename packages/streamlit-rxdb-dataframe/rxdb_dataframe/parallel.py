@@ -0,0 +1,179 @@
+"""
+Parallel, chunked conversion of large component results.
+
+Converting millions of documents with `ConversionPlan.apply` runs on one core and blocks the
+session's script thread. `ParallelConverter` splits the documents into chunks, converts them in
+a process pool or a thread pool and concatenates the typed chunks. The plan extracts the columns
+from the documents in Python, holding the GIL, so threads overlap only the vectorized
+coercions (datetime parsing, `astype`) and rarely beat the serial conversion: use processes on
+a multi-core host, where the chunks are pickled to & from the workers.
+
+Concatenating the chunks copies every column once more: a pandas column is one contiguous
+block, the chunks are converted into separate ones. The peak memory of a parallel conversion is
+about twice the size of the result. Building Arrow tables per chunk does not avoid it either,
+`to_pandas` of the concatenated (chunked) table copies the columns the same way.
+
+Parallel conversion is off by default (`threshold=None`), enable it with
+`configure_parallel_conversion(threshold=...)` after benchmarking it on the target host
+(`benchmarks/run.py --only convert`). Results below `threshold` rows are converted in the
+calling thread, as are already decoded frames (Arrow transport), whose columns are typed
+already.
+
+Process pool workers are spawned, not forked (safe next to the threads of a Streamlit server),
+and import the headless core only (see `rxdb_dataframe.core`); they compile the plan once per
+schema from the schema itself.
+"""
+
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from .plan import ConversionPlan, compile_schema
+
+DEFAULT_PARALLEL_WORKERS = 4
+
+PARALLEL_THREAD = "thread"
+PARALLEL_PROCESS = "process"
+
+
+def _convert_chunk(
+    schema: dict,
+    schema_hash: str,
+    flatten: bool,
+    columns: Optional[Tuple[str, ...]],
+    docs: List[Dict[str, Any]],
+) -> Tuple[pd.DataFrame, float]:
+    """Process pool task: returns the converted chunk & the conversion time (seconds)"""
+    plan = compile_schema(schema, schema_hash, flatten, columns)
+    started = time.perf_counter()
+    df = plan.apply(docs)
+    return df, time.perf_counter() - started
+
+
+def _apply_timed(plan: ConversionPlan, docs: List[Dict[str, Any]]) -> Tuple[pd.DataFrame, float]:
+    started = time.perf_counter()
+    df = plan.apply(docs)
+    return df, time.perf_counter() - started
+
+
+class ParallelConverter:
+    """
+    Converts documents with the conversion plan in chunks of `chunk_size` rows (by default one
+    chunk per worker) on a pool of `workers` threads or processes (`executor`), once there are
+    at least `threshold` rows (never with `None`). The pool is created on first use and kept
+    until `close()`.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        threshold: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        executor: str = PARALLEL_THREAD,
+    ):
+        if executor not in (PARALLEL_THREAD, PARALLEL_PROCESS):
+            raise ValueError(f"Unknown executor: {executor}")
+        self.workers = workers or min(DEFAULT_PARALLEL_WORKERS, os.cpu_count() or 1)
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+        self.executor = executor
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def convert(
+        self,
+        plan: ConversionPlan,
+        docs: Union[List[Dict[str, Any]], pd.DataFrame],
+        timings: Optional[List[Dict[str, Any]]] = None,
+    ) -> pd.DataFrame:
+        """
+        Convert the documents into typed `pandas.DataFrame`, like `plan.apply(docs)`. Appends
+        rows & conversion time (seconds) of every chunk to `timings`, if given. Chunks are
+        concatenated into the result, which copies them.
+        """
+        chunks = self._chunks(docs)
+        if len(chunks) == 1:
+            results = [_apply_timed(plan, docs)]
+        else:
+            pool = self._get_pool()
+            if self.executor == PARALLEL_PROCESS:
+                args = (plan.schema, plan.schema_hash, plan.flatten, plan.projection)
+                futures = [pool.submit(_convert_chunk, *args, chunk) for chunk in chunks]
+            else:
+                futures = [pool.submit(_apply_timed, plan, chunk) for chunk in chunks]
+            results = [future.result() for future in futures]
+        if timings is not None:
+            timings.extend(
+                {"chunk": i, "rows": len(df), "seconds": seconds}
+                for i, (df, seconds) in enumerate(results)
+            )
+        if len(results) == 1:
+            return results[0][0]
+        # chunks share column order & dtypes, every column is copied once into one block
+        return pd.concat([df for df, _ in results], ignore_index=True)
+
+    def _chunks(self, docs: Union[List[Dict[str, Any]], pd.DataFrame]) -> List[Any]:
+        n = len(docs)
+        if (
+            self.threshold is None
+            or isinstance(docs, pd.DataFrame)
+            or n < max(self.threshold, 1)
+            or self.workers < 2
+        ):
+            return [docs]
+        size = self.chunk_size or math.ceil(n / self.workers)
+        return [docs[start : start + size] for start in range(0, n, size)]
+
+    def _get_pool(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                if self.executor == PARALLEL_PROCESS:
+                    self._pool = ProcessPoolExecutor(
+                        self.workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    self._pool = ThreadPoolExecutor(
+                        self.workers, thread_name_prefix="rxdb_dataframe_convert"
+                    )
+            return self._pool
+
+    def close(self) -> None:
+        """Shut down the pool (a new one is created on the next parallel conversion)"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+
+_converter: Optional[ParallelConverter] = None
+_converter_lock = threading.Lock()
+
+
+def get_parallel_converter() -> ParallelConverter:
+    """
+    Returns the process-wide converter of component results
+    """
+    global _converter
+    with _converter_lock:
+        if _converter is None:
+            _converter = ParallelConverter()
+        return _converter
+
+
+def configure_parallel_conversion(**kwargs) -> ParallelConverter:
+    """
+    Replace the process-wide converter of component results with one configured with the given
+    options, see `ParallelConverter`
+    """
+    global _converter
+    with _converter_lock:
+        if _converter is not None:
+            _converter.close()
+        _converter = ParallelConverter(**kwargs)
+        return _converter
@@ -0,0 +1,279 @@
+"""
+Schema compiler: turns RxJSONSchema into a reusable conversion plan.
+
+The plan is compiled once per schema (keyed by the dump's `schemaHash` or a stable digest of
+the schema) and holds per-column target dtype, a vectorized coercion function and the column
+order, so converting a batch of docs is a single vectorized pass over columns.
+"""
+
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .flatten import arrow_type, flatten_schema, from_arrow_list, to_arrow_list
+
+Coercer = Callable[[pd.Series], pd.Series]
+Encoder = Callable[[pd.Series], pd.Series]
+
+DATETIME_DTYPE = pd.DatetimeTZDtype(tz="UTC")
+
+
+def schema_digest(schema: dict) -> str:
+    """
+    Returns stable sha256 hex digest of the given JSONSchema (independent of key order).
+    """
+    data = json.dumps(schema, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _is_arrow(series: pd.Series) -> bool:
+    return isinstance(series.dtype, pd.ArrowDtype)
+
+
+def _to_datetime(series: pd.Series) -> pd.Series:
+    if series.dtype.kind == "M":
+        return series
+    return pd.to_datetime(series, utc=True, format="ISO8601")
+
+
+def _epoch_ms_to_datetime(series: pd.Series) -> pd.Series:
+    if series.dtype.kind == "M":
+        return series
+    return pd.to_datetime(series, unit="ms", utc=True)
+
+
+def _to_dtype(dtype: Any) -> Coercer:
+    def coerce(series: pd.Series) -> pd.Series:
+        if _is_arrow(series) or series.dtype == dtype:
+            return series  # already typed by Arrow transport
+        return series.astype(dtype)
+
+    return coerce
+
+
+def _to_categorical(dtype: pd.CategoricalDtype) -> Coercer:
+    def coerce(series: pd.Series) -> pd.Series:
+        if series.dtype == dtype:
+            return series
+        return pd.Series(
+            pd.Categorical(series.astype(object), dtype=dtype), index=series.index, name=series.name
+        )
+
+    return coerce
+
+
+def _identity(series: pd.Series) -> pd.Series:
+    return series
+
+
+def _from_datetime(series: pd.Series) -> pd.Series:
+    series = pd.to_datetime(series, utc=True)
+    return series.dt.strftime("%Y-%m-%dT%H:%M:%S.%f").str[:-3] + "Z"
+
+
+def _datetime_to_epoch_ms(series: pd.Series) -> pd.Series:
+    series = pd.to_datetime(series, utc=True)
+    return ((series - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(milliseconds=1)).astype("Int64")
+
+
+def _compile_property(prop: Dict[str, Any], flatten: bool = False):
+    """
+    Returns target dtype, coercion & encoding (back to JSON values) functions
+    for the given JSONSchema property.
+    """
+    prop_type = prop.get("type")
+    if isinstance(prop_type, list):
+        prop_type = next((t for t in prop_type if t != "null"), None)
+    prop_format = prop.get("format")
+
+    if flatten and prop_type == "array":
+        list_type = arrow_type(prop)
+        if list_type is not None:
+            return pd.ArrowDtype(list_type), to_arrow_list(list_type), from_arrow_list
+
+    if prop.get("enum") and len(prop["enum"]) > 0:
+        dtype = pd.CategoricalDtype(categories=prop["enum"])
+        return dtype, _to_categorical(dtype), _identity
+    if prop_type == "string" and prop_format == "date-time":
+        return DATETIME_DTYPE, _to_datetime, _from_datetime
+    if prop_type == "integer" and prop_format == "time":
+        return DATETIME_DTYPE, _epoch_ms_to_datetime, _datetime_to_epoch_ms  # epoch ms
+    if prop_type == "integer":
+        return "Int64", _to_dtype("Int64"), _identity
+    if prop_type == "number":
+        return "float64", _to_dtype("float64"), _identity
+    if prop_type == "boolean":
+        return "boolean", _to_dtype("boolean"), _identity
+    return "object", _identity, _identity  # strings, objects & arrays
+
+
+class ConversionPlan:
+    """
+    Compiled conversion plan of RxJSONSchema: column order, target dtypes, coercion functions
+    & encoders back to RxDB documents.
+
+    With `flatten=True` nested object properties become dotted-path columns and typed arrays
+    list-typed Arrow columns, see `rxdb_dataframe.flatten`.
+
+    `columns` projects the plan onto the given (dotted, if flattened) columns, in schema order.
+    """
+
+    def __init__(
+        self,
+        schema: dict,
+        schema_hash: str,
+        flatten: bool = False,
+        columns: Optional[Sequence[str]] = None,
+    ):
+        self.schema = schema
+        self.schema_hash = schema_hash
+        self.flatten = flatten
+        self.projection = tuple(columns) if columns is not None else None
+        self.columns: List[str] = []
+        self.paths: Dict[str, List[str]] = {}  # nested (dotted) columns only
+        self.dtypes: Dict[str, Any] = {}
+        self.coercers: Dict[str, Coercer] = {}
+        self.encoders: Dict[str, Encoder] = {}
+        properties = (flatten_schema(schema) if flatten else schema).get("properties", {})
+        if self.projection is not None:
+            properties = project_properties(properties, self.projection)
+        for column, prop in properties.items():
+            self.columns.append(column)
+            if "." in column:
+                self.paths[column] = column.split(".")
+            compiled = _compile_property(prop, flatten)
+            self.dtypes[column], self.coercers[column], self.encoders[column] = compiled
+        self._blueprint_df = pd.DataFrame(
+            {column: pd.Series(dtype=dtype) for column, dtype in self.dtypes.items()}
+        )
+
+    @property
+    def blueprint_df(self) -> pd.DataFrame:
+        """Empty `pandas.DataFrame` with target columns & dtypes"""
+        return self._blueprint_df.copy()
+
+    def apply(self, docs: Union[List[Dict[str, Any]], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Convert a batch of documents (or an already decoded frame) into typed `pandas.DataFrame`.
+        """
+        if isinstance(docs, pd.DataFrame):
+            missing = pd.Series(None, index=docs.index, dtype=object)
+            columns = {
+                column: docs[column]
+                if column in docs.columns
+                else self._nested(docs, column, missing)
+                for column in self.columns
+            }
+        else:
+            columns = {
+                column: pd.Series(
+                    [_get_path(doc, self.paths[column]) for doc in docs]
+                    if column in self.paths
+                    else [doc.get(column) for doc in docs],
+                    dtype=object,
+                )
+                for column in self.columns
+            }
+        data = {column: self.coercers[column](series) for column, series in columns.items()}
+        return pd.DataFrame(data, columns=self.columns, copy=False)
+
+    def _nested(self, docs: pd.DataFrame, column: str, missing: pd.Series) -> pd.Series:
+        path = self.paths.get(column)
+        if not path or path[0] not in docs.columns:
+            return missing
+        return docs[path[0]].map(lambda value: _get_path(value, path[1:]))
+
+    def encode(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Convert typed dataframe rows back into JSON-serializable RxDB documents.
+        Missing values (`None`, `NaN`, `NA`, `NaT`) are omitted from the documents.
+        """
+        columns = [column for column in self.columns if column in df.columns]
+        values = []
+        for column in columns:
+            series = df[column]
+            missing = series.isna().to_numpy()
+            array = np.full(len(series), None, dtype=object)
+            if not missing.all():
+                encoded = self.encoders[column](series[~missing])
+                array[~missing] = encoded.astype(object).to_numpy()
+            values.append(array.tolist())
+        docs = [
+            {column: value for column, value in zip(columns, row) if value is not None}
+            for row in zip(*values)
+        ]
+        if self.paths:
+            docs = [_nest(doc) for doc in docs]
+        return docs
+
+
+class Projection:
+    """
+    Shape of the `rxdb_dataframe` result: `columns` to project onto (dotted paths with
+    `flatten`), the primary key is always kept, & flattening of nested object properties into
+    dotted-path columns (`flatten`, typed arrays become Arrow list columns).
+    """
+
+    def __init__(self, columns: Optional[Sequence[str]] = None, flatten: bool = False):
+        if isinstance(columns, str):
+            raise ValueError("`columns` must be a sequence of column names")
+        self.columns = tuple(columns) if columns is not None else None
+        self.flatten = flatten
+
+
+def project_properties(
+    properties: Dict[str, Dict[str, Any]], columns: Sequence[str]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns the schema properties of the given columns (in schema order), raises `ValueError`
+    for columns not in the schema
+    """
+    unknown = [column for column in columns if column not in properties]
+    if unknown:
+        raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+    return {column: prop for column, prop in properties.items() if column in columns}
+
+
+def _get_path(doc: Any, path: List[str]) -> Any:
+    for key in path:
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(key)
+    return doc
+
+
+def _nest(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Turns dotted keys of the flattened document back into nested objects"""
+    nested: Dict[str, Any] = {}
+    for key, value in doc.items():
+        *parents, name = key.split(".")
+        target = nested
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[name] = value
+    return nested
+
+
+_plans: Dict[Tuple[str, bool, Optional[Tuple[str, ...]]], ConversionPlan] = {}
+
+
+def compile_schema(
+    schema: dict,
+    schema_hash: Optional[str] = None,
+    flatten: bool = False,
+    columns: Optional[Sequence[str]] = None,
+) -> ConversionPlan:
+    """
+    Returns conversion plan for the given JSONSchema (projected onto `columns`, if given),
+    compiled once per `schema_hash` (e.g. `schemaHash` of the collection dump) or stable digest
+    of the schema.
+    """
+    schema_hash = schema_hash or schema_digest(schema)
+    key = (schema_hash, flatten, tuple(columns) if columns is not None else None)
+    plan = _plans.get(key)
+    if plan is None:
+        plan = _plans[key] = ConversionPlan(schema, schema_hash, flatten, columns)
+    return plan
@@ -0,0 +1,190 @@
+"""
+Per-session LRU cache of query results.
+
+Results are keyed by the collection name, the normalized MangoQuery, the `with_rev` flag and
+the column projection, so toggling between queries does not re-transfer and rebuild the same
+frames. Entries are tagged with the collection version reported by the component: any
+collection change bumps the version and invalidates every cached result.
+
+The cache holds only the keys: the frames live in the session data store (see
+`rxdb_dataframe.store`) under the session's byte budget and may be spilled to disk like any
+other session data. Hits and misses are counted once per looked up result, not on every rerun.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Union
+
+import pandas as pd
+
+from .mango import normalize_query
+from .parallel import get_parallel_converter
+from .plan import ConversionPlan
+from .store import dataframe_nbytes, get_session_store
+
+DEFAULT_QUERY_CACHE_ENTRIES = 8
+DEFAULT_QUERY_CACHE_BYTES = 64 * 1024**2  # 64 MiB
+
+CacheKey = Hashable
+
+
+def query_cache_key(
+    collection_name: Optional[str],
+    query: Optional[Dict[str, Any]],
+    with_rev: bool = False,
+    columns: Optional[Sequence[str]] = None,
+) -> CacheKey:
+    """
+    Returns cache key of the query result (projected onto `columns`, if given).
+    """
+    projection = tuple(columns) if columns is not None else None
+    return collection_name, normalize_query(query), bool(with_rev), projection
+
+
+class CachePolicy:
+    """
+    Caching of `rxdb_dataframe` results: the per-session query result cache (`query_results`,
+    not used in `delta` mode) & persistent snapshots for cold starts (`snapshot`, `True` or a
+    scope, e.g. the user id, see `rxdb_dataframe.snapshots`).
+    """
+
+    def __init__(self, query_results: bool = True, snapshot: Union[bool, str] = False):
+        if isinstance(snapshot, str) and not snapshot:
+            raise ValueError("Snapshot scope must not be empty")
+        self.query_results = query_results
+        self.snapshot = snapshot
+
+    @property
+    def snapshot_scope(self) -> Optional[str]:
+        return self.snapshot if isinstance(self.snapshot, str) else None
+
+
+class QueryResultCache:
+    """
+    LRU cache of query result dataframes bounded by number of entries & bytes, the frames are
+    kept in the session data store of `session_id` (entries under `namespace`)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_QUERY_CACHE_ENTRIES,
+        max_bytes: int = DEFAULT_QUERY_CACHE_BYTES,
+        session_id: Hashable = "default",
+        namespace: Hashable = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.session_id = session_id
+        self.namespace = namespace
+        self.version: Any = None  # collection version the cached results belong to
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[CacheKey, int]" = OrderedDict()  # nbytes in LRU order
+        self._recorded: Optional[CacheKey] = None  # key of the last counted lookup
+
+    def __contains__(self, key: CacheKey) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def validate(self, version: Any) -> None:
+        """
+        Drop every cached result, if the collection version has changed.
+        """
+        if version != self.version:
+            self.clear()
+            self.version = version
+
+    def get(self, key: CacheKey, record: bool = True) -> Optional[pd.DataFrame]:
+        """
+        Returns the cached result; with `record` the hit or miss is counted, unless the key is
+        the one counted last (the same result looked up again on a rerun).
+        """
+        df = None
+        if key in self._entries:
+            df = get_session_store().get(self.session_id, self._store_key(key))
+            if df is None:
+                self._discard(key)  # dropped by the store
+            else:
+                self._entries.move_to_end(key)
+        if record and key != self._recorded:
+            self._recorded = key
+            if df is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return df
+
+    def put(self, key: CacheKey, df: pd.DataFrame) -> None:
+        """
+        Cache the result & evict least recently used ones exceeding the bounds.
+        Results bigger than `max_bytes` are not cached at all.
+        """
+        nbytes = dataframe_nbytes(df)
+        self._discard(key)
+        if nbytes > self.max_bytes or self.max_entries <= 0:
+            return
+        self._entries[key] = nbytes
+        self.nbytes += nbytes
+        get_session_store().put(self.session_id, self._store_key(key), df, nbytes)
+        while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+            self._discard(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        for key in list(self._entries):
+            self._discard(key)
+        self._recorded = None
+
+    def stats(self) -> Dict[str, int]:
+        """Returns cache counters, e.g. for monitoring"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "nbytes": self.nbytes,
+        }
+
+    def _store_key(self, key: CacheKey) -> Hashable:
+        return "query_cache", self.namespace, key
+
+    def _discard(self, key: CacheKey) -> None:
+        nbytes = self._entries.pop(key, None)
+        if nbytes is not None:
+            self.nbytes -= nbytes
+            get_session_store().drop(self.session_id, self._store_key(key))
+
+
+def cached_query_result(
+    state: Any,
+    cache: QueryResultCache,
+    cache_key: CacheKey,
+    result: Dict[str, Any],
+    plan: ConversionPlan,
+    collection_name: Optional[str],
+    with_rev: bool,
+    timings: Optional[List[Dict[str, Any]]] = None,
+) -> pd.DataFrame:
+    """
+    Resolve the component result through the query result cache: documents are converted only
+    on a cache miss (appending the chunk timings to `timings`), a `cached` confirmation is
+    answered from the cache. The answered frame becomes the `dataframe` of the session `state`,
+    the one of the requested `cache_key` is returned.
+    """
+    cache.validate(result.get("version"))
+    result_key = query_cache_key(collection_name, result["query"], with_rev, result.get("columns"))
+    df = cache.get(result_key)
+    if df is None and "docs" in result:
+        df = get_parallel_converter().convert(plan, result["docs"], timings)
+        cache.put(result_key, df)
+    if df is not None:
+        state.dataframe = df
+    elif normalize_query(result["query"]) == normalize_query(state.query):
+        df = state.dataframe  # confirmed, but evicted from the cache meanwhile
+
+    if result_key != cache_key and cache_key in cache:
+        # the component has not answered the requested query yet -> serve it from the cache
+        served = cache.get(cache_key, record=False)
+        if served is not None:
+            return served
+    return df if df is not None else plan.blueprint_df
@@ -0,0 +1,502 @@
+"""
+Local replication endpoint speaking RxDB's HTTP replication protocol, backed by SQLite.
+
+`SQLiteReplicationStore` keeps the master state of the collections in one SQLite database: a
+table per collection (document JSON, `_deleted` flag & last write time), indexed by the
+replication checkpoint `(updatedAt, id)` and by the schema's `indexes` (expression indexes
+over the JSON fields). The `<collection>_docs` view exposes the non-deleted documents with
+their top-level properties as columns, so Python code runs bulk SQL queries (`store.sql`) on
+the same data the browser syncs, without a Streamlit rerun.
+
+`ReplicationServer` serves the store over HTTP on localhost (stdlib only), per collection:
+
+    GET  /<collection>/pull?id=&updatedAt=&batchSize=   documents since the checkpoint
+    POST /<collection>/push                            `[{assumedMasterState, newDocumentState}]`,
+                                                       answered with the conflicting master docs
+    GET  /<collection>/pullStream                      server-sent events of the written docs
+                                                       (`{documents, checkpoint}` or `"RESYNC"`)
+
+Every request carries the server's secret `token` query parameter (query, as `EventSource`
+can not send headers), others are rejected. Browser requests are accepted from the
+`allowed_origins` only (the Streamlit server by default), which are the only ones CORS lets
+read the responses: other websites open in the browser can neither read nor write the store.
+
+The component starts the replication for collection configs with `options.replication` set
+(see `replication_options`, which carry the token), the browser then syncs in the background.
+"""
+
+import hmac
+import json
+import queue
+import secrets
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from .changes import get_primary_key
+from .indexes import schema_indexes
+from .plan import ConversionPlan, compile_schema
+
+RXDB_STREAM_RESYNC = "RESYNC"
+DEFAULT_PULL_BATCH_SIZE = 100
+DEFAULT_STREAM_BUFFER = 1000
+HEARTBEAT_INTERVAL = 15.0
+# origins of Streamlit's default server address (`streamlit run`, port 8501)
+DEFAULT_ALLOWED_ORIGINS = ("http://localhost:8501", "http://127.0.0.1:8501")
+
+Checkpoint = Dict[str, Any]
+
+# not part of the replicated document state
+_LOCAL_FIELDS = ("_meta", "_rev", "_attachments")
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _json_path(field: str) -> str:
+    """SQL expression of the (dotted) document field"""
+    path = "$." + ".".join('"' + part.replace('"', '\\"') + '"' for part in field.split("."))
+    return "json_extract(doc, '" + path.replace("'", "''") + "')"
+
+
+def _master_state(doc: Dict[str, Any]) -> Dict[str, Any]:
+    state = {key: value for key, value in doc.items() if key not in _LOCAL_FIELDS}
+    state["_deleted"] = bool(doc.get("_deleted"))
+    return state
+
+
+class _Collection:
+    def __init__(self, name: str, schema: dict):
+        self.name = name
+        self.schema = schema
+        self.primary_key = get_primary_key(schema)
+        self.table = _quote(name)
+        self.view = _quote(f"{name}_docs")
+        self._plan: Optional[ConversionPlan] = None
+        self.subscribers: List["queue.Queue[Any]"] = []
+
+    @property
+    def plan(self) -> ConversionPlan:
+        if self._plan is None:
+            self._plan = compile_schema(self.schema)
+        return self._plan
+
+    def ddl(self) -> List[str]:
+        statements = [
+            f"CREATE TABLE IF NOT EXISTS {self.table} "
+            "(id TEXT PRIMARY KEY, doc TEXT NOT NULL, deleted INTEGER NOT NULL, lwt REAL NOT NULL)",
+            f"CREATE INDEX IF NOT EXISTS {_quote(self.name + '__checkpoint')} "
+            f"ON {self.table} (lwt, id)",
+        ]
+        for fields in schema_indexes(self.schema, self.primary_key):
+            index = _quote(self.name + "__" + "__".join(fields))
+            columns = ", ".join(_json_path(field) for field in fields)
+            statements.append(f"CREATE INDEX IF NOT EXISTS {index} ON {self.table} ({columns})")
+        columns = ", ".join(
+            f"{_json_path(field)} AS {_quote(field)}"
+            for field in self.schema.get("properties", {})
+        )
+        statements.append(f"DROP VIEW IF EXISTS {self.view}")
+        statements.append(
+            f"CREATE VIEW {self.view} AS SELECT {columns} FROM {self.table} WHERE deleted = 0"
+        )
+        return statements
+
+
+class SQLiteReplicationStore:
+    """
+    Master state of RxDB collections in a SQLite database (`path`, in memory by default),
+    safe to use from the server threads & the Streamlit script at once
+    """
+
+    def __init__(self, path: str = ":memory:", stream_buffer: int = DEFAULT_STREAM_BUFFER):
+        self.path = path
+        self.stream_buffer = stream_buffer
+        self.collections: Dict[str, _Collection] = {}
+        self._lock = threading.RLock()
+        self._clock = 0.0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+
+    def add_collection(self, name: str, schema: dict) -> None:
+        """Create the collection's table, checkpoint & schema indexes and the `_docs` view"""
+        collection = _Collection(name, schema)
+        with self._lock:
+            for statement in collection.ddl():
+                self._conn.execute(statement)
+            self.collections[name] = collection
+
+    def _collection(self, name: str) -> _Collection:
+        try:
+            return self.collections[name]
+        except KeyError:
+            raise KeyError(f"Unknown collection {name!r}") from None
+
+    def _now(self) -> float:
+        """Last write time in milliseconds, strictly increasing (orders the checkpoints)"""
+        self._clock = max(time.time() * 1000, self._clock + 0.001)
+        return self._clock
+
+    def pull(
+        self,
+        name: str,
+        checkpoint: Optional[Checkpoint] = None,
+        batch_size: int = DEFAULT_PULL_BATCH_SIZE,
+    ) -> Dict[str, Any]:
+        """Documents written after the checkpoint (`{id, updatedAt}`), with the next one"""
+        collection = self._collection(name)
+        updated_at = (checkpoint or {}).get("updatedAt")
+        with self._lock:
+            if updated_at is None:
+                rows = self._conn.execute(
+                    f"SELECT id, doc, lwt FROM {collection.table} ORDER BY lwt, id LIMIT ?",
+                    (batch_size,),
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    f"SELECT id, doc, lwt FROM {collection.table} "
+                    "WHERE lwt > ? OR (lwt = ? AND id > ?) ORDER BY lwt, id LIMIT ?",
+                    (updated_at, updated_at, checkpoint.get("id") or "", batch_size),
+                ).fetchall()
+        if not rows:
+            return {"documents": [], "checkpoint": checkpoint}
+        return {
+            "documents": [json.loads(doc) for _, doc, _ in rows],
+            "checkpoint": {"id": rows[-1][0], "updatedAt": rows[-1][2]},
+        }
+
+    def push(self, name: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Write the pushed document states whose assumed master state is the actual one,
+        returns the actual master states of the conflicting ones
+        """
+        collection = self._collection(name)
+        conflicts, written = [], []
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for row in rows:
+                    doc = _master_state(row["newDocumentState"])
+                    key = str(doc[collection.primary_key])
+                    current = self._conn.execute(
+                        f"SELECT doc FROM {collection.table} WHERE id = ?", (key,)
+                    ).fetchone()
+                    assumed = row.get("assumedMasterState")
+                    if current is not None:
+                        master = json.loads(current[0])
+                        if assumed is None or _master_state(assumed) != master:
+                            conflicts.append(master)
+                            continue
+                    written.append(self._write(collection, key, doc))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._publish(collection, written)
+        return conflicts
+
+    def upsert(self, name: str, docs: Iterable[Dict[str, Any]]) -> None:
+        """Write documents as the master state (the browser pulls them)"""
+        self._write_all(name, [_master_state(doc) for doc in docs])
+
+    def remove(self, name: str, keys: Iterable[Any]) -> None:
+        """Mark documents deleted (the browser pulls the deletions)"""
+        collection = self._collection(name)
+        with self._lock:
+            docs = []
+            for key in keys:
+                current = self._conn.execute(
+                    f"SELECT doc FROM {collection.table} WHERE id = ?", (str(key),)
+                ).fetchone()
+                if current is not None:
+                    docs.append({**json.loads(current[0]), "_deleted": True})
+            self._write_all(name, docs)
+
+    def _write_all(self, name: str, docs: List[Dict[str, Any]]) -> None:
+        collection = self._collection(name)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                written = [
+                    self._write(collection, str(doc[collection.primary_key]), doc) for doc in docs
+                ]
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._publish(collection, written)
+
+    def _write(self, collection: _Collection, key: str, doc: Dict[str, Any]) -> Tuple:
+        lwt = self._now()
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO {collection.table} (id, doc, deleted, lwt) "
+            "VALUES (?, ?, ?, ?)",
+            (key, json.dumps(doc), int(doc["_deleted"]), lwt),
+        )
+        return key, doc, lwt
+
+    def subscribe(self, name: str) -> "queue.Queue[Any]":
+        """Queue of the collection's written documents (`{documents, checkpoint}`)"""
+        subscriber: "queue.Queue[Any]" = queue.Queue(self.stream_buffer)
+        with self._lock:
+            self._collection(name).subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, name: str, subscriber: "queue.Queue[Any]") -> None:
+        with self._lock:
+            subscribers = self._collection(name).subscribers
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+
+    def _publish(self, collection: _Collection, written: List[Tuple]) -> None:
+        if not written:
+            return
+        key, _, lwt = written[-1]
+        event = {
+            "documents": [doc for _, doc, _ in written],
+            "checkpoint": {"id": key, "updatedAt": lwt},
+        }
+        with self._lock:
+            subscribers = list(collection.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                # a slow subscriber re-runs the checkpoint iteration instead
+                with subscriber.mutex:
+                    subscriber.queue.clear()
+                subscriber.put_nowait(RXDB_STREAM_RESYNC)
+
+    def sql(self, query: str, params: Iterable[Any] = ()) -> pd.DataFrame:
+        """Run a SQL query (e.g. over the `<collection>_docs` views) into a dataframe"""
+        with self._lock:
+            cursor = self._conn.execute(query, tuple(params))
+            columns = [column[0] for column in cursor.description or []]
+            return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+
+    def docs(self, name: str) -> List[Dict[str, Any]]:
+        """Non-deleted documents of the collection"""
+        collection = self._collection(name)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT doc FROM {collection.table} WHERE deleted = 0 ORDER BY id"
+            ).fetchall()
+        return [json.loads(doc) for doc, in rows]
+
+    def dataframe(self, name: str) -> pd.DataFrame:
+        """Non-deleted documents, converted by the schema conversion plan"""
+        return self._collection(name).plan.apply(self.docs(name))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class _ReplicationHandler(BaseHTTPRequestHandler):
+    server: "_ReplicationHTTPServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+    def _route(self) -> Tuple[Optional[str], str, Dict[str, List[str]]]:
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] not in self.server.store.collections:
+            return None, "", {}
+        return parts[0], parts[1], parse_qs(url.query)
+
+    def _origin_allowed(self) -> bool:
+        """Requests without `Origin` do not come from a website (e.g. Python clients)"""
+        origin = self.headers.get("Origin")
+        return origin is None or origin in self.server.allowed_origins
+
+    def _authorized(self, params: Dict[str, List[str]]) -> bool:
+        """Reject requests of other origins or without the server's token"""
+        token = params.get("token", [""])[0]
+        if self._origin_allowed() and hmac.compare_digest(token, self.server.token):
+            return True
+        self._json({"error": "forbidden"}, 403)
+        return False
+
+    def _cors(self):
+        origin = self.headers.get("Origin")
+        if origin is not None and origin in self.server.allowed_origins:
+            self.send_header("Access-Control-Allow-Origin", origin)
+            self.send_header("Access-Control-Allow-Headers", "Content-Type")
+            self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+        self.send_header("Vary", "Origin")
+
+    def _json(self, value: Any, status: int = 200):
+        body = json.dumps(value).encode()
+        self.send_response(status)
+        self._cors()
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_OPTIONS(self):
+        self.send_response(204 if self._origin_allowed() else 403)
+        self._cors()
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        name, endpoint, params = self._route()
+        if not self._authorized(params):
+            return
+        if name and endpoint == "pull":
+            updated_at = params.get("updatedAt", [""])[0]
+            checkpoint = (
+                {"id": params.get("id", [""])[0], "updatedAt": float(updated_at)}
+                if updated_at
+                else None
+            )
+            batch_size = int(params.get("batchSize", [DEFAULT_PULL_BATCH_SIZE])[0])
+            self._json(self.server.store.pull(name, checkpoint, batch_size))
+        elif name and endpoint == "pullStream":
+            self._stream(name)
+        else:
+            self._json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        name, endpoint, params = self._route()
+        if not self._authorized(params):
+            return
+        if not name or endpoint != "push":
+            self._json({"error": "not found"}, 404)
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            rows = json.loads(self.rfile.read(length) or b"[]")
+        except ValueError:
+            self._json({"error": "invalid JSON"}, 400)
+            return
+        self._json(self.server.store.push(name, rows))
+
+    def _stream(self, name: str):
+        self.send_response(200)
+        self._cors()
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        store = self.server.store
+        subscriber = store.subscribe(name)
+        try:
+            while not self.server.stopping.is_set():
+                try:
+                    event = subscriber.get(timeout=self.server.heartbeat)
+                    self.wfile.write(b"data: " + json.dumps(event).encode() + b"\n\n")
+                except queue.Empty:
+                    self.wfile.write(b": heartbeat\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            store.unsubscribe(name, subscriber)
+
+
+class _ReplicationHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address,
+        store: SQLiteReplicationStore,
+        heartbeat: float,
+        token: str,
+        allowed_origins: Sequence[str],
+    ):
+        super().__init__(address, _ReplicationHandler)
+        self.store = store
+        self.heartbeat = heartbeat
+        self.token = token
+        self.allowed_origins = frozenset(allowed_origins)
+        self.stopping = threading.Event()
+
+
+class ReplicationServer:
+    """
+    Serves the store's collections over RxDB's HTTP replication protocol from a background
+    thread. Bound to localhost; `port=0` picks a free port (see `url`).
+
+    Requests must carry the `token` (a random one by default, passed to the component by
+    `replication_options`); browsers may call the server from the `allowed_origins` only, pass
+    the origin of the Streamlit server if it does not run on the default address.
+    """
+
+    def __init__(
+        self,
+        store: SQLiteReplicationStore,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        heartbeat: float = HEARTBEAT_INTERVAL,
+        token: Optional[str] = None,
+        allowed_origins: Sequence[str] = DEFAULT_ALLOWED_ORIGINS,
+    ):
+        self.store = store
+        self.token = token or secrets.token_urlsafe(32)
+        self._server = _ReplicationHTTPServer(
+            (host, port), store, heartbeat, self.token, allowed_origins
+        )
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ReplicationServer":
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._server.serve_forever, name="rxdb-replication", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.stopping.set()
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "ReplicationServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def replication_options(
+        self, name: str, live: bool = True, batch_size: int = DEFAULT_PULL_BATCH_SIZE
+    ) -> Dict[str, Any]:
+        """`options.replication` of the collection config, see `replication_options`"""
+        return replication_options(f"{self.url}/{name}", live, batch_size, self.token)
+
+
+def replication_options(
+    url: str,
+    live: bool = True,
+    batch_size: int = DEFAULT_PULL_BATCH_SIZE,
+    token: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    `options.replication` of a collection config: the component replicates the collection with
+    the endpoint at `url` (pull, push & with `live=True` the pull stream), sending `token` with
+    every request
+    """
+    options = {"url": url, "live": live, "batchSize": batch_size}
+    if token is not None:
+        options["token"] = token
+    return options
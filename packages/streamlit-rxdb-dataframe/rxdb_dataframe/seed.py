@@ -0,0 +1,180 @@
+"""
+Static component config & seed documents, sent to the browser only when they change.
+
+The collection config (without `options.initialDocs`) and the db config are content-hashed:
+they are sent with the component args until the component reports it has initialized with the
+same hash, then only the hash is sent. Seed documents (`initialDocs`) never cross the iframe
+boundary as a whole: the component asks for them only if the collection is empty and imports
+them in bounded chunks, reporting its progress back to Python.
+
+`load_dump` reads a collection dump (`RxDumpCollection` JSON) with a streaming parser, without
+loading the whole file in memory as a string first.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_SEED_CHUNK_SIZE = 2000
+DEFAULT_READ_SIZE = 1024 * 1024
+
+_decoder = json.JSONDecoder()
+
+
+def _digest(value: Any) -> str:
+    data = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def split_seed(
+    collection_config: Dict[str, Any]
+) -> Tuple[Dict[str, Any], Optional[Sequence[Dict[str, Any]]]]:
+    """
+    Returns copy of the collection config without `options.initialDocs`, and the initial docs.
+    """
+    options = collection_config.get("options") or {}
+    if not options.get("initialDocs"):
+        return collection_config, None
+    static_options = {key: value for key, value in options.items() if key != "initialDocs"}
+    return {**collection_config, "options": static_options}, options["initialDocs"]
+
+
+def config_digest(collection_config: Dict[str, Any], db_config: Dict[str, Any]) -> str:
+    """Content hash of the static config (collection config without seed docs & db config)"""
+    return _digest({"collection": collection_config, "db": db_config})[:16]
+
+
+class SeedDocs(tuple):
+    """
+    Immutable sequence of seed documents, content-hashed once on creation (e.g. the `docs` of
+    `load_dump`): passed as `initialDocs`, they are not re-serialized on every rerun. Do not
+    modify the documents, create new `SeedDocs` instead.
+    """
+
+    def __new__(cls, docs: Sequence[Dict[str, Any]]) -> "SeedDocs":
+        self = super().__new__(cls, docs)
+        self.digest = _digest(self)[:16]
+        return self
+
+
+def docs_digest(docs: Sequence[Dict[str, Any]]) -> str:
+    """
+    Content hash of the seed documents: the one of `SeedDocs`, computed on creation, other
+    sequences (e.g. lists, which may be changed in place) are hashed on every call.
+    """
+    if isinstance(docs, SeedDocs):
+        return docs.digest
+    return _digest(docs)[:16]
+
+
+def seed_args(
+    docs: Optional[Sequence[Dict[str, Any]]],
+    progress: Dict[str, Any],
+    chunk_size: int = DEFAULT_SEED_CHUNK_SIZE,
+) -> Optional[Dict[str, Any]]:
+    """
+    Returns the `seed` component arg: digest & total of the seed documents, with the next chunk
+    once the component asked for it (`progress` reported by the component), or `None` when
+    there is nothing (more) to seed.
+    """
+    if not docs:
+        return None
+    digest = docs_digest(docs)
+    if progress.get("digest") == digest and progress.get("done"):
+        return None
+    seed: Dict[str, Any] = {"digest": digest, "total": len(docs)}
+    if progress.get("digest") == digest and "loaded" in progress:
+        offset = progress["loaded"]
+        seed.update(offset=offset, docs=docs[offset : offset + chunk_size])
+    return seed
+
+
+class _StreamReader:
+    """Incremental JSON tokenizer over a text file, reading `read_size` characters at a time"""
+
+    def __init__(self, file, read_size: int):
+        self.file = file
+        self.read_size = read_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        chunk = self.file.read(self.read_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Returns the next non-whitespace character (empty string at the end of the file)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._fill():
+                return self.buffer[self.pos : self.pos + 1]
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Invalid dump: expected {char!r} at {self.peek()!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue  # the value continues in the next chunk
+                raise
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue  # e.g. a number, which may continue in the next chunk
+            self.pos = end
+            return value
+
+
+def iter_dump(path: str, read_size: int = DEFAULT_READ_SIZE) -> Iterator[Tuple[str, Any]]:
+    """
+    Stream the collection dump: yields `(key, value)` of its top-level fields and the documents
+    as `("doc", doc)`, one by one.
+    """
+    with open(path, encoding="utf-8") as file:
+        reader = _StreamReader(file, read_size)
+        reader.expect("{")
+        while reader.peek() != "}":
+            key = reader.value()
+            reader.expect(":")
+            if key == "docs":
+                reader.expect("[")
+                while reader.peek() != "]":
+                    yield "doc", reader.value()
+                    if reader.peek() == ",":
+                        reader.pos += 1
+                reader.expect("]")
+            else:
+                yield key, reader.value()
+            if reader.peek() == ",":
+                reader.pos += 1
+        reader.expect("}")
+
+
+def load_dump(path: str, read_size: int = DEFAULT_READ_SIZE) -> Dict[str, Any]:
+    """
+    Load the collection dump (`{"name": ..., "schemaHash": ..., "docs": [...]}`) with a streaming
+    parser. The returned `docs` are `SeedDocs`, hashed at once, so passing them as `initialDocs`
+    does not cost re-serialization on reruns; cache the result (e.g. with `st.cache_resource`)
+    to load the file once per process.
+    """
+    dump: Dict[str, Any] = {}
+    docs: List[Dict[str, Any]] = []
+    for key, value in iter_dump(path, read_size):
+        if key == "doc":
+            docs.append(value)
+        else:
+            dump[key] = value
+    dump["docs"] = SeedDocs(docs)
+    return dump
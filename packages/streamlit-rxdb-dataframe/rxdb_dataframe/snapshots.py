@@ -0,0 +1,271 @@
+"""
+Persistent snapshots of the last known collection results, for instant cold starts.
+
+A new session has nothing to show until the component loaded, initialized the database and sent
+its first result. With `cache=CachePolicy(snapshot=True)`, `rxdb_dataframe()` persists the last
+live result per collection name, schema hash, query & `with_rev` as an Arrow IPC file on the
+server (see `SnapshotCache`); a new session renders that snapshot at once, marked stale
+(`RxDBSessionState().stale`), until the live result arrives.
+
+Snapshots are shared by all sessions: pass a `scope` (e.g. the user or tenant id, as
+`CachePolicy(snapshot="<scope>")`) when the browser databases of the users hold different data,
+otherwise a new session may be shown another user's rows.
+
+Files are written atomically (temporary file & rename), read memory-mapped, and evicted when
+older than `max_age` seconds or least recently used beyond `max_bytes` on disk. Writes within
+`min_interval` of the last one are deferred: the latest frame is written at the end of it.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from .mango import normalize_query
+from .store import _remove_file, get_session_store, read_arrow_file, write_arrow_file
+
+DEFAULT_SNAPSHOT_MAX_AGE = 7 * 24 * 3600  # 7 days
+DEFAULT_SNAPSHOT_MAX_BYTES = 4 * 1024**3  # 4 GiB
+DEFAULT_SNAPSHOT_MIN_INTERVAL = 5.0  # seconds
+DEFAULT_SNAPSHOT_TRACKED = 1024  # keys whose last write is remembered
+
+_SUFFIX = ".arrow"
+_STORE_KEY = ("rxdb", "snapshot")  # session store key of the snapshot shown meanwhile
+
+
+def snapshot_key(
+    collection_name: Optional[str],
+    schema_hash: str,
+    query: Optional[Dict[str, Any]],
+    with_rev: bool = False,
+    flatten: bool = False,
+    columns: Optional[Sequence[str]] = None,
+    scope: Optional[str] = None,
+) -> str:
+    """
+    Returns file name safe key of the result of the query over the collection schema (projected
+    onto `columns`, if given) within the `scope`, e.g. of a user
+    """
+    key = [collection_name, schema_hash, normalize_query(query), bool(with_rev), bool(flatten)]
+    if columns is not None:
+        key.append(list(columns))
+    if scope is not None:
+        key.append({"scope": scope})
+    data = json.dumps(key, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()[:32]
+
+
+class SnapshotCache:
+    """
+    Directory of dataframe snapshots (Arrow IPC files) by key, evicted by age & total size.
+    Writes of the same key are throttled to one per `min_interval` seconds, with a trailing
+    write of the latest frame.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_age: float = DEFAULT_SNAPSHOT_MAX_AGE,
+        max_bytes: int = DEFAULT_SNAPSHOT_MAX_BYTES,
+        min_interval: float = DEFAULT_SNAPSHOT_MIN_INTERVAL,
+        max_tracked: int = DEFAULT_SNAPSHOT_TRACKED,
+    ):
+        self.directory = directory or os.path.join(
+            tempfile.gettempdir(), "rxdb_dataframe", "snapshots"
+        )
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.min_interval = min_interval
+        self.max_tracked = max_tracked
+        self._lock = threading.Lock()
+        # last written frame & time by key, least recently written first
+        self._written: "OrderedDict[str, Tuple[weakref.ref, float]]" = OrderedDict()
+        # frames held back by the throttle & the timers writing them
+        self._pending: Dict[str, pd.DataFrame] = {}
+        self._timers: Dict[str, threading.Timer] = {}
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """Returns the snapshot, unless it is missing or expired"""
+        path = self.path(key)
+        try:
+            modified = os.stat(path).st_mtime
+        except OSError:
+            modified = None
+        df = None
+        if modified is not None and time.time() - modified <= self.max_age:
+            df = read_arrow_file(path)
+        with self._lock:
+            if df is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        try:
+            os.utime(path, (time.time(), modified))  # access time orders the size eviction
+        except OSError:
+            pass
+        return df
+
+    def put(self, key: str, df: pd.DataFrame) -> bool:
+        """
+        Persist the snapshot, unless the same frame was written already. Returns `True` if it
+        was written, `False` also when the key was written less than `min_interval` seconds ago:
+        then the frame is written at the end of the interval (unless a later one replaces it).
+        """
+        now = time.monotonic()
+        with self._lock:
+            written = self._written.get(key)
+            if written is not None and written[0]() is df:
+                self._pending.pop(key, None)
+                return False
+            if written is not None and now - written[1] < self.min_interval:
+                self._pending[key] = df
+                if key not in self._timers:
+                    delay = written[1] + self.min_interval - now
+                    timer = self._timers[key] = threading.Timer(delay, self._flush, (key,))
+                    timer.daemon = True
+                    timer.start()
+                return False
+            self._pending.pop(key, None)
+            self._written[key] = (weakref.ref(df), now)
+            self._written.move_to_end(key)
+            while len(self._written) > self.max_tracked:
+                self._written.popitem(last=False)
+        if not write_arrow_file(self.path(key), df):
+            return False
+        with self._lock:
+            self.writes += 1
+        self.evict()
+        return True
+
+    def drop(self, key: str) -> None:
+        with self._lock:
+            self._written.pop(key, None)
+            self._pending.pop(key, None)
+            timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        _remove_file(self.path(key))
+
+    def _flush(self, key: str) -> None:
+        """Trailing write of the frame held back by the throttle"""
+        with self._lock:
+            self._timers.pop(key, None)
+            df = self._pending.pop(key, None)
+        if df is not None:
+            self.put(key, df)
+
+    def evict(self) -> None:
+        """Remove expired snapshots, then least recently used ones beyond `max_bytes`"""
+        try:
+            names = [name for name in os.listdir(self.directory) if name.endswith(_SUFFIX)]
+        except OSError:
+            return
+        now, files = time.time(), []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                self._evict(path)
+            else:
+                files.append((stat.st_atime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            self._evict(path)
+            total -= size
+
+    def _evict(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+            }
+
+
+_cache: Optional[SnapshotCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_snapshot_cache() -> SnapshotCache:
+    """
+    Returns the process-wide snapshot cache
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SnapshotCache()
+        return _cache
+
+
+def configure_snapshot_cache(**kwargs) -> SnapshotCache:
+    """
+    Replace the process-wide snapshot cache with one configured with the given options,
+    see `SnapshotCache`
+    """
+    global _cache
+    with _cache_lock:
+        _cache = SnapshotCache(**kwargs)
+        return _cache
+
+
+def snapshot_result(
+    state: Any,
+    result_df: pd.DataFrame,
+    session_id: Hashable,
+    query: Optional[Dict[str, Any]],
+    key: Callable[[Optional[Dict[str, Any]]], str],
+) -> pd.DataFrame:
+    """
+    Persist the live result (`dataframe` of the session `state`, of its `query`), or until there
+    is one, return the persisted snapshot of the `query` (kept in the session store meanwhile)
+    and mark the state stale. `key` returns the snapshot key of a query, see `snapshot_key`.
+    """
+    cache = get_snapshot_cache()
+    store = get_session_store()
+    df = state.dataframe
+    if df is not None:
+        if state.snapshot is not None:
+            store.drop(session_id, _STORE_KEY)
+        state.stale, state.snapshot = False, None
+        cache.put(key(state.query), df)
+        return result_df
+
+    snapshot = key(query)
+    stale = store.get(session_id, _STORE_KEY) if state.snapshot == snapshot else None
+    if stale is None:
+        stale = cache.get(snapshot)
+        if stale is None:
+            state.stale = False
+            return result_df
+        store.put(session_id, _STORE_KEY, stale)
+        state.snapshot = snapshot
+    state.stale = True
+    return stale
@@ -0,0 +1,363 @@
+"""
+Bounded, process-wide store for cached per-session collection data.
+
+Every Streamlit session (browser tab) keeps its collection snapshot here instead of
+`st.session_state`. The store enforces a byte budget per session and a global one, evicting
+least recently used snapshots across all sessions. Evicted snapshots are spilled to Arrow IPC
+files on local disk and reloaded on demand, when they become the most recently used entry
+again: the file is read through a memory map, but converted back into a pandas frame (with its
+original dtypes), so a reload copies the data into memory. Spill files are written & read
+outside the store's lock, other sessions are not blocked by the disk I/O.
+
+Streamlit has no session-end hook for components, so sessions not seen (no `get`/`put`) for
+`session_ttl` seconds are considered closed and dropped with all their entries.
+"""
+
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import pandas as pd
+
+DEFAULT_SESSION_BUDGET = 256 * 1024**2  # 256 MiB
+DEFAULT_GLOBAL_BUDGET = 2 * 1024**3  # 2 GiB
+DEFAULT_SPILL_BUDGET = 16 * 1024**3  # 16 GiB
+DEFAULT_SESSION_TTL = 60 * 60  # 1 hour
+
+StoreKey = Tuple[Hashable, Hashable]
+
+
+def dataframe_nbytes(df: pd.DataFrame) -> int:
+    """
+    Returns (deep) memory usage of the given dataframe in bytes.
+    """
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class _Entry:
+    def __init__(self, df: Optional[pd.DataFrame], nbytes: int, path: Optional[str] = None):
+        self.df = df  # of a spilled entry: until its spill file is written
+        self.nbytes = nbytes
+        self.path = path  # spill file, if evicted
+
+
+Spill = Tuple[StoreKey, _Entry]
+
+
+class SessionDataStore:
+    """
+    LRU store of dataframes keyed by `(session_id, key)` with per-session & global byte budgets
+    and disk spill of evicted entries; sessions idle for `session_ttl` seconds are dropped
+    """
+
+    def __init__(
+        self,
+        session_budget: int = DEFAULT_SESSION_BUDGET,
+        global_budget: int = DEFAULT_GLOBAL_BUDGET,
+        spill_dir: Optional[str] = None,
+        spill_budget: int = DEFAULT_SPILL_BUDGET,
+        session_ttl: Optional[float] = DEFAULT_SESSION_TTL,
+    ):
+        self.session_budget = session_budget
+        self.global_budget = global_budget
+        self.spill_budget = spill_budget
+        self.session_ttl = session_ttl
+        self.spill_dir = spill_dir or os.path.join(tempfile.gettempdir(), "rxdb_dataframe")
+        self._lock = threading.RLock()
+        self._memory: "OrderedDict[StoreKey, _Entry]" = OrderedDict()  # LRU order
+        self._spilled: "OrderedDict[StoreKey, _Entry]" = OrderedDict()
+        self._session_bytes: Dict[Hashable, int] = {}
+        self._last_seen: Dict[Hashable, float] = {}
+        self._garbage: List[str] = []  # spill files to remove once the lock is released
+        self._sizes: Dict[int, Tuple[int, int]] = {}  # id of a held frame -> (nbytes, entries)
+        self._swept = time.monotonic()
+        self.nbytes = 0
+        self.spilled_nbytes = 0
+        self.spills = 0
+        self.reloads = 0
+        self.expired = 0
+
+    def put(
+        self, session_id: Hashable, key: Hashable, df: pd.DataFrame, nbytes: Optional[int] = None
+    ) -> None:
+        """
+        Store the dataframe & evict least recently used entries exceeding the budgets.
+        Storing the frame the entry holds already only marks it as recently used. The size of
+        a frame is measured only if it is not held (under another key) and `nbytes` is not
+        given.
+        """
+        store_key = (session_id, key)
+        try:
+            with self._lock:
+                self._touch(session_id)
+                entry = self._memory.get(store_key)
+                if entry is not None and entry.df is df:
+                    self._memory.move_to_end(store_key)
+                    return
+                held = self._sizes.get(id(df))
+            if nbytes is None:
+                nbytes = held[0] if held is not None else dataframe_nbytes(df)
+            with self._lock:
+                spills = self._put(store_key, df, nbytes)
+            self._write_spills(spills)
+        finally:
+            self._collect_garbage()
+
+    def get(self, session_id: Hashable, key: Hashable) -> Optional[pd.DataFrame]:
+        """
+        Returns the stored dataframe (reloaded from disk, if it was spilled)
+        """
+        try:
+            return self._get((session_id, key))
+        finally:
+            self._collect_garbage()
+
+    def _get(self, store_key: StoreKey) -> Optional[pd.DataFrame]:
+        with self._lock:
+            self._touch(store_key[0])
+            entry = self._memory.get(store_key)
+            if entry is not None:
+                self._memory.move_to_end(store_key)
+                return entry.df
+            entry = self._spilled.get(store_key)
+            if entry is None:
+                return None
+            df, path = entry.df, entry.path
+        if df is None:
+            df = read_arrow_file(path)
+        spills: List[Spill] = []
+        with self._lock:
+            if self._spilled.get(store_key) is not entry:  # dropped or replaced meanwhile
+                current = self._memory.get(store_key)
+                df = current.df if current is not None else None
+            else:
+                self._discard(store_key)
+                if df is not None:
+                    if path is not None:
+                        self.reloads += 1
+                    spills = self._put(store_key, df, entry.nbytes)
+        self._write_spills(spills)
+        return df
+
+    def drop(self, session_id: Hashable, key: Hashable) -> None:
+        """Remove the entry from memory & disk"""
+        with self._lock:
+            self._discard((session_id, key))
+        self._collect_garbage()
+
+    def drop_session(self, session_id: Hashable) -> None:
+        """Remove all entries of the session from memory & disk"""
+        with self._lock:
+            self._drop_session(session_id)
+        self._collect_garbage()
+
+    def expire_sessions(self) -> int:
+        """Drop the sessions idle for longer than `session_ttl`, returns their number"""
+        with self._lock:
+            expired = self._expire_sessions()
+        self._collect_garbage()
+        return expired
+
+    def session_nbytes(self, session_id: Hashable) -> int:
+        """Returns in-memory bytes held by the session"""
+        return self._session_bytes.get(session_id, 0)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns store counters, e.g. for monitoring"""
+        with self._lock:
+            return {
+                "sessions": len(self._session_bytes),
+                "entries": len(self._memory),
+                "nbytes": self.nbytes,
+                "spilled_entries": len(self._spilled),
+                "spilled_nbytes": self.spilled_nbytes,
+                "spills": self.spills,
+                "reloads": self.reloads,
+                "expired": self.expired,
+            }
+
+    def _touch(self, session_id: Hashable) -> None:
+        now = time.monotonic()
+        self._last_seen[session_id] = now
+        # sweep at most every tenth of the TTL
+        if self.session_ttl is not None and now - self._swept > self.session_ttl / 10:
+            self._expire_sessions()
+
+    def _expire_sessions(self) -> int:
+        if self.session_ttl is None:
+            return 0
+        now = time.monotonic()
+        self._swept = now
+        idle = [s for s, seen in self._last_seen.items() if now - seen > self.session_ttl]
+        for session_id in idle:
+            self._drop_session(session_id)
+        self.expired += len(idle)
+        return len(idle)
+
+    def _drop_session(self, session_id: Hashable) -> None:
+        for store_key in [k for k in (*self._memory, *self._spilled) if k[0] == session_id]:
+            self._discard(store_key)
+        self._session_bytes.pop(session_id, None)
+        self._last_seen.pop(session_id, None)
+
+    def _put(self, store_key: StoreKey, df: pd.DataFrame, nbytes: int) -> List[Spill]:
+        session_id = store_key[0]
+        self._discard(store_key)
+        self._memory[store_key] = _Entry(df, nbytes)
+        self._hold(df, nbytes)
+        self._session_bytes[session_id] = self._session_bytes.get(session_id, 0) + nbytes
+        self.nbytes += nbytes
+        return self._evict(session_id, keep=store_key)
+
+    def _discard(self, store_key: StoreKey) -> None:
+        entry = self._memory.pop(store_key, None)
+        if entry is not None:
+            self._release(entry.df)
+            self.nbytes -= entry.nbytes
+            self._session_bytes[store_key[0]] -= entry.nbytes
+        entry = self._spilled.pop(store_key, None)
+        if entry is not None:
+            self.spilled_nbytes -= entry.nbytes
+            if entry.path is not None:
+                self._garbage.append(entry.path)
+
+    def _evict(self, session_id: Hashable, keep: StoreKey) -> List[Spill]:
+        spills = []
+        while self._session_bytes[session_id] > self.session_budget:
+            victim = next((k for k in self._memory if k[0] == session_id and k != keep), None)
+            if victim is None:
+                break
+            spills.append(self._spill(victim))
+        while self.nbytes > self.global_budget:
+            victim = next((k for k in self._memory if k != keep), None)
+            if victim is None:
+                break
+            spills.append(self._spill(victim))
+        while self.spilled_nbytes > self.spill_budget and self._spilled:
+            self._discard(next(iter(self._spilled)))
+        return spills
+
+    def _spill(self, store_key: StoreKey) -> Spill:
+        """
+        Move the entry to the spilled ones, still holding its dataframe: the spill file is
+        written by `_write_spills` once the lock is released
+        """
+        entry = self._memory.pop(store_key)
+        self._release(entry.df)
+        self.nbytes -= entry.nbytes
+        self._session_bytes[store_key[0]] -= entry.nbytes
+        spilled = self._spilled[store_key] = _Entry(entry.df, entry.nbytes)
+        self.spilled_nbytes += entry.nbytes
+        return store_key, spilled
+
+    def _hold(self, df: pd.DataFrame, nbytes: int) -> None:
+        """Remember the size of a frame held in memory (ids are unique while it is held)"""
+        _, entries = self._sizes.get(id(df), (nbytes, 0))
+        self._sizes[id(df)] = (nbytes, entries + 1)
+
+    def _release(self, df: pd.DataFrame) -> None:
+        nbytes, entries = self._sizes.pop(id(df))
+        if entries > 1:
+            self._sizes[id(df)] = (nbytes, entries - 1)
+
+    def _write_spills(self, spills: List[Spill]) -> None:
+        """Write the spill files (without holding the lock), then release the dataframes"""
+        for store_key, entry in spills:
+            path = _write_spill_file(self.spill_dir, entry.df)
+            with self._lock:
+                if self._spilled.get(store_key) is not entry:
+                    pass  # dropped or reloaded meanwhile
+                elif path is None:
+                    # can not be represented in Arrow -> dropped, will be resynced
+                    self._discard(store_key)
+                else:
+                    entry.df, entry.path = None, path
+                    self.spills += 1
+                    path = None
+            _remove_file(path)
+
+    def _collect_garbage(self) -> None:
+        """Remove the spill files of discarded entries (without holding the lock)"""
+        if not self._garbage:
+            return
+        with self._lock:
+            paths, self._garbage = self._garbage, []
+        for path in paths:
+            _remove_file(path)
+
+
+def write_arrow_file(path: str, df: pd.DataFrame) -> bool:
+    """
+    Atomically write the dataframe as Arrow IPC file (through a temporary file in the same
+    directory), returns `False` if it can not be represented in Arrow
+    """
+    import pyarrow as pa
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError, pa.ArrowException):
+        _remove_file(tmp_path)
+        return False
+    return True
+
+
+def read_arrow_file(path: str) -> Optional[pd.DataFrame]:
+    """
+    Read the Arrow IPC file written by `write_arrow_file` through a memory map into a pandas
+    frame (a copy, with the original dtypes restored), `None` if it is missing or corrupt
+    """
+    import pyarrow as pa
+
+    try:
+        with pa.memory_map(path, "r") as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()  # restores pandas dtypes
+    except (OSError, pa.ArrowException):
+        return None
+
+
+def _write_spill_file(spill_dir: str, df: pd.DataFrame) -> Optional[str]:
+    """
+    Atomically write the dataframe as Arrow IPC file, returns its path
+    """
+    path = os.path.join(spill_dir, f"{uuid.uuid4().hex}.arrow")
+    return path if write_arrow_file(path, df) else None
+
+
+def _remove_file(path: Optional[str]) -> None:
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+_store: Optional[SessionDataStore] = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionDataStore:
+    """
+    Returns the process-wide session data store
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SessionDataStore()
+        return _store
+
+
+def configure_session_store(**kwargs) -> SessionDataStore:
+    """
+    Replace the process-wide session data store with one configured with the given budgets,
+    see `SessionDataStore` for the options
+    """
+    global _store
+    with _store_lock:
+        _store = SessionDataStore(**kwargs)
+        return _store
@@ -0,0 +1,134 @@
+"""
+Synthetic RxDB documents generated from RxJSONSchema, e.g. for benchmarks, load tests & demos.
+
+Values honor the property `type`, `format` (`date-time`, `date`, `time` as epoch ms, `uuid`,
+`email`), `enum`, `minLength`/`maxLength`, `minimum`/`maximum` (or `min`/`max`), `multipleOf`,
+`maxItems` and nested `object`/`array` properties. `required` properties are always present,
+the other ones are missing with the given probability. The primary key is unique.
+
+Values are generated column-wise with NumPy from a seeded generator, so the same schema, size &
+seed always produce the same documents.
+"""
+
+import uuid
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_MAX_LENGTH = 24
+DEFAULT_MIN = 0
+DEFAULT_MAX = 1000
+DEFAULT_MAX_ITEMS = 3
+_EPOCH_MS_RANGE = (1546300800000, 1767225600000)  # 2019-01-01 - 2026-01-01
+_ALPHABET = np.array(list("abcdefghijklmnopqrstuvwxyz "))
+
+
+def _bounds(prop: Dict[str, Any], default_min: float, default_max: float):
+    low = prop.get("minimum", prop.get("min", default_min))
+    high = prop.get("maximum", prop.get("max", default_max))
+    return low, max(low, high)
+
+
+def _strings(rng: np.random.Generator, n: int, prop: Dict[str, Any]) -> np.ndarray:
+    min_length = prop.get("minLength", 1)
+    max_length = max(min_length, prop.get("maxLength", max(min_length, DEFAULT_MAX_LENGTH)))
+    lengths = rng.integers(min_length, max_length + 1, n)
+    chars = _ALPHABET[rng.integers(0, len(_ALPHABET), (n, max_length))]
+    # join fixed-width rows of characters, then cut every row to its length
+    rows = chars.view(f"<U{max_length}").ravel()
+    return np.array([row[:length] for row, length in zip(rows.tolist(), lengths)], dtype=object)
+
+
+def _epoch_ms(rng: np.random.Generator, n: int, prop: Dict[str, Any]) -> np.ndarray:
+    low, high = _bounds(prop, *_EPOCH_MS_RANGE)
+    return rng.integers(low, high + 1, n)
+
+
+def _values(rng: np.random.Generator, n: int, prop: Dict[str, Any]) -> List[Any]:
+    """Returns `n` values of the property"""
+    prop_type = prop.get("type")
+    if isinstance(prop_type, list):
+        prop_type = next((t for t in prop_type if t != "null"), None)
+    fmt = prop.get("format")
+
+    if prop.get("enum"):
+        options = np.array(prop["enum"], dtype=object)
+        return options[rng.integers(0, len(options), n)].tolist()
+    if prop_type == "string" and fmt in ("date-time", "date"):
+        stamps = _epoch_ms(rng, n, {}).astype("datetime64[ms]")
+        if fmt == "date":
+            return np.datetime_as_string(stamps, unit="D").tolist()
+        return [f"{s}Z" for s in np.datetime_as_string(stamps, unit="ms").tolist()]
+    if prop_type == "string" and fmt == "uuid":
+        ints = rng.integers(0, 2**63, (n, 2), dtype=np.uint64).tolist()
+        return [str(uuid.UUID(int=(high << 64) | low)) for high, low in ints]
+    if prop_type == "string" and fmt == "email":
+        names = _strings(rng, n, {"minLength": 3, "maxLength": 12})
+        return [f"{name.replace(' ', '.').strip('.') or 'user'}@example.com" for name in names]
+    if prop_type == "string":
+        return _strings(rng, n, prop).tolist()
+    if prop_type == "integer" and fmt == "time":
+        return _epoch_ms(rng, n, prop).tolist()
+    if prop_type == "integer":
+        low, high = _bounds(prop, DEFAULT_MIN, DEFAULT_MAX)
+        step = prop.get("multipleOf", 1)
+        return (rng.integers(-(-low // step), high // step + 1, n) * step).tolist()
+    if prop_type == "number":
+        low, high = _bounds(prop, DEFAULT_MIN, DEFAULT_MAX)
+        values = rng.uniform(low, high, n)
+        if prop.get("multipleOf"):
+            values = np.clip(np.round(values / prop["multipleOf"]) * prop["multipleOf"], low, high)
+        return values.tolist()
+    if prop_type == "boolean":
+        return (rng.random(n) < 0.5).tolist()
+    if prop_type == "object" and prop.get("properties"):
+        return _documents(rng, n, prop, missing=0.0)
+    if prop_type == "array" and isinstance(prop.get("items"), dict):
+        max_items = prop.get("maxItems", DEFAULT_MAX_ITEMS)
+        sizes = rng.integers(prop.get("minItems", 0), max_items + 1, n)
+        items = iter(_values(rng, int(sizes.sum()), prop["items"]))
+        return [[next(items) for _ in range(size)] for size in sizes.tolist()]
+    return [None] * n
+
+
+def _documents(
+    rng: np.random.Generator,
+    n: int,
+    schema: Dict[str, Any],
+    missing: float,
+    primary_key: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    required = set(schema.get("required") or [])
+    if primary_key:
+        required.add(primary_key)
+    columns = []
+    for name, prop in schema.get("properties", {}).items():
+        if name == primary_key:
+            width = len(str(max(n - 1, 0)))
+            values: List[Any] = [f"{i:0{width}d}" for i in range(n)]
+            if prop.get("format") == "uuid":
+                values = [str(uuid.UUID(int=i)) for i in range(n)]
+        else:
+            values = _values(rng, n, prop)
+        present = np.ones(n, dtype=bool) if name in required else rng.random(n) >= missing
+        columns.append((name, values, present.tolist()))
+    docs: List[Dict[str, Any]] = [{} for _ in range(n)]
+    for name, values, present in columns:
+        for doc, value, is_present in zip(docs, values, present):
+            if is_present and value is not None:
+                doc[name] = value
+    return docs
+
+
+def generate_docs(
+    schema: Dict[str, Any], n: int, seed: int = 0, missing: float = 0.1
+) -> List[Dict[str, Any]]:
+    """
+    Generate `n` synthetic documents of the RxJSONSchema. Properties that are not `required`
+    are missing with `missing` probability.
+    """
+    primary_key = schema.get("primaryKey")
+    if isinstance(primary_key, dict):
+        primary_key = primary_key.get("key")
+    rng = np.random.default_rng(seed)
+    return _documents(rng, n, schema, missing, primary_key)
@@ -0,0 +1,56 @@
+"""
+Rerun coalescing: how the component turns query results into component values.
+
+Every component value triggers a full script rerun, so a bulk import or a replication catch-up
+would queue a rerun per query result. With an `UpdatePolicy` the component sends at most one
+value per `min_interval` seconds: results arriving within the window are merged into the last
+one (change sets in `delta` mode are computed when the value is sent, so they cover all of
+them), which is flushed at the end of the window (`trailing`) or dropped otherwise. Once
+`max_batch` collection changes are pending, the value is sent at once. With
+`pause_while_editing` updates are held back while the data editor is in use.
+
+The component reports its counters with every value (`RxDBSessionState().updates`): query
+results `emitted`, values `sent`, results `merged` into a later value and `suppressed` ones.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+
+class UpdatePolicy:
+    """
+    Update policy of `rxdb_dataframe`: minimum interval between updates (seconds), trailing
+    flush, maximum batch (pending collection changes) & pause (seconds after the last data
+    editor edit).
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 0.0,
+        trailing: bool = True,
+        max_batch: Optional[int] = None,
+        pause_while_editing: float = 0.0,
+    ):
+        if min_interval < 0 or pause_while_editing < 0:
+            raise ValueError("Update intervals must not be negative")
+        if max_batch is not None and max_batch < 1:
+            raise ValueError("`max_batch` must be positive")
+        self.min_interval = min_interval
+        self.trailing = trailing
+        self.max_batch = max_batch
+        self.pause_while_editing = pause_while_editing
+
+    def to_args(self, edited_at: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Component args of the policy (milliseconds); `edited_at` is the time of the last data
+        editor edit, updates are paused for the rest of `pause_while_editing` since then.
+        """
+        pause = 0.0
+        if self.pause_while_editing and edited_at is not None:
+            pause = max(0.0, edited_at + self.pause_while_editing - time.time())
+        return {
+            "min_interval": round(self.min_interval * 1000),
+            "trailing": self.trailing,
+            "max_batch": self.max_batch,
+            "pause_ms": round(pause * 1000),
+        }
@@ -0,0 +1,183 @@
+"""
+Vectorized validation of dataframe rows against the RxJSONSchema.
+
+`SchemaValidator` is compiled once per schema (see `SchemaArtifacts.validator`) into per-column
+checks, each evaluated over a whole batch with pandas/NumPy operations:
+
+    required                    missing value (`None`, `NaN`, `NA`, `NaT`)
+    minLength, maxLength        string length
+    enum                        value not in the enum (categorical columns enforce it by dtype)
+    minimum, maximum            bounds (also `min`/`max`), `exclusiveMinimum`/`exclusiveMaximum`
+    pattern                     regular expression search, like JSON Schema
+
+Missing values only violate `required`. The result holds a boolean error mask per field & rule,
+so invalid rows can be rejected before their writes are sent to the browser.
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+Check = Callable[[pd.Series], np.ndarray]
+
+
+def _values(mask) -> np.ndarray:
+    if isinstance(mask, pd.Series):
+        return mask.to_numpy(dtype=bool, na_value=False)
+    return np.asarray(mask, dtype=bool)
+
+
+def _lengths(series: pd.Series) -> pd.Series:
+    if series.dtype == object:
+        series = series.map(lambda value: value if isinstance(value, str) else None)
+    return series.astype("string").str.len()
+
+
+def _min_length(limit: int) -> Check:
+    return lambda series: _values(_lengths(series) < limit)
+
+
+def _max_length(limit: int) -> Check:
+    return lambda series: _values(_lengths(series) > limit)
+
+
+def _enum(values: List[Any]) -> Check:
+    return lambda series: _values(~series.isin(values) & series.notna())
+
+
+def _bound(op: str, limit: Any) -> Check:
+    def check(series: pd.Series) -> np.ndarray:
+        numbers = pd.to_numeric(series, errors="coerce")
+        return _values(getattr(numbers, op)(limit))
+
+    return check
+
+
+def _pattern(pattern: str) -> Check:
+    re.compile(pattern)  # fail early on invalid patterns
+    # search semantics with `match` (`contains` warns about the pattern's capture groups)
+    search = f"(?s:.*?)(?:{pattern})"
+
+    def check(series: pd.Series) -> np.ndarray:
+        present = series.notna().to_numpy()
+        strings = series.astype("string").fillna("")
+        return _values(~strings.str.match(search)) & present
+
+    return check
+
+
+class ValidationResult:
+    """
+    Error masks (`(field, rule) -> bool array` over the rows) of a validated batch
+    """
+
+    def __init__(self, index: pd.Index, masks: Dict[Tuple[str, str], np.ndarray]):
+        self.index = index
+        self.masks = masks
+
+    @property
+    def invalid(self) -> np.ndarray:
+        """Rows violating any rule"""
+        mask = np.zeros(len(self.index), dtype=bool)
+        for errors in self.masks.values():
+            mask |= errors
+        return mask
+
+    @property
+    def valid(self) -> np.ndarray:
+        return ~self.invalid
+
+    def __bool__(self) -> bool:
+        """`True` if all rows are valid"""
+        return not self.invalid.any()
+
+    def field_mask(self, field: str) -> np.ndarray:
+        """Rows with an invalid value of the field"""
+        mask = np.zeros(len(self.index), dtype=bool)
+        for (name, _), errors in self.masks.items():
+            if name == field:
+                mask |= errors
+        return mask
+
+    def to_frame(self) -> pd.DataFrame:
+        """Boolean frame of errors: rows by fields (only fields with rules)"""
+        fields = list(dict.fromkeys(field for field, _ in self.masks))
+        return pd.DataFrame({field: self.field_mask(field) for field in fields}, index=self.index)
+
+    def errors(self, keys: Optional[pd.Series] = None) -> Dict[Any, Dict[str, List[str]]]:
+        """
+        Violated rules by field, of the invalid rows only, keyed by the row index label
+        (or by `keys`, e.g. primary key values)
+        """
+        labels = list(self.index if keys is None else keys)
+        result: Dict[Any, Dict[str, List[str]]] = {}
+        for (field, rule), mask in self.masks.items():
+            for position in np.flatnonzero(mask):
+                result.setdefault(labels[position], {}).setdefault(field, []).append(rule)
+        return result
+
+
+class SchemaValidator:
+    """
+    Per-column checks compiled from the (flattened) RxJSONSchema
+    """
+
+    def __init__(self, schema: dict):
+        self.checks: Dict[str, List[Tuple[str, Check]]] = {}
+        self.required = [
+            field for field in schema.get("required") or [] if field in schema.get("properties", {})
+        ]
+        for field, prop in schema.get("properties", {}).items():
+            checks = self._compile(prop)
+            if checks:
+                self.checks[field] = checks
+
+    @staticmethod
+    def _compile(prop: Dict[str, Any]) -> List[Tuple[str, Check]]:
+        checks: List[Tuple[str, Check]] = []
+        if prop.get("minLength") is not None:
+            checks.append(("minLength", _min_length(prop["minLength"])))
+        if prop.get("maxLength") is not None:
+            checks.append(("maxLength", _max_length(prop["maxLength"])))
+        if prop.get("enum"):
+            checks.append(("enum", _enum(prop["enum"])))
+        minimum = prop.get("minimum", prop.get("min"))
+        maximum = prop.get("maximum", prop.get("max"))
+        if minimum is not None:
+            checks.append(("minimum", _bound("lt", minimum)))
+        if maximum is not None:
+            checks.append(("maximum", _bound("gt", maximum)))
+        if isinstance(prop.get("exclusiveMinimum"), (int, float)):
+            checks.append(("exclusiveMinimum", _bound("le", prop["exclusiveMinimum"])))
+        if isinstance(prop.get("exclusiveMaximum"), (int, float)):
+            checks.append(("exclusiveMaximum", _bound("ge", prop["exclusiveMaximum"])))
+        if prop.get("pattern"):
+            checks.append(("pattern", _pattern(prop["pattern"])))
+        return checks
+
+    def validate(
+        self, df: pd.DataFrame, filled: Optional[Dict[str, np.ndarray]] = None
+    ) -> ValidationResult:
+        """
+        Validate all rows of the frame, columns missing from the frame are skipped. `filled`
+        masks the rows of fields whose missing values are filled in later (e.g. stamped by the
+        browser on write), they do not violate `required`.
+        """
+        masks: Dict[Tuple[str, str], np.ndarray] = {}
+        for field in self.required:
+            if field in df.columns:
+                missing = df[field].isna().to_numpy()
+                if filled and field in filled:
+                    missing = missing & ~filled[field]
+                masks[(field, "required")] = missing
+        for field, checks in self.checks.items():
+            if field not in df.columns:
+                continue
+            series = df[field]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                series = series.astype(object)
+            for rule, check in checks:
+                masks[(field, rule)] = check(series)
+        return ValidationResult(df.index, masks)
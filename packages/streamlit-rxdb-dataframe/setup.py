@@ -26,6 +26,7 @@ setuptools.setup(
             "pytest==7.4.0",
             "playwright==1.39.0",
             "requests==2.31.0",
+            "psutil>=5.9",
             "pytest-playwright-snapshot==1.0",
             "pytest-rerunfailures==12.0",
         ]
@@ -0,0 +1,113 @@
+import pandas as pd
+import pytest
+
+import rxdb_dataframe
+from rxdb_dataframe.aggregates import AggregateSpec, MaterializedAggregate, changed_rows
+from rxdb_dataframe.arrow import Transport
+from rxdb_dataframe.changes import apply_changes, changes_to_dataframe
+from rxdb_dataframe.plan import compile_schema
+
+schema = {
+    "primaryKey": "id",
+    "properties": {
+        "id": {"type": "string"},
+        "group": {"type": "string"},
+        "estimate": {"type": "number"},
+        "completed": {"type": "boolean"},
+        "createdAt": {"type": "string", "format": "date-time"},
+    },
+}
+docs = [
+    {
+        "id": str(i),
+        "group": "ab"[i % 2],
+        "estimate": float(i),
+        "completed": i % 3 == 0,
+        "createdAt": f"2024-01-0{1 + i % 3}T10:00:00Z",
+    }
+    for i in range(9)
+]
+spec = AggregateSpec(
+    {
+        "n": (None, "count"),
+        "done": ("completed", "sum"),
+        "low": ("estimate", "min"),
+        "high": ("estimate", "max"),
+        "avg": ("estimate", "mean"),
+    },
+    by=["group"],
+    time_column="createdAt",
+    freq="1D",
+)
+
+
+def _full(df):
+    aggregate = MaterializedAggregate(spec)
+    aggregate.recompute(df)
+    return aggregate.result().sort_index()
+
+
+def test_incremental_update_matches_full_recompute():
+    plan = compile_schema(schema)
+    df = changes_to_dataframe({"docs": docs}, plan, "id")
+    aggregate = MaterializedAggregate(spec)
+    aggregate.refresh(df)
+    aggregate.refresh(df)
+    assert aggregate.full_updates == 1
+
+    changes = {
+        "inserted": [{**docs[0], "id": "new", "estimate": 100.0}],
+        "updated": [{**docs[3], "estimate": -1.0}, {**docs[8], "group": "a"}],
+        "deleted": ["0", "6"],  # "0" is the min of its group
+    }
+    removed, added_keys = changed_rows(df, changes, "id")
+    df = apply_changes(df, changes, plan, "id")
+    aggregate.update(df, removed, df[df.index.isin(added_keys)])
+
+    assert aggregate.incremental_updates == 1 and aggregate.full_updates == 1
+    result = aggregate.result().sort_index()
+    expected = _full(df)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    assert result.loc[("b", pd.Timestamp("2024-01-01", tz="UTC")), "low"] == -1.0
+
+
+def test_groups_without_rows_are_dropped():
+    df = compile_schema(schema).apply(docs)
+    aggregate = MaterializedAggregate(AggregateSpec({"n": ("id", "count")}))
+    aggregate.recompute(df)
+    assert aggregate.result()["n"].tolist() == [9]
+    aggregate.update(df.iloc[:0], df, df.iloc[:0])
+    assert aggregate.result().empty
+
+
+def test_invalid_spec():
+    with pytest.raises(ValueError):
+        AggregateSpec({"x": ("estimate", "median")})
+    with pytest.raises(ValueError):
+        AggregateSpec({"x": ("estimate", "sum")}, time_column="createdAt")
+
+
+def test_delta_mode_updates_aggregates(monkeypatch):
+    results = []
+    monkeypatch.setattr(rxdb_dataframe.component, "_rxdb_dataframe", lambda **kwargs: results[-1])
+    state = rxdb_dataframe.RxDBSessionState()
+    state.seq, state.aggregates = None, {}
+    config = {"name": "aggregated", "schema": schema}
+
+    def render(changes):
+        results.append({"changes": changes, "info": {}, "query": {}})
+        return rxdb_dataframe.rxdb_dataframe(
+            config, transport=Transport(delta=True), aggregates={"by_group": spec}
+        )
+
+    render({"type": "full", "seq": 1, "docs": docs})
+    aggregate = state.aggregates["by_group"]
+    assert aggregate.full_updates == 1
+    df = render({"type": "delta", "seq": 2, "inserted": [], "updated": [], "deleted": ["1"]})
+    assert (aggregate.full_updates, aggregate.incremental_updates) == (1, 1)
+    pd.testing.assert_frame_equal(
+        aggregate.result().sort_index(), _full(df), check_dtype=False
+    )
+
+    rxdb_dataframe.rxdb_dataframe(config, transport=Transport(delta=True))
+    assert state.aggregates == {}
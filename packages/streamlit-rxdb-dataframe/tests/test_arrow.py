@@ -0,0 +1,69 @@
+import json
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from rxdb_dataframe.arrow import Transport, read_arrow_result
+from rxdb_dataframe.changes import apply_changes, changes_to_dataframe
+from rxdb_dataframe.plan import compile_schema
+
+schema = {
+    "primaryKey": "id",
+    "properties": {
+        "id": {"type": "string"},
+        "title": {"type": "string"},
+        "completed": {"type": "boolean"},
+        "createdAt": {"type": "string", "format": "date-time"},
+        "meta": {"type": "object"},
+    },
+}
+
+
+def make_payload(ids, metadata):
+    table = pa.table(
+        {
+            "id": pa.array(ids, pa.string()),
+            "title": pa.array([f"title {i}" for i in ids], pa.string()),
+            "completed": pa.array([True] * len(ids), pa.bool_()),
+            "createdAt": pa.array([0] * len(ids), pa.timestamp("ms", "UTC")),
+            "meta": pa.array(['{"a": 1}'] * len(ids), pa.string()),
+        }
+    ).replace_schema_metadata({"rxdb": json.dumps(metadata)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def test_read_arrow_result():
+    payload = make_payload(["a", "b"], {"info": {"rev": 1}, "query": {"selector": {}}})
+    result = read_arrow_result(payload, schema)
+    assert result["info"] == {"rev": 1}
+
+    df = compile_schema(schema).apply(result["docs"])
+    assert isinstance(df["title"].dtype, pd.ArrowDtype)
+    assert isinstance(df["completed"].dtype, pd.ArrowDtype)
+    assert df["createdAt"].dtype.kind == "M"
+    assert df["meta"].iloc[0] == {"a": 1}
+
+
+def test_read_arrow_result_changes():
+    plan = compile_schema(schema)
+    full = {"changes": {"type": "full", "seq": 1, "deleted": []}, "info": {}, "query": {}}
+    result = read_arrow_result(make_payload(["a", "b"], full), schema)
+    df = changes_to_dataframe(result["changes"], plan, "id")
+
+    delta = {"changes": {"type": "delta", "seq": 2, "inserted": 1, "deleted": ["a"]}}
+    result = read_arrow_result(make_payload(["c", "b"], {**delta, "info": {}, "query": {}}), schema)
+    assert list(result["changes"]["inserted"]["id"]) == ["c"]
+    assert list(result["changes"]["updated"]["id"]) == ["b"]
+
+    df = apply_changes(df, result["changes"], plan, "id")
+    assert list(df.index) == ["b", "c"]
+
+
+def test_transport_args():
+    assert Transport().to_args() == {"transport": "json", "delta": False, "measure_payload": False}
+    assert Transport("arrow", delta=True).to_args()["transport"] == "arrow"
+    with pytest.raises(ValueError):
+        Transport("csv")
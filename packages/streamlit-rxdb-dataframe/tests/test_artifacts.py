@@ -0,0 +1,27 @@
+import rxdb_dataframe
+
+schema = {
+    "version": 0,
+    "primaryKey": "id",
+    "properties": {"id": {"type": "string"}, "completed": {"type": "boolean"}},
+}
+
+
+def test_schema_artifacts_are_shared():
+    config = {"name": "todo", "schema": schema}
+    artifacts = rxdb_dataframe._schema_artifacts(config)
+    assert rxdb_dataframe._schema_artifacts(dict(config)) is artifacts
+    assert artifacts.primary_key == "id"
+    assert artifacts.dtypes == {"id": "object", "completed": "boolean"}
+    assert set(artifacts.column_config) == {"id", "completed"}
+
+    migrated = {"name": "todo", "schema": {**schema, "version": 1}}
+    assert rxdb_dataframe._schema_artifacts(migrated) is not artifacts
+
+
+def test_rxdb_dataframe_uses_shared_column_config(monkeypatch):
+    monkeypatch.setattr(rxdb_dataframe.component, "_rxdb_dataframe", lambda **kwargs: None)
+    config = {"name": "todo", "schema": schema}
+    rxdb_dataframe.rxdb_dataframe(config)
+    state = rxdb_dataframe.RxDBSessionState()
+    assert state.column_config is rxdb_dataframe._schema_artifacts(config).column_config
@@ -0,0 +1,149 @@
+import asyncio
+import threading
+
+import rxdb_dataframe
+from rxdb_dataframe.changefeed import (
+    RXDB_CHANGE_RESYNC,
+    ChangeEvent,
+    ChangeFeed,
+    drop_closed_change_feeds,
+    publish_change_events,
+    session_change_feed,
+)
+
+schema = {
+    "primaryKey": "id",
+    "properties": {"id": {"type": "string"}, "title": {"type": "string"}},
+}
+
+
+def _event(seq, operation="INSERT"):
+    return {"seq": seq, "operation": operation, "key": str(seq), "doc": {"id": str(seq)}}
+
+
+def test_backpressure_accepts_what_the_fullest_subscriber_takes():
+    feed = ChangeFeed("todo")
+    assert feed.publish([ChangeEvent("INSERT", "a")]) == 1  # no subscribers -> dropped
+
+    small, large = feed.subscribe(maxsize=2), feed.subscribe(maxsize=10)
+    events = [ChangeEvent("INSERT", str(i), seq=i) for i in range(1, 4)]
+    assert feed.publish(events) == 2
+    assert [event.key for event in small.events(timeout=0)] == ["1", "2"]
+    assert feed.publish(events[2:]) == 1
+    assert [event.key for event in large.events(timeout=0)] == ["1", "2", "3"]
+
+    small.close()
+    assert feed.subscriptions == [large]
+    assert small.get().key == "3"  # buffered events are still delivered
+    assert small.get() is None  # closed subscriptions do not block
+
+
+def test_sync_and_async_consumers():
+    feed = ChangeFeed("todo")
+    received = []
+    with feed.subscribe() as subscription:
+        consumer = threading.Thread(target=lambda: received.extend(subscription))
+        consumer.start()
+        feed.publish([ChangeEvent("INSERT", "a"), ChangeEvent("DELETE", "a")])
+
+    consumer.join(timeout=5)
+    assert [event.operation for event in received] == ["INSERT", "DELETE"]
+
+    async def consume(subscription):
+        return [event.key async for event in subscription]
+
+    async def main():
+        subscription = feed.subscribe()
+        task = asyncio.ensure_future(consume(subscription))
+        await asyncio.sleep(0)
+        await asyncio.get_running_loop().run_in_executor(
+            None, feed.publish, [ChangeEvent("UPDATE", "b")]
+        )
+        subscription.close()
+        return await asyncio.wait_for(task, 5)
+
+    assert asyncio.run(main()) == ["b"]
+
+
+def test_publish_acknowledges_and_resyncs():
+    feed = ChangeFeed("todo")
+    subscription = feed.subscribe(maxsize=3)
+    envelope = {"instance": "x", "dropped": 0, "events": [_event(1), _event(2)]}
+
+    progress = publish_change_events(feed, envelope, {})
+    assert progress == {"instance": "x", "ack": 2, "dropped": 0}
+    # re-sent events are published once
+    envelope["events"].append(_event(3, "UPDATE"))
+    progress = publish_change_events(feed, envelope, progress)
+    assert progress["ack"] == 3
+    assert [event.seq for event in subscription.events(timeout=0)] == [1, 2, 3]
+
+    # the component dropped events -> consumers are told to resync
+    envelope = {"instance": "x", "dropped": 5, "events": [_event(9)]}
+    progress = publish_change_events(feed, envelope, progress)
+    assert [event.operation for event in subscription.events(timeout=0)] == [
+        RXDB_CHANGE_RESYNC,
+        "INSERT",
+    ]
+    # a new component instance restarts the sequence
+    progress = publish_change_events(feed, {"instance": "y", "events": [_event(1)]}, progress)
+    assert progress == {"instance": "y", "ack": 1, "dropped": 0}
+    assert subscription.get(timeout=0).operation == RXDB_CHANGE_RESYNC
+
+
+def test_resync_of_new_instance_waits_for_a_full_buffer():
+    feed = ChangeFeed("todo")
+    subscription = feed.subscribe(maxsize=1)
+    progress = publish_change_events(feed, {"instance": "x", "events": [_event(1)]}, {})
+    assert progress["ack"] == 1  # the buffer is full now
+
+    envelope = {"instance": "y", "events": [_event(1)]}
+    assert publish_change_events(feed, envelope, progress) == progress
+    assert subscription.get(timeout=0).seq == 1
+    progress = publish_change_events(feed, envelope, progress)
+    assert progress == {"instance": "y", "ack": 0, "dropped": 0}
+    assert subscription.get(timeout=0).operation == RXDB_CHANGE_RESYNC
+
+
+def test_feeds_of_ended_sessions_are_closed():
+    ended = session_change_feed("ended", "todo")
+    subscription = ended.subscribe()
+    active = session_change_feed("active", "todo")
+
+    assert drop_closed_change_feeds(lambda session_id: session_id != "ended") == 1
+    assert subscription.closed
+    assert session_change_feed("ended", "todo") is not ended
+    assert session_change_feed("active", "todo") is active
+
+
+def test_rxdb_dataframe_publishes_change_events(monkeypatch):
+    calls = []
+    value = {
+        "docs": [{"id": "a", "title": "A"}],
+        "info": {},
+        "query": {},
+        "change_events": {"instance": "x", "dropped": 0, "events": [_event(1)]},
+    }
+
+    def component(**kwargs):
+        calls.append(kwargs)
+        return value
+
+    monkeypatch.setattr(rxdb_dataframe.component, "_rxdb_dataframe", component)
+    state = rxdb_dataframe.RxDBSessionState()
+    state.change_feed = {}
+    config = {"name": "feed", "schema": schema}
+    subscription = rxdb_dataframe.get_change_feed("feed").subscribe()
+
+    rxdb_dataframe.rxdb_dataframe(config, change_feed=True)
+    assert calls[-1]["change_feed"] == {}
+    assert subscription.get(timeout=0) == ChangeEvent(
+        "INSERT", "1", {"id": "1"}, None, 1, "feed"
+    )
+    rxdb_dataframe.rxdb_dataframe(config, change_feed=True)
+    assert calls[-1]["change_feed"] == {"instance": "x", "ack": 1, "dropped": 0}
+    assert subscription.get(timeout=0) is None
+    subscription.close()
+
+    rxdb_dataframe.rxdb_dataframe(config)
+    assert calls[-1]["change_feed"] is None
@@ -0,0 +1,70 @@
+import pandas as pd
+from rxdb_dataframe.changes import (
+    apply_changes,
+    apply_result_changes,
+    changes_to_dataframe,
+    get_primary_key,
+)
+from rxdb_dataframe.plan import compile_schema
+
+schema = {
+    "primaryKey": "id",
+    "properties": {
+        "id": {"type": "string"},
+        "title": {"type": "string"},
+        "completed": {"type": "boolean"},
+        "createdAt": {"type": "string", "format": "date-time"},
+    },
+}
+
+
+def make_doc(id, title, completed=False):
+    return {"id": id, "title": title, "completed": completed, "createdAt": "2024-01-01T00:00:00Z"}
+
+
+def test_get_primary_key():
+    assert get_primary_key(schema) == "id"
+    assert get_primary_key({"primaryKey": {"key": "pk", "fields": ["a", "b"]}}) == "pk"
+
+
+def test_apply_changes():
+    plan = compile_schema(schema)
+    full = {"type": "full", "seq": 1, "docs": [make_doc("a", "one"), make_doc("b", "two")]}
+    df = changes_to_dataframe(full, plan, "id")
+    assert list(df.index) == ["a", "b"]
+    assert isinstance(df["createdAt"].dtype, pd.DatetimeTZDtype)
+
+    delta = {
+        "type": "delta",
+        "seq": 2,
+        "inserted": [make_doc("c", "three")],
+        "updated": [make_doc("b", "two", completed=True)],
+        "deleted": ["a"],
+    }
+    df = apply_changes(df, delta, plan, "id")
+    assert list(df.index) == ["b", "c"]
+    assert df.loc["b", "completed"]
+    assert df.loc["c", "title"] == "three"
+
+    # updates of unknown rows are treated as inserts
+    df = apply_changes(df, {"updated": [make_doc("d", "four")]}, plan, "id")
+    assert list(df.index) == ["b", "c", "d"]
+
+
+def test_apply_result_changes_sequence_gap():
+    from rxdb_dataframe import RxDBSessionState
+
+    state = RxDBSessionState()
+    plan = compile_schema(schema)
+    full = {"type": "full", "seq": 1, "docs": [make_doc("a", "one")]}
+    df = apply_result_changes(state, {"changes": full}, plan, "id")
+    assert state.seq == 1 and len(df) == 1
+
+    gap = {"type": "delta", "seq": 3, "inserted": [make_doc("b", "two")]}
+    df = apply_result_changes(state, {"changes": gap}, plan, "id")
+    assert state.seq is None  # resync requested
+    assert list(df.index) == ["a"]
+
+    resync = {"type": "full", "seq": 4, "docs": [make_doc("a", "one"), make_doc("b", "two")]}
+    df = apply_result_changes(state, {"changes": resync}, plan, "id")
+    assert state.seq == 4 and list(df.index) == ["a", "b"]
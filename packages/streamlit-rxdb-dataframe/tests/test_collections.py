@@ -0,0 +1,79 @@
+import streamlit as st
+
+import rxdb_dataframe
+
+todo = {
+    "name": "todo",
+    "schema": {
+        "primaryKey": "id",
+        "properties": {"id": {"type": "string"}, "title": {"type": "string"}},
+    },
+    "options": {"initialDocs": [{"id": "1", "title": "first"}]},
+}
+tag = {
+    "name": "tag",
+    "schema": {
+        "primaryKey": "name",
+        "properties": {"name": {"type": "string"}, "count": {"type": "integer"}},
+    },
+}
+
+
+def test_collections_batched_results(monkeypatch):
+    calls, changed = [], []
+    key = "batched"
+
+    def component(**kwargs):
+        calls.append(kwargs)
+        return st.session_state.get(key)
+
+    def render(**kwargs):
+        return rxdb_dataframe.rxdb_collections(
+            [todo, tag], queries={"todo": {"selector": {"title": "first"}}}, key=key, **kwargs
+        )
+
+    monkeypatch.setattr(rxdb_dataframe.component, "_rxdb_dataframe", component)
+    frames = render()
+    first = calls[-1]
+    assert first["collections"] == ["todo", "tag"]
+    assert set(first["collection_configs"]) == {"todo", "tag"}
+    assert "initialDocs" not in first["collection_configs"]["todo"]["options"]
+    assert first["seed"]["todo"]["total"] == 1 and first["seed"]["tag"] is None
+    assert first["queries"] == {"todo": {"selector": {"title": "first"}}, "tag": {}}
+    assert first["held"] == {}
+    assert list(frames["todo"].columns) == ["id", "title"] and frames["tag"].empty
+
+    meta = {"info": {}, "query": {}}
+
+    # one batched value with the results of both collections
+    st.session_state[key] = {
+        "results": {
+            "todo": {"docs": [{"id": "1", "title": "first"}], **meta, "version": "a:1"},
+            "tag": {"docs": [{"name": "x", "count": 2}], **meta, "version": "b:1"},
+        }
+    }
+    frames = render(on_change=lambda state: changed.append(state))
+    assert calls[-1]["held"] == {"todo": "a:1", "tag": "b:1"}
+    assert frames["todo"]["title"].tolist() == ["first"]
+    assert frames["tag"]["count"].tolist() == [2]
+    assert len(changed) == 2
+
+    # only the changed collection carries documents
+    st.session_state[key] = {
+        "results": {
+            "todo": {"info": {}, "query": {}, "version": "a:1"},
+            "tag": {"docs": [], "info": {}, "query": {}, "version": "b:2"},
+        }
+    }
+    frames = render(on_change=lambda state: changed.append(state))
+    assert calls[-1]["held"] == {"todo": "a:1", "tag": "b:2"}
+    assert frames["todo"]["title"].tolist() == ["first"] and frames["tag"].empty
+    assert len(changed) == 3
+
+    # namespaced session state, apart from the one of `rxdb_dataframe`
+    state = rxdb_dataframe.get_collection_state("tag", key)
+    assert state.version == "b:2" and state.dataframe.empty
+    assert rxdb_dataframe.RxDBSessionState().version != "b:2"
+    rxdb_dataframe.get_collection_state("todo", key).dataframe = None
+    render()
+    assert calls[-1]["held"] == {"tag": "b:2"}  # the component re-sends the lost result
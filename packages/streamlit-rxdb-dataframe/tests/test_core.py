@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+from rxdb_dataframe import core
+from rxdb_dataframe.plan import compile_schema
+
+schema = {
+    "primaryKey": "id",
+    "properties": {
+        "id": {"type": "string"},
+        "done": {"type": "boolean"},
+        "estimate": {"type": "number"},
+    },
+}
+
+
+def test_import_is_headless():
+    code = (
+        "import sys, rxdb_dataframe, rxdb_dataframe.core as core; "
+        "assert core.RxJsonSchema and rxdb_dataframe.__title__; "
+        "print(sorted(m for m in ('pandas', 'pyarrow', 'streamlit') if m in sys.modules))"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.run(
+        [sys.executable, "-c", code], cwd=root, check=True, capture_output=True, text=True
+    )
+    output = process.stdout
+    assert output.strip() == "[]"
+
+
+def test_binding_imports_only_what_it_uses():
+    code = (
+        "import sys, rxdb_dataframe.component; "
+        "print(sorted(m for m in ('rxdb_dataframe.replication', 'sqlite3', 'http.server') "
+        "if m in sys.modules))"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.run(
+        [sys.executable, "-c", code], cwd=root, check=True, capture_output=True, text=True
+    )
+    assert process.stdout.strip() == "[]"
+
+
+def test_lazy_names():
+    assert core.compile_schema is compile_schema
+    assert "query_dataframe" in dir(core)
+    df = core.get_dataframe_by_schema(schema)
+    dtypes = df.dtypes.astype(str).to_dict()
+    assert dtypes == {"id": "object", "done": "bool", "estimate": "float64"}
@@ -0,0 +1,78 @@
+import pandas as pd
+import rxdb_dataframe
+from rxdb_dataframe.edits import apply_editing_state, diff_dataframes
+from rxdb_dataframe.plan import compile_schema
+
+schema = {
+    "primaryKey": "id",
+    "properties": {
+        "id": {"type": "string"},
+        "title": {"type": "string"},
+        "completed": {"type": "boolean"},
+        "createdAt": {"type": "string", "format": "date-time"},
+        "last_modified": {"type": "integer", "format": "time"},
+    },
+}
+docs = [
+    {"id": "a", "title": "A", "completed": False, "createdAt": "2024-01-01T00:00:00.000Z",
+     "last_modified": 1704067200000},
+    {"id": "b", "title": "B", "completed": True, "createdAt": "2024-01-02T00:00:00.000Z"},
+    {"id": "c", "title": "C", "completed": False, "createdAt": "2024-01-03T00:00:00.000Z"},
+]
+plan = compile_schema(schema)
+
+
+def test_plan_encode_round_trip():
+    assert plan.encode(plan.apply(docs)) == docs
+
+
+def test_diff_dataframes():
+    baseline = plan.apply(docs)
+    edited = baseline.copy()
+    edited.loc[0, "title"] = "A!"
+    edited.loc[1, "createdAt"] = None
+    added = plan.apply([{"id": "d", "title": "D", "completed": False}])
+    edited = pd.concat([edited.drop(index=2), added], ignore_index=True)
+
+    writes = diff_dataframes(edited, baseline, plan, "id")
+    assert writes.remove == ["c"]
+    assert writes.upsert == [{"id": "d", "title": "D", "completed": False}]
+    assert writes.patch == [{"id": "a", "title": "A!"}, {"id": "b", "createdAt": None}]
+
+    assert not diff_dataframes(baseline.copy(), baseline, plan, "id")
+
+
+def test_apply_editing_state():
+    baseline = plan.apply(docs)
+    editing_state = {
+        "edited_rows": {"0": {"completed": True, "last_modified": "2024-01-05T00:00:00"}},
+        "added_rows": [{"title": "New"}],
+        "deleted_rows": [2],
+    }
+    edited, original = apply_editing_state(baseline, editing_state, plan, "id", ["new-id"])
+    writes = diff_dataframes(edited, original, plan, "id")
+    assert writes.patch == [{"id": "a", "completed": True, "last_modified": 1704412800000}]
+    assert writes.upsert == [{"id": "new-id", "title": "New"}]
+    assert writes.remove == ["c"]
+
+
+def test_rxdb_dataframe_writes(monkeypatch):
+    calls = []
+
+    def component(**kwargs):
+        calls.append(kwargs)
+        return {"docs": docs, "info": {}, "query": {}, "version": "v"}
+
+    monkeypatch.setattr(rxdb_dataframe.component, "_rxdb_dataframe", component)
+    config = {"name": "edits", "schema": schema}
+    rxdb_dataframe.rxdb_dataframe(config)
+
+    state = {"edited_rows": {"1": {"title": "B!"}}, "added_rows": [], "deleted_rows": []}
+    rxdb_dataframe.ss[rxdb_dataframe.RXDB_COLLECTION_EDITOR_KEY] = state
+    rxdb_dataframe.rxdb_dataframe(config)
+    writes = calls[-1]["writes"]
+    assert writes["patch"] == [{"id": "b", "title": "B!"}]
+
+    rxdb_dataframe.rxdb_dataframe(config)
+    assert calls[-1]["writes"]["id"] == writes["id"]  # unchanged edits -> same write set
+    rxdb_dataframe.ss[rxdb_dataframe.RXDB_COLLECTION_EDITOR_KEY] = {}
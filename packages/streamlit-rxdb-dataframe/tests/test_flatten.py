@@ -0,0 +1,75 @@
+import pandas as pd
+from rxdb_dataframe.edits import diff_dataframes
+from rxdb_dataframe.flatten import child_frame, flatten_schema
+from rxdb_dataframe.mango import query_dataframe
+from rxdb_dataframe.plan import compile_schema
+
+schema = {
+    "primaryKey": "id",
+    "required": ["id", "address"],
+    "properties": {
+        "id": {"type": "string"},
+        "address": {
+            "type": "object",
+            "required": ["city"],
+            "properties": {
+                "city": {"type": "string"},
+                "geo": {"type": "object", "properties": {"lat": {"type": "number"}}},
+            },
+        },
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "visits": {
+            "type": "array",
+            "items": {"type": "object", "properties": {"day": {"type": "integer"}}},
+        },
+        "extra": {"type": "object"},
+    },
+}
+docs = [
+    {"id": "a", "address": {"city": "Kyiv", "geo": {"lat": 50.4}}, "tags": ["x", "y"],
+     "visits": [{"day": 1}, {"day": 2}]},
+    {"id": "b", "address": {"city": "Lviv"}, "tags": [], "extra": {"any": 1}},
+]
+
+
+def test_flatten_schema():
+    flat = flatten_schema(schema)
+    assert list(flat["properties"]) == [
+        "id", "address.city", "address.geo.lat", "tags", "visits", "extra"
+    ]
+    assert flat["required"] == ["id", "address.city"]
+
+
+def test_flattened_plan():
+    plan = compile_schema(schema, flatten=True)
+    df = plan.apply(docs)
+    assert df["address.city"].tolist() == ["Kyiv", "Lviv"]
+    assert df["address.geo.lat"].dtype == "float64"
+    assert isinstance(df["tags"].dtype, pd.ArrowDtype)
+    assert df["tags"].tolist() == [["x", "y"], []]
+
+    # already decoded frames (e.g. Arrow transport) are flattened the same way
+    decoded = pd.DataFrame({"id": ["a"], "address": [{"city": "Kyiv"}]})
+    assert plan.apply(decoded)["address.city"].tolist() == ["Kyiv"]
+
+    assert plan.encode(df)[1] == {"id": "b", "address": {"city": "Lviv"}, "tags": [],
+                                  "extra": {"any": 1}}
+    assert list(query_dataframe(df, {"selector": {"address.city": "Lviv"}})["id"]) == ["b"]
+
+
+def test_flattened_patch_writes_top_level_object():
+    plan = compile_schema(schema, flatten=True)
+    baseline = plan.apply(docs)
+    edited = baseline.copy()
+    edited.loc[1, "address.city"] = "Odesa"
+    writes = diff_dataframes(edited, baseline, plan, "id")
+    assert writes.patch == [{"id": "b", "address": {"city": "Odesa"}}]
+
+
+def test_child_frame():
+    df = compile_schema(schema, flatten=True).apply(docs)
+    tags = child_frame(df, "tags", "id")
+    assert tags.values.tolist() == [["a", "x"], ["a", "y"]]
+    visits = child_frame(df, "visits", "id")
+    assert list(visits.columns) == ["id", "visits.day"]
+    assert visits["visits.day"].tolist() == [1, 2]
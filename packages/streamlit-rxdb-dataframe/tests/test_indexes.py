@@ -0,0 +1,94 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rxdb_dataframe.changes import apply_changes, changes_to_dataframe
+from rxdb_dataframe.indexes import DataFrameIndexes, schema_indexes
+from rxdb_dataframe.mango import query_dataframe
+from rxdb_dataframe.plan import compile_schema
+from rxdb_dataframe.synthetic import generate_docs
+
+with open(os.path.join(os.path.dirname(__file__), "..", "benchmarks", "schema.json")) as f:
+    schema = {**json.load(f), "internalIndexes": [["estimate"], ["completed", "estimate"]]}
+
+QUERIES = [
+    {"selector": {"priority": "high"}},
+    {"selector": {"priority": "low", "createdAt": {"$gte": "2022-01-01T00:00:00Z"}}},
+    {"selector": {"createdAt": {"$gt": "2021-06-01T00:00:00Z", "$lt": "2023-01-01T00:00:00Z"}}},
+    {"selector": {"$and": [{"completed": True}, {"estimate": {"$lte": 30}}]}},
+    {"selector": {"estimate": {"$gt": 90}, "title": {"$regex": "^a"}}},
+    {"selector": {}, "sort": [{"createdAt": "desc"}]},
+    {"selector": {"createdAt": {"$lt": "2020-01-01T00:00:00Z"}}, "sort": [{"createdAt": "asc"}]},
+    {"selector": {"estimate": {"$gte": 50}}, "sort": [{"estimate": "asc"}], "limit": 20},
+]
+
+
+@pytest.fixture(scope="module")
+def frame():
+    plan = compile_schema(schema)
+    docs = generate_docs(schema, 2000, seed=3)
+    return plan, docs, changes_to_dataframe({"docs": docs}, plan, "id")
+
+
+def test_schema_indexes():
+    assert schema_indexes(schema, "id") == [
+        ("createdAt", "id"),
+        ("priority", "createdAt", "id"),
+        ("estimate", "id"),
+        ("completed", "estimate", "id"),
+    ]
+    assert schema_indexes({"indexes": ["_meta.lwt", "id"]}, "id") == [("id",)]
+
+
+def test_lookup_and_range(frame):
+    _, _, df = frame
+    indexes = DataFrameIndexes(schema_indexes(schema, "id"))
+    indexes.build(df)
+
+    high = indexes["priority", "createdAt", "id"].lookup("high")
+    assert set(high) == set(np.flatnonzero((df["priority"] == "high").fillna(False)))
+    assert df["createdAt"].iloc[high].is_monotonic_increasing
+
+    positions = indexes["estimate", "id"].range(lower=10, upper=20, upper_inclusive=False)
+    expected = np.flatnonzero(((df["estimate"] >= 10) & (df["estimate"] < 20)).fillna(False))
+    assert sorted(positions) == list(expected)
+    assert not indexes["estimate", "id"].complete  # optional property, missing in some docs
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_indexed_query_matches_scan(frame, query):
+    _, _, df = frame
+    indexes = DataFrameIndexes(schema_indexes(schema, "id"))
+    indexes.build(df)
+    expected = query_dataframe(df, query, "id")
+    pd.testing.assert_frame_equal(query_dataframe(df, query, "id", indexes), expected)
+
+
+def test_delta_changes_patch_indexes(frame):
+    plan, docs, df = frame
+    indexes = DataFrameIndexes(schema_indexes(schema, "id"))
+    indexes.build(df)
+    inserted = generate_docs(schema, 10, seed=4)
+    for i, doc in enumerate(inserted):
+        doc["id"] = f"new-{i}"
+    changes = {
+        "type": "delta",
+        "inserted": inserted,
+        "updated": [{**doc, "estimate": 1, "priority": "low"} for doc in docs[5:15]],
+        "deleted": [doc["id"] for doc in docs[100:110]],
+    }
+    patched = apply_changes(df.copy(), changes, plan, "id")
+    indexes.update(df, patched, changes, "id")
+    assert indexes.updates == 1 and indexes.builds == 1
+
+    rebuilt = DataFrameIndexes(schema_indexes(schema, "id"))
+    rebuilt.build(patched)
+    for fields, index in rebuilt.indexes.items():
+        np.testing.assert_array_equal(indexes[fields].positions, index.positions)
+    for query in QUERIES:
+        pd.testing.assert_frame_equal(
+            query_dataframe(patched, query, "id", indexes), query_dataframe(patched, query, "id")
+        )
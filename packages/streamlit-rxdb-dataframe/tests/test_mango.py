@@ -0,0 +1,107 @@
+import pandas as pd
+import pytest
+from rxdb_dataframe.mango import LocalQuery, compile_selector, is_narrowing, query_dataframe
+from rxdb_dataframe.plan import compile_schema
+
+schema = {
+    "primaryKey": "id",
+    "properties": {
+        "id": {"type": "string"},
+        "title": {"type": "string"},
+        "completed": {"type": "boolean"},
+        "count": {"type": "integer"},
+        "createdAt": {"type": "string", "format": "date-time"},
+        "meta": {"type": "object"},
+    },
+}
+docs = [
+    {"id": "a", "title": "Buy milk", "completed": True, "count": 3,
+     "createdAt": "2024-01-01T00:00:00.000Z", "meta": {"tag": "home"}},
+    {"id": "b", "title": "Write docs", "completed": False, "count": 1,
+     "createdAt": "2024-02-01T00:00:00.000Z", "meta": {"tag": "work"}},
+    {"id": "c", "title": "buy bread", "completed": False,
+     "createdAt": "2024-03-01T00:00:00.000Z"},
+]
+df = compile_schema(schema).apply(docs)
+
+
+def ids(selector):
+    return list(df[compile_selector(selector)(df)]["id"])
+
+
+def test_compile_selector():
+    assert ids({}) == ["a", "b", "c"]
+    assert ids({"completed": False}) == ["b", "c"]
+    assert ids({"completed": {"$eq": True}}) == ["a"]
+    assert ids({"count": {"$ne": 3}}) == ["b", "c"]  # missing values match $ne
+    assert ids({"count": {"$gt": 1}}) == ["a"]  # ...but never range operators
+    assert ids({"count": {"$gte": 1, "$lt": 3}}) == ["b"]
+    assert ids({"count": {"$eq": None}}) == ["c"]
+    assert ids({"count": {"$in": [1, None]}}) == ["b", "c"]
+    assert ids({"count": {"$nin": [1]}}) == ["a", "c"]
+    assert ids({"count": {"$exists": False}}) == ["c"]
+    assert ids({"title": {"$regex": "^buy", "$options": "i"}}) == ["a", "c"]
+    assert ids({"title": {"$not": {"$regex": "^buy"}}}) == ["a", "b"]
+    assert ids({"createdAt": {"$gte": "2024-02-01T00:00:00.000Z"}}) == ["b", "c"]
+    assert ids({"meta.tag": "work"}) == ["b"]
+    assert ids({"$or": [{"id": "a"}, {"count": 1}]}) == ["a", "b"]
+    assert ids({"$and": [{"completed": False}, {"count": {"$exists": True}}]}) == ["b"]
+    assert ids({"$nor": [{"id": "a"}]}) == ["b", "c"]
+
+    with pytest.raises(NotImplementedError):
+        compile_selector({"tags": {"$size": 1}})
+
+
+def test_query_dataframe():
+    query = {"selector": {"completed": False}, "sort": [{"title": "desc"}], "limit": 1}
+    assert list(query_dataframe(df, query, "id")["id"]) == ["c"]
+
+    query = {"selector": {}, "sort": [{"count": "asc"}], "skip": 1}
+    assert list(query_dataframe(df, query, "id")["id"]) == ["b", "a"]  # nulls first
+
+
+def test_query_dataframe_nulls_sort_lowest():
+    query = {"selector": {}, "sort": [{"count": "desc"}]}
+    assert list(query_dataframe(df, query, "id")["id"]) == ["a", "b", "c"]  # nulls last
+    counts = {"d": 1, "c": None, "b": 1, "a": None}
+    ties = compile_schema(schema).apply([{"id": i, "count": n} for i, n in counts.items()])
+    assert list(query_dataframe(ties, query, "id")["id"]) == ["b", "d", "a", "c"]
+
+
+def test_query_dataframe_pages_in_primary_key_order():
+    shuffled = df.iloc[[2, 0, 1]]
+    query = {"selector": {}, "skip": 1, "limit": 1}
+    assert list(query_dataframe(shuffled, query, "id")["id"]) == ["b"]
+    query = {"selector": {"completed": False}}
+    assert list(query_dataframe(shuffled, query, "id")["id"]) == ["b", "c"]
+
+
+def test_is_narrowing():
+    assert is_narrowing({"selector": {"completed": True}}, {"selector": {}})
+    assert is_narrowing({"selector": {"completed": True, "count": 1}}, {"selector": {"count": 1}})
+    assert not is_narrowing({"selector": {}}, {"selector": {"completed": True}})
+    assert not is_narrowing({"selector": {"completed": True}}, {"selector": {}, "limit": 10})
+    assert isinstance(query_dataframe(df, None), pd.DataFrame)
+
+
+def test_rxdb_dataframe_local_query(monkeypatch):
+    import rxdb_dataframe
+
+    calls = []
+
+    def component(**kwargs):
+        calls.append(kwargs)
+        return {"docs": docs, "info": {}, "query": kwargs["query"]}
+
+    monkeypatch.setattr(rxdb_dataframe.component, "_rxdb_dataframe", component)
+    config = {"schema": schema}
+    rxdb_dataframe.rxdb_dataframe(config, query={"selector": {}})
+
+    query = {"selector": {"completed": False}, "sort": [{"id": "desc"}]}
+    df = rxdb_dataframe.rxdb_dataframe(config, query=query, local_query=LocalQuery())
+    assert calls[-1]["query"] == {"selector": {}}  # browser stays subscribed to the superset
+    assert list(df["id"]) == ["c", "b"]
+
+    query = {"selector": {"tags": {"$size": 1}}}
+    rxdb_dataframe.rxdb_dataframe(config, query=query, local_query=LocalQuery())
+    assert calls[-1]["query"] == query  # unsupported operator -> evaluated by RxDB
@@ -0,0 +1,58 @@
+import logging
+
+import rxdb_dataframe
+from rxdb_dataframe.metrics import CallMetrics, add_metrics_callback, remove_metrics_callback
+from rxdb_dataframe.query_cache import CachePolicy
+
+schema = {
+    "primaryKey": "id",
+    "properties": {"id": {"type": "string"}, "count": {"type": "integer"}},
+}
+docs = [{"id": "a", "count": 1}, {"id": "b", "count": 2}]
+
+
+def test_call_metrics(caplog):
+    received = []
+
+    def failing(metrics):
+        raise RuntimeError("boom")
+
+    add_metrics_callback(received.append)
+    add_metrics_callback(failing)
+    try:
+        metrics = CallMetrics("test", "todo")
+        with metrics.stage("convert"):
+            pass
+        with metrics.stage("convert"):
+            pass
+        with caplog.at_level(logging.DEBUG, logger="rxdb_dataframe"):
+            result = metrics.finish()
+    finally:
+        remove_metrics_callback(received.append)
+        remove_metrics_callback(failing)
+
+    assert received == [result]
+    assert list(result["stages"]) == ["convert"] and result["total_s"] >= 0
+    assert any("Metrics callback" in r.message for r in caplog.records)
+    assert any(getattr(r, "rxdb_metrics", None) == result for r in caplog.records)
+
+
+def test_rxdb_dataframe_metrics(monkeypatch, caplog):
+    result = {"docs": docs, "info": {}, "query": {}, "timings": {"query_ms": 1.5}}
+    monkeypatch.setattr(rxdb_dataframe.component, "_rxdb_dataframe", lambda **kwargs: result)
+    config = {"name": "metrics", "schema": schema}
+
+    rxdb_dataframe.rxdb_dataframe(config, cache=CachePolicy(query_results=False))
+    metrics = rxdb_dataframe.RxDBSessionState().metrics
+    assert {"prepare", "component", "convert"} <= set(metrics["stages"])
+    assert (metrics["rows"], metrics["columns"]) == (2, 2)
+    assert metrics["frontend"] == {"query_ms": 1.5}
+
+    monkeypatch.setattr(
+        rxdb_dataframe.component, "_rxdb_dataframe", lambda **kwargs: {"docs": docs}
+    )
+    with caplog.at_level(logging.ERROR, logger="rxdb_dataframe"):
+        rxdb_dataframe.rxdb_dataframe(config, cache=CachePolicy(query_results=False))
+    assert rxdb_dataframe.RxDBSessionState().metrics["error"] == "'info'"
+    errors = [r for r in caplog.records if r.name == "rxdb_dataframe"]
+    assert errors and errors[-1].exc_info is not None
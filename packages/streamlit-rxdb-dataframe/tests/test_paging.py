@@ -0,0 +1,80 @@
+import rxdb_dataframe
+from rxdb_dataframe.paging import LazyRxDBFrame, page_range
+from rxdb_dataframe.plan import compile_schema
+
+schema = {
+    "primaryKey": "id",
+    "properties": {"id": {"type": "string"}, "count": {"type": "integer"}},
+}
+docs = [{"id": f"id-{i}", "count": i} for i in range(25)]
+
+
+def test_page_range():
+    assert list(page_range(0, 10, 10)) == [0]
+    assert list(page_range(5, 25, 10)) == [0, 1, 2]
+    assert list(page_range(5, 5, 10)) == []
+
+
+def test_lazy_frame_requests_missing_pages():
+    plan = compile_schema(schema)
+    pages = {0: plan.apply(docs[:10])}
+    requested = set()
+    lazy = LazyRxDBFrame(plan, 10, len(docs), pages.get, requested.update)
+
+    assert len(lazy) == 25 and lazy.num_pages == 3
+    assert list(lazy.head(3)["id"]) == ["id-0", "id-1", "id-2"]
+    assert not lazy.pending
+
+    assert list(lazy[5:15]["id"]) == [f"id-{i}" for i in range(5, 10)]
+    assert lazy.pending and requested == {1}
+    assert lazy.page(2) is None and requested == {1, 2}
+
+
+def test_rxdb_lazy_dataframe(monkeypatch):
+    calls = []
+
+    def component(**kwargs):
+        calls.append(kwargs)
+        pages = {str(i): docs[i * 10 : (i + 1) * 10] for i in kwargs["pages"]}
+        return {"pages": pages, "count": 25, "version": 1, "info": {}, "query": {}}
+
+    monkeypatch.setattr(rxdb_dataframe.component, "_rxdb_dataframe", component)
+    config = {"schema": schema}
+
+    lazy = rxdb_dataframe.rxdb_lazy_dataframe(config, page_size=10)
+    assert calls[-1]["pages"] == [0]
+    assert len(lazy) == 25
+    assert lazy.rows(18, 22).empty and lazy.pending
+
+    lazy = rxdb_dataframe.rxdb_lazy_dataframe(config, page_size=10)
+    assert calls[-1]["pages"] == [1, 2]
+    assert list(lazy.rows(18, 22)["count"]) == [18, 19, 20, 21]
+
+    rxdb_dataframe.rxdb_lazy_dataframe(config, page_size=10)
+    assert calls[-1]["pages"] == []
+
+
+def test_page_accessed_after_render_reruns(monkeypatch):
+    reruns = []
+    answered = []
+
+    def component(**kwargs):
+        # the component answers the requested pages at once, its value triggers the rerun
+        pages = {str(i): docs[i * 10 : (i + 1) * 10] for i in kwargs["pages"]}
+        answered.append(sorted(kwargs["pages"]))
+        return {"pages": pages, "count": 25, "version": 1, "info": {}, "query": {"a": 1}}
+
+    monkeypatch.setattr(rxdb_dataframe.component, "_rxdb_dataframe", component)
+    monkeypatch.setattr(rxdb_dataframe.component, "_request_rerun", lambda: reruns.append(1))
+    config = {"schema": schema}
+
+    lazy = rxdb_dataframe.rxdb_lazy_dataframe(config, query={"a": 1}, page_size=10)
+    assert lazy.page(0) is not None and not reruns
+    assert lazy.page(2) is None and lazy.page(2) is None
+    assert len(reruns) == 1  # once, the request is pending
+
+    # the rerun passes the request to the component (answered at once by the fake one)
+    lazy = rxdb_dataframe.rxdb_lazy_dataframe(config, query={"a": 1}, page_size=10)
+    assert answered[-1] == [2]
+    assert lazy.page(2)["count"].tolist() == [20, 21, 22, 23, 24]
+    assert len(reruns) == 1
@@ -0,0 +1,59 @@
+import json
+import os
+
+import pytest
+
+import rxdb_dataframe
+from rxdb_dataframe.parallel import ParallelConverter, configure_parallel_conversion
+from rxdb_dataframe.plan import compile_schema
+from rxdb_dataframe.query_cache import CachePolicy
+from rxdb_dataframe.synthetic import generate_docs
+
+benchmarks_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks")
+with open(os.path.join(benchmarks_dir, "schema.json")) as f:
+    schema = json.load(f)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_chunked_conversion(executor):
+    docs = generate_docs(schema, 1000, seed=0)
+    converter = ParallelConverter(workers=3, threshold=500, executor=executor)
+    try:
+        for flatten in (False, True):
+            plan = compile_schema(schema, flatten=flatten)
+            timings = []
+            df = converter.convert(plan, docs, timings)
+            expected = plan.apply(docs)
+            assert df.equals(expected) and df.dtypes.equals(expected.dtypes)
+            assert [t["rows"] for t in timings] == [334, 334, 332]
+            assert all(t["seconds"] >= 0 for t in timings)
+
+        timings = []
+        converter.convert(plan, docs[:499], timings)  # below the threshold
+        assert [t["rows"] for t in timings] == [499]
+    finally:
+        converter.close()
+
+
+def test_parallel_conversion_is_opt_in():
+    docs = generate_docs(schema, 1000, seed=0)
+    converter = ParallelConverter(workers=3)
+    timings = []
+    converter.convert(compile_schema(schema), docs, timings)
+    assert [t["rows"] for t in timings] == [1000] and converter._pool is None
+
+
+def test_rxdb_dataframe_chunk_metrics(monkeypatch):
+    docs = [{"id": str(i), "title": f"todo {i}"} for i in range(10)]
+    result = {"docs": docs, "info": {}, "query": {}}
+    monkeypatch.setattr(rxdb_dataframe.component, "_rxdb_dataframe", lambda **kwargs: result)
+    properties = {"id": {"type": "string"}, "title": {"type": "string"}}
+    config = {"name": "parallel", "schema": {"primaryKey": "id", "properties": properties}}
+    configure_parallel_conversion(workers=2, threshold=5)
+    try:
+        df = rxdb_dataframe.rxdb_dataframe(config, cache=CachePolicy(query_results=False))
+    finally:
+        configure_parallel_conversion()
+    assert df["id"].tolist() == [str(i) for i in range(10)]
+    chunks = rxdb_dataframe.RxDBSessionState().metrics["chunks"]
+    assert [chunk["rows"] for chunk in chunks] == [5, 5]
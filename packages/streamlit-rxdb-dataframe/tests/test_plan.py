@@ -0,0 +1,46 @@
+import pandas as pd
+from rxdb_dataframe.plan import compile_schema, schema_digest
+
+schema = {
+    "primaryKey": "id",
+    "properties": {
+        "id": {"type": "string"},
+        "completed": {"type": "boolean"},
+        "createdAt": {"type": "string", "format": "date-time"},
+        "last_modified": {"type": "integer", "format": "time"},
+        "count": {"type": "integer"},
+        "priority": {"type": "string", "enum": ["low", "high"]},
+    },
+}
+
+
+def test_schema_digest_is_stable():
+    reordered = {"properties": schema["properties"], "primaryKey": "id"}
+    assert schema_digest(schema) == schema_digest(reordered)
+    assert compile_schema(schema) is compile_schema(reordered)
+    assert compile_schema(schema, "hash").schema_hash == "hash"
+
+
+def test_conversion_plan_apply():
+    plan = compile_schema(schema)
+    assert list(plan.blueprint_df.columns) == list(schema["properties"])
+
+    docs = [
+        {
+            "id": "a",
+            "completed": True,
+            "createdAt": "2019-02-01T00:00:00.000Z",
+            "last_modified": 1548979200000,
+            "count": 1,
+            "priority": "low",
+        },
+        {"id": "b", "priority": "unknown"},
+    ]
+    df = plan.apply(docs)
+    assert df["completed"].dtype == "boolean"
+    assert df["count"].dtype == "Int64"
+    assert df["createdAt"].dtype == pd.DatetimeTZDtype(tz="UTC")
+    assert df["last_modified"].iloc[0] == pd.Timestamp("2019-02-01", tz="UTC")
+    assert list(df["priority"].cat.categories) == ["low", "high"]
+    assert df["priority"].isna().iloc[1]
+    assert df.dtypes.equals(plan.blueprint_df.dtypes)
@@ -0,0 +1,60 @@
+import pytest
+
+import rxdb_dataframe
+from rxdb_dataframe.mango import query_fields
+from rxdb_dataframe.plan import Projection, compile_schema
+
+schema = {
+    "primaryKey": "id",
+    "properties": {
+        "id": {"type": "string"},
+        "title": {"type": "string"},
+        "done": {"type": "boolean"},
+        "body": {"type": "string"},
+    },
+    "required": ["id", "title", "body"],
+}
+docs = [{"id": "a", "title": "A"}, {"id": "b", "title": "B"}]
+
+
+def test_compile_projection():
+    plan = compile_schema(schema, "projection", columns=["id", "title"])
+    assert plan.projection == ("id", "title")
+    assert compile_schema(schema, "projection", columns=["id", "title"]) is plan
+    assert compile_schema(schema, "projection") is not plan
+    with pytest.raises(ValueError, match="missing"):
+        compile_schema(schema, "projection", columns=["id", "missing"])
+    assert Projection(columns=["id", "title"]).columns == ("id", "title")
+    with pytest.raises(ValueError):
+        Projection(columns="title")
+
+
+def test_query_fields():
+    query = {
+        "selector": {"done": False, "$or": [{"title": "A"}, {"meta.rank": {"$gt": 1}}]},
+        "sort": [{"title": "asc"}],
+    }
+    assert query_fields(query) == {"done", "title", "meta.rank"}
+    assert query_fields(None) == set()
+
+
+def test_rxdb_dataframe_columns(monkeypatch):
+    calls = []
+
+    def component(**kwargs):
+        calls.append(kwargs)
+        return {"docs": docs, "info": {}, "query": {}, "version": "v", "columns": kwargs["columns"]}
+
+    monkeypatch.setattr(rxdb_dataframe.component, "_rxdb_dataframe", component)
+    config = {"name": "projection", "schema": schema}
+    df = rxdb_dataframe.rxdb_dataframe(
+        config, projection=Projection(columns=["title", "id", "title"])
+    )
+    # the primary key always comes first
+    assert calls[-1]["columns"] == ["id", "title"]
+    assert list(df.columns) == ["id", "title"]
+    state = rxdb_dataframe.RxDBSessionState()
+    assert set(state.column_config) <= {"id", "title"}
+
+    rxdb_dataframe.rxdb_dataframe(config)
+    assert calls[-1]["columns"] is None
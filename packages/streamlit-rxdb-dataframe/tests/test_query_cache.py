@@ -0,0 +1,86 @@
+import pandas as pd
+import rxdb_dataframe
+from rxdb_dataframe import store
+from rxdb_dataframe.mango import normalize_query
+from rxdb_dataframe.query_cache import QueryResultCache, query_cache_key
+from rxdb_dataframe.store import get_session_store
+
+schema = {
+    "primaryKey": "id",
+    "properties": {"id": {"type": "string"}, "completed": {"type": "boolean"}},
+}
+docs = [{"id": "a", "completed": True}, {"id": "b", "completed": False}]
+
+
+def test_normalize_query():
+    assert normalize_query({"selector": {"a": 1}}) == normalize_query(
+        {"selector": {"a": {"$eq": 1}}, "sort": [], "skip": 0}
+    )
+    assert normalize_query({"selector": {"a": {"$in": [2, 1]}}}) == normalize_query(
+        {"selector": {"a": {"$in": [1, 2]}}}
+    )
+    assert normalize_query({"selector": {}, "limit": 0}) != normalize_query({"selector": {}})
+    assert query_cache_key("todo", {"selector": {}}) != query_cache_key("todo", None, True)
+
+
+def test_query_result_cache_eviction():
+    df = pd.DataFrame({"a": range(100)})
+    cache = QueryResultCache(max_entries=2, max_bytes=3 * len(df) * 8, session_id="eviction")
+    cache.put("a", df)
+    cache.put("b", df)
+    assert cache.get("a") is df  # "b" becomes least recently used
+    assert cache.get("a") is df  # the same lookup again is not counted
+    cache.put("c", df)
+    assert "b" not in cache and len(cache) == 2
+    # the frames are held by the session data store, under the session's budget
+    assert get_session_store().session_nbytes("eviction") == cache.nbytes
+
+    get_session_store().drop_session("eviction")
+    assert cache.get("c") is None and "c" not in cache
+
+    cache.put("big", pd.DataFrame({"a": range(1000)}))
+    assert "big" not in cache
+
+    cache.validate("v2")
+    assert len(cache) == 0 and cache.nbytes == 0
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_rxdb_dataframe_query_cache(monkeypatch):
+    calls = []
+    active = {"selector": {"completed": False}}
+    everything = {"selector": {}}
+
+    def component(**kwargs):
+        calls.append(kwargs)
+        query = kwargs["query"]
+        if kwargs["cached_version"] == "v1":
+            return {"cached": True, "info": {}, "query": query, "version": "v1"}
+        selected = [d for d in docs if query == everything or not d["completed"]]
+        return {"docs": selected, "info": {}, "query": query, "version": "v1"}
+
+    monkeypatch.setattr(rxdb_dataframe.component, "_rxdb_dataframe", component)
+    config = {"name": "todo", "schema": schema}
+    state = rxdb_dataframe.RxDBSessionState()
+    state.query_cache.validate(None)
+
+    assert len(rxdb_dataframe.rxdb_dataframe(config, query=everything)) == 2
+    assert len(rxdb_dataframe.rxdb_dataframe(config, query=active)) == 1
+    assert calls[-1]["cached_version"] is None
+
+    df = rxdb_dataframe.rxdb_dataframe(config, query=everything)
+    assert calls[-1]["cached_version"] == "v1"  # the component only confirms the result
+    assert len(df) == 2
+    assert state.query_cache_stats["hits"] == 1
+
+    # a rerun by another widget looks up the same result again
+    rxdb_dataframe.rxdb_dataframe(config, query=everything)
+    assert state.query_cache_stats["hits"] == 1
+
+    # without measuring the frames again
+    measured = []
+    nbytes = store.dataframe_nbytes
+    monkeypatch.setattr(store, "dataframe_nbytes", lambda df: measured.append(df) or nbytes(df))
+    rxdb_dataframe.rxdb_dataframe(config, query=everything)
+    rxdb_dataframe.rxdb_dataframe(config, query=everything)
+    assert measured == []
@@ -0,0 +1,115 @@
+import json
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from rxdb_dataframe.replication import ReplicationServer, SQLiteReplicationStore
+
+schema = {
+    "primaryKey": "id",
+    "properties": {
+        "id": {"type": "string"},
+        "title": {"type": "string"},
+        "priority": {"type": "string", "enum": ["low", "high"]},
+        "estimate": {"type": "integer"},
+    },
+    "indexes": [["priority", "estimate"]],
+}
+
+
+@pytest.fixture
+def server(tmp_path):
+    store = SQLiteReplicationStore(str(tmp_path / "replication.sqlite"))
+    store.add_collection("todo", schema)
+    with ReplicationServer(store, heartbeat=0.05, token="secret") as server:
+        yield server
+    store.close()
+
+
+def _get(url, token="secret"):
+    separator = "&" if "?" in url else "?"
+    with urlopen(f"{url}{separator}token={token}", timeout=5) as response:
+        return json.loads(response.read())
+
+
+def _push(url, rows, headers=None):
+    headers = {"Content-Type": "application/json", **(headers or {})}
+    request = Request(f"{url}?token=secret", json.dumps(rows).encode(), headers)
+    with urlopen(request, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def test_pull_push_checkpoints(server):
+    url = f"{server.url}/todo"
+    docs = [
+        {"id": str(i), "title": f"todo {i}", "priority": "low", "estimate": i, "_deleted": False}
+        for i in range(5)
+    ]
+    assert _push(f"{url}/push", [{"newDocumentState": doc} for doc in docs]) == []
+
+    first = _get(f"{url}/pull?batchSize=3")
+    assert [doc["id"] for doc in first["documents"]] == ["0", "1", "2"]
+    checkpoint = first["checkpoint"]
+    rest = _get(f"{url}/pull?id={checkpoint['id']}&updatedAt={checkpoint['updatedAt']}")
+    assert [doc["id"] for doc in rest["documents"]] == ["3", "4"]
+    done = _get(f"{url}/pull?id=4&updatedAt={rest['checkpoint']['updatedAt']}")
+    assert done == {"documents": [], "checkpoint": rest["checkpoint"]}
+
+    # a stale assumed master state conflicts, the actual one is written
+    changed = {**docs[0], "title": "changed", "_meta": {"lwt": 1}}
+    conflicts = _push(f"{url}/push", [{"assumedMasterState": None, "newDocumentState": changed}])
+    assert conflicts == [docs[0]]
+    row = {"assumedMasterState": docs[0], "newDocumentState": {**docs[0], "_deleted": True}}
+    assert _push(f"{url}/push", [row]) == []
+    assert _get(f"{url}/pull?id=4&updatedAt={rest['checkpoint']['updatedAt']}")["documents"] == [
+        {**docs[0], "_deleted": True}
+    ]
+
+
+def test_stream_and_sql(server):
+    store = server.store
+    with urlopen(f"{server.url}/todo/pullStream?token=secret", timeout=5) as stream:
+        assert stream.readline() == b": heartbeat\n"  # subscribed
+        store.upsert("todo", [{"id": "a", "title": "A", "priority": "high", "estimate": 3}])
+        line = stream.readline()
+        while not line.startswith(b"data: "):
+            line = stream.readline()
+        event = json.loads(line[len(b"data: ") :])
+    assert event["documents"] == [
+        {"id": "a", "title": "A", "priority": "high", "estimate": 3, "_deleted": False}
+    ]
+    assert event["checkpoint"]["id"] == "a"
+
+    store.upsert("todo", [{"id": "b", "title": "B", "priority": "high", "estimate": 5}])
+    store.remove("todo", ["a"])
+    df = store.sql(
+        "SELECT id, estimate FROM todo_docs WHERE priority = ? AND estimate > ?", ("high", 1)
+    )
+    assert df.to_dict("records") == [{"id": "b", "estimate": 5}]
+    plan = store.sql("EXPLAIN QUERY PLAN SELECT id FROM todo_docs WHERE priority = 'high'")
+    assert plan["detail"].str.contains("todo__priority__estimate__id").any()
+    frame = store.dataframe("todo")
+    assert frame["id"].tolist() == ["b"] and str(frame["priority"].dtype) == "category"
+
+
+def test_token_and_origins_are_required(server):
+    url = f"{server.url}/todo"
+    assert server.replication_options("todo")["token"] == "secret"
+    with pytest.raises(HTTPError) as error:
+        _get(f"{url}/pull", token="guess")
+    assert error.value.code == 403
+
+    origin = {"Origin": "http://localhost:8501"}
+    assert _push(f"{url}/push", [], origin) == []
+    with pytest.raises(HTTPError) as error:
+        _push(f"{url}/push", [], {"Origin": "https://example.com"})
+    assert error.value.code == 403
+
+    preflight = Request(f"{url}/push", method="OPTIONS", headers=origin)
+    with urlopen(preflight, timeout=5) as response:
+        assert response.headers["Access-Control-Allow-Origin"] == origin["Origin"]
+    preflight = Request(f"{url}/push", method="OPTIONS", headers={"Origin": "https://x.com"})
+    with pytest.raises(HTTPError) as error:
+        urlopen(preflight, timeout=5)
+    assert "Access-Control-Allow-Origin" not in error.value.headers
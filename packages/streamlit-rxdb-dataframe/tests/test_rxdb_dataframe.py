@@ -1,5 +1,9 @@
 import pandas as pd
-from rxdb_dataframe import get_column_config, get_dataframe_by_schema
+import pytest
+import streamlit as st
+
+import rxdb_dataframe
+from rxdb_dataframe import CachePolicy, get_column_config, get_dataframe_by_schema
 
 
 def test_get_column_config():
@@ -68,3 +72,29 @@ def test_get_dataframe_by_schema():
         {"is_active": pd.Series(dtype="bool"), "has_permission": pd.Series(dtype="bool")}
     )
     assert get_dataframe_by_schema(schema).equals(expected_df)
+
+
+def test_deprecated_docs_are_rxdb_documents(monkeypatch):
+    schema = {
+        "primaryKey": "id",
+        "properties": {
+            "id": {"type": "string"},
+            "createdAt": {"type": "string", "format": "date-time"},
+            "done": {"type": "boolean"},
+        },
+    }
+    docs = [{"id": "a", "createdAt": "2024-01-01T00:00:00.000Z", "done": True}, {"id": "b"}]
+    result = {"docs": docs, "info": {}, "query": {"selector": {}}}
+    monkeypatch.setattr(rxdb_dataframe.component, "_rxdb_dataframe", lambda **kwargs: result)
+    st.session_state.pop(rxdb_dataframe.RXDB_STATE_KEY, None)
+    rxdb_dataframe.rxdb_dataframe(
+        {"name": "deprecated", "schema": schema}, cache=CachePolicy(query_results=False)
+    )
+    state = rxdb_dataframe.RxDBSessionState()
+
+    with pytest.deprecated_call():
+        assert state.docs == docs
+    with pytest.deprecated_call():
+        state.docs = docs[:1]
+    assert state.dataframe["id"].tolist() == ["a"]
+    state.dataframe = None
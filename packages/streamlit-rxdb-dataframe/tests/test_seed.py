@@ -0,0 +1,110 @@
+import json
+
+import streamlit as st
+import rxdb_dataframe
+from rxdb_dataframe.seed import (
+    SeedDocs,
+    config_digest,
+    docs_digest,
+    iter_dump,
+    load_dump,
+    seed_args,
+    split_seed,
+)
+
+schema = {
+    "primaryKey": "id",
+    "properties": {"id": {"type": "string"}, "title": {"type": "string"}},
+}
+docs = [{"id": str(i), "title": f"todo {i}"} for i in range(5)]
+
+
+def test_load_dump_streams(tmp_path):
+    path = tmp_path / "dump.json"
+    dump = {"name": "todo", "schemaHash": "abc", "docs": docs + [{"id": "x", "n": 12345.5}]}
+    path.write_text(json.dumps(dump, indent=2))
+
+    loaded = load_dump(str(path), read_size=7)
+    assert {**loaded, "docs": list(loaded["docs"])} == dump
+    assert isinstance(loaded["docs"], SeedDocs)
+    assert docs_digest(loaded["docs"]) == docs_digest(dump["docs"])
+    keys = [key for key, _ in iter_dump(str(path), read_size=3)]
+    assert keys == ["name", "schemaHash"] + ["doc"] * 6
+
+
+def test_split_seed_and_chunks():
+    config = {"name": "todo", "schema": schema, "options": {"initialDocs": docs, "a": 1}}
+    static, seed_docs = split_seed(config)
+    assert static["options"] == {"a": 1} and seed_docs is docs
+    assert config["options"]["initialDocs"] is docs
+    assert config_digest(static, {}) == config_digest(split_seed(dict(config))[0], {})
+
+    seed = seed_args(docs, {}, chunk_size=2)
+    assert seed["total"] == 5 and "docs" not in seed
+    progress = {"digest": seed["digest"], "loaded": 4, "total": 5, "done": False}
+    assert seed_args(docs, progress, chunk_size=2)["docs"] == docs[4:]
+    assert seed_args(docs, {**progress, "done": True}) is None
+    assert seed_args(None, progress) is None
+
+    # lists are hashed on every call, they may be changed in place
+    changed = [dict(doc) for doc in docs]
+    digest = docs_digest(changed)
+    changed[0]["title"] = "changed"
+    assert docs_digest(changed) != digest
+
+
+def test_static_config_sent_until_initialized(monkeypatch):
+    calls = []
+    results = [None]
+
+    def component(**kwargs):
+        calls.append(kwargs)
+        return results[-1]
+
+    def component_value(result):
+        # like Streamlit, the component value is in the session state before the call
+        results.append(result)
+        st.session_state[rxdb_dataframe.RXDB_COLLECTION_KEY] = result
+
+    monkeypatch.setattr(rxdb_dataframe.component, "_rxdb_dataframe", component)
+    state = rxdb_dataframe.RxDBSessionState()
+    state.config_hash, state.seed = None, {}
+    config = {"name": "seeded", "schema": schema, "options": {"initialDocs": docs}}
+
+    rxdb_dataframe.rxdb_dataframe(config, seed_chunk_size=2)
+    first = calls[-1]
+    assert "initialDocs" not in first["collection_config"]["options"]
+    assert first["db_config"] and first["seed"] == {"digest": first["seed"]["digest"], "total": 5}
+
+    # the component initialized & asks for the seed docs
+    progress = {"digest": first["seed"]["digest"], "total": 5, "loaded": 0, "done": False}
+    protocol = rxdb_dataframe.RXDB_PROTOCOL_VERSION
+    component_value({"config_hash": first["config_hash"], "seed": progress, "protocol": protocol})
+    rxdb_dataframe.rxdb_dataframe(config, seed_chunk_size=2)
+    assert calls[-1]["collection_config"] is None and calls[-1]["db_config"] is None
+    assert calls[-1]["seed"]["docs"] == docs[:2]
+    assert state.seed == progress
+
+    # remounted component asks for the config again
+    component_value({"config_hash": None, "protocol": protocol})
+    rxdb_dataframe.rxdb_dataframe(config, seed_chunk_size=2)
+    assert calls[-1]["collection_config"] is not None
+    st.session_state[rxdb_dataframe.RXDB_COLLECTION_KEY] = None
+
+
+def test_stale_frontend_is_reported(monkeypatch, caplog):
+    # a frontend build older than the protocol never reports it
+    value = {"docs": docs, "info": {}, "query": {}, "version": "v"}
+    monkeypatch.setattr(rxdb_dataframe.component, "_rxdb_dataframe", lambda **kwargs: value)
+    state = rxdb_dataframe.RxDBSessionState()
+    state.protocol = rxdb_dataframe.RXDB_PROTOCOL_VERSION
+    config = {"name": "stale", "schema": schema}
+
+    rxdb_dataframe.rxdb_dataframe(config)
+    rxdb_dataframe.rxdb_dataframe(config)
+    errors = [r for r in caplog.records if "rebuild the frontend" in r.getMessage()]
+    assert len(errors) == 1 and state.protocol is None
+
+    value["protocol"] = rxdb_dataframe.RXDB_PROTOCOL_VERSION
+    rxdb_dataframe.rxdb_dataframe(config)
+    assert state.protocol == rxdb_dataframe.RXDB_PROTOCOL_VERSION
@@ -0,0 +1,101 @@
+import os
+import time
+
+import pandas as pd
+import streamlit as st
+
+import rxdb_dataframe
+from rxdb_dataframe import snapshots
+from rxdb_dataframe.query_cache import CachePolicy
+from rxdb_dataframe.snapshots import SnapshotCache, snapshot_key
+from rxdb_dataframe.store import get_session_store
+
+schema = {
+    "primaryKey": "id",
+    "properties": {"id": {"type": "string"}, "count": {"type": "integer"}},
+}
+
+
+def make_df(n):
+    return pd.DataFrame({"id": [str(i) for i in range(n)], "count": pd.array(range(n), "Int64")})
+
+
+def test_snapshot_cache_throttles_and_evicts(tmp_path):
+    cache = SnapshotCache(str(tmp_path), min_interval=60)
+    df = make_df(100)
+    assert cache.put("a", df)
+    assert not cache.put("a", make_df(5))  # within min_interval
+    pd.testing.assert_frame_equal(cache.get("a"), df)
+    assert cache.get("b") is None
+    assert not list(tmp_path.glob("*.tmp"))
+
+    cache.put("b", make_df(100))
+    os.utime(cache.path("a"), (time.time() - 10, time.time() - 10))
+    cache.max_bytes = os.path.getsize(cache.path("b"))
+    cache.evict()  # least recently used beyond max_bytes
+    assert not os.path.exists(cache.path("a")) and os.path.exists(cache.path("b"))
+
+    cache.max_age = 0.0
+    time.sleep(0.01)
+    assert cache.get("b") is None  # expired
+    cache.evict()
+    assert cache.stats() == {"hits": 1, "misses": 2, "writes": 2, "evictions": 2}
+
+    key = snapshot_key("todo", "hash", {"selector": {"a": 1}})
+    assert key == snapshot_key("todo", "hash", {"selector": {"a": {"$eq": 1}}, "sort": []})
+    assert key != snapshot_key("todo", "other", {"selector": {"a": 1}})
+
+
+def test_new_session_renders_stale_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshots, "_cache", SnapshotCache(str(tmp_path), min_interval=0))
+    results = [None]
+    monkeypatch.setattr(rxdb_dataframe.component, "_rxdb_dataframe", lambda **kwargs: results[-1])
+    config = {"name": "snapshotted", "schema": schema}
+    docs = [{"id": "1", "count": 1}, {"id": "2", "count": 2}]
+
+    def new_session():
+        st.session_state.pop(rxdb_dataframe.RXDB_STATE_KEY, None)
+        get_session_store().drop_session("default")
+
+    def render():
+        return rxdb_dataframe.rxdb_dataframe(
+            config, cache=CachePolicy(query_results=False, snapshot=True)
+        )
+
+    new_session()
+    assert render().empty
+    results.append({"docs": docs, "info": {}, "query": {"selector": {}}})
+    assert len(render()) == 2
+    assert not rxdb_dataframe.RxDBSessionState().stale
+
+    new_session()
+    results.append(None)
+    df = render()
+    assert df["count"].tolist() == [1, 2]
+    assert rxdb_dataframe.RxDBSessionState().stale
+    assert render()["count"].tolist() == [1, 2]  # held in the session store meanwhile
+    assert snapshots.get_snapshot_cache().stats()["hits"] == 1
+
+    results.append({"docs": docs[:1], "info": {}, "query": {"selector": {}}})
+    assert render()["count"].tolist() == [1]
+    assert not rxdb_dataframe.RxDBSessionState().stale
+    new_session()
+
+
+def test_snapshot_cache_trailing_write_and_scope(tmp_path):
+    cache = SnapshotCache(str(tmp_path), min_interval=0.1, max_tracked=2)
+    first, last = make_df(1), make_df(3)
+    assert cache.put("a", first)
+    assert not cache.put("a", make_df(2))
+    assert not cache.put("a", last)  # replaces the held back frame
+    time.sleep(0.3)
+    pd.testing.assert_frame_equal(cache.get("a"), last)
+    assert cache.stats()["writes"] == 2
+
+    cache.put("b", first)
+    cache.put("c", first)
+    assert list(cache._written) == ["b", "c"]  # bounded
+
+    key = snapshot_key("todo", "hash", None, scope="alice")
+    assert key != snapshot_key("todo", "hash", None, scope="bob")
+    assert snapshot_key("todo", "hash", None) != key
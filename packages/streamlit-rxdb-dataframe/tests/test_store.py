@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pandas as pd
+from rxdb_dataframe import store as store_module
+from rxdb_dataframe.store import SessionDataStore, dataframe_nbytes
+
+
+def make_df(n, offset=0):
+    return pd.DataFrame(
+        {"id": [f"id-{i + offset}" for i in range(n)], "count": pd.array(range(n), dtype="Int64")}
+    )
+
+
+def test_session_budget_spills_lru_entry(tmp_path):
+    nbytes = dataframe_nbytes(make_df(100))
+    store = SessionDataStore(session_budget=nbytes * 2, spill_dir=str(tmp_path))
+    store.put("s1", "a", make_df(100))
+    store.put("s1", "b", make_df(100))
+    store.get("s1", "a")  # "b" is now least recently used
+    store.put("s1", "c", make_df(100))
+
+    stats = store.stats()
+    assert stats["spills"] == 1 and stats["spilled_entries"] == 1
+    assert store.session_nbytes("s1") <= nbytes * 2
+    assert len(list(tmp_path.iterdir())) == 1
+
+    reloaded = store.get("s1", "b")
+    pd.testing.assert_frame_equal(reloaded, make_df(100))
+    assert store.stats()["reloads"] == 1
+
+
+def test_global_budget_evicts_across_sessions(tmp_path):
+    nbytes = dataframe_nbytes(make_df(100))
+    store = SessionDataStore(global_budget=nbytes * 2, spill_dir=str(tmp_path))
+    for session_id in ("s1", "s2", "s3"):
+        store.put(session_id, "df", make_df(100))
+
+    assert store.nbytes <= nbytes * 2
+    assert store.session_nbytes("s1") == 0  # oldest session spilled
+    assert store.get("s1", "df") is not None
+
+    store.drop_session("s1")
+    assert store.get("s1", "df") is None
+
+
+def test_spill_budget_drops_oldest_spill_file(tmp_path):
+    nbytes = dataframe_nbytes(make_df(100))
+    store = SessionDataStore(
+        global_budget=nbytes, spill_budget=nbytes, spill_dir=str(tmp_path)
+    )
+    for session_id in ("s1", "s2", "s3"):
+        store.put(session_id, "df", make_df(100))
+
+    assert store.stats()["spilled_entries"] == 1
+    assert store.get("s1", "df") is None
+    assert store.get("s2", "df") is not None
+
+
+def test_idle_sessions_expire(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    nbytes = dataframe_nbytes(make_df(100))
+    store = SessionDataStore(global_budget=nbytes, session_ttl=60, spill_dir=str(tmp_path))
+    store.put("s1", "a", make_df(100))
+    store.put("s1", "b", make_df(100))  # "a" spilled
+    clock[0] += 30
+    store.put("s2", "df", make_df(100))
+
+    clock[0] += 45  # "s1" idle for 75s, "s2" for 45s
+    store.get("s2", "df")
+    assert store.stats()["expired"] == 1
+    assert store.session_nbytes("s1") == 0 and store.get("s1", "b") is None
+    assert store.stats()["sessions"] == 1
+    assert not list(tmp_path.iterdir())  # the spill file of "s1" is removed
+    assert store.get("s2", "df") is not None
+
+
+def test_spill_files_are_written_and_read_without_the_lock(tmp_path, monkeypatch):
+    nbytes = dataframe_nbytes(make_df(100))
+    store = SessionDataStore(session_budget=nbytes, spill_dir=str(tmp_path))
+    blocked = []
+
+    def unlocked(function):
+        def wrapper(*args):
+            other = threading.Thread(target=store.get, args=("s2", "df"))
+            other.start()
+            other.join(timeout=1)
+            blocked.append(other.is_alive())  # waiting for the lock
+            return function(*args)
+
+        return wrapper
+
+    write, read = store_module._write_spill_file, store_module.read_arrow_file
+    monkeypatch.setattr(store_module, "_write_spill_file", unlocked(write))
+    monkeypatch.setattr(store_module, "read_arrow_file", unlocked(read))
+    store.put("s1", "a", make_df(100))
+    store.put("s1", "b", make_df(100))  # "a" spilled
+    pd.testing.assert_frame_equal(store.get("s1", "a"), make_df(100))  # "b" spilled
+    assert blocked == [False, False, False]
+    assert store.stats()["spills"] == 2 and store.stats()["reloads"] == 1
+    assert len(list(tmp_path.iterdir())) == 1
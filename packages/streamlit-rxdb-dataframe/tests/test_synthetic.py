@@ -0,0 +1,54 @@
+import importlib.util
+import json
+import os
+
+import pandas as pd
+from rxdb_dataframe.plan import compile_schema
+from rxdb_dataframe.synthetic import generate_docs
+
+benchmarks_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks")
+schema = json.load(open(os.path.join(benchmarks_dir, "schema.json")))
+
+
+def load_benchmarks():
+    spec = importlib.util.spec_from_file_location("run", os.path.join(benchmarks_dir, "run.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_generate_docs_honors_schema():
+    docs = generate_docs(schema, 500, seed=1)
+    assert docs == generate_docs(schema, 500, seed=1)
+    assert len({doc["id"] for doc in docs}) == 500
+    assert all(len(doc["id"]) <= 36 for doc in docs)
+    assert all({"id", "title", "createdAt"} <= set(doc) for doc in docs)
+    assert any("completed" not in doc for doc in docs)
+
+    props = schema["properties"]
+    for doc in docs:
+        assert 3 <= len(doc["title"]) <= 64
+        assert doc.get("priority", "low") in props["priority"]["enum"]
+        assert 0 <= doc.get("estimate", 0) <= 100 and isinstance(doc.get("estimate", 0), int)
+        assert 0 <= doc.get("progress", 0) <= 1
+        assert len(doc.get("tags", [])) <= 4
+        assert doc.get("meta", {}).get("source", "web") in ("web", "mobile", "import")
+
+    df = compile_schema(schema).apply(docs)
+    assert df["createdAt"].notna().all()
+    assert pd.api.types.is_datetime64_any_dtype(df["last_modified"])
+
+
+def test_benchmarks_compare():
+    run = load_benchmarks()
+    assert [run.parse_size(s) for s in ("500", "1k", "1m")] == [500, 1000, 1000000]
+    assert run.format_size(100000) == "100k"
+
+    results = run.run_benchmarks(schema, [50], repeat=1, only=["convert", "diff"])
+    assert set(results) == {"convert/50", "convert[flatten]/50", "convert[parallel]/50", "diff/50"}
+
+    baseline = {"convert/50": {"min_s": 1.0}, "diff/50": {"min_s": 0.01}}
+    current = {"convert/50": {"min_s": 1.2}, "diff/50": {"min_s": 0.02}}
+    assert run.compare(current, baseline, threshold=0.25) == ["diff/50"]
+    assert run.compare(current, baseline, threshold=0.1) == ["convert/50", "diff/50"]
+    assert run.compare(current, baseline, threshold=0.1, noise=0.5) == []
@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+import rxdb_dataframe
+from rxdb_dataframe.updates import UpdatePolicy
+
+schema = {
+    "primaryKey": "id",
+    "properties": {"id": {"type": "string"}, "title": {"type": "string"}},
+}
+docs = [{"id": "a", "title": "A"}, {"id": "b", "title": "B"}]
+
+
+def test_policy_args():
+    policy = UpdatePolicy(min_interval=0.5, trailing=False, max_batch=1000)
+    assert policy.to_args() == {
+        "min_interval": 500,
+        "trailing": False,
+        "max_batch": 1000,
+        "pause_ms": 0,
+    }
+    paused = UpdatePolicy(pause_while_editing=2)
+    assert paused.to_args(time.time() - 0.5)["pause_ms"] in range(1400, 1501)
+    assert paused.to_args(time.time() - 5)["pause_ms"] == 0
+    with pytest.raises(ValueError):
+        UpdatePolicy(max_batch=0)
+
+
+def test_rxdb_dataframe_update_policy(monkeypatch):
+    calls = []
+    updates = {"emitted": 5, "sent": 2, "merged": 3, "suppressed": 0}
+
+    def component(**kwargs):
+        calls.append(kwargs)
+        return {"docs": docs, "info": {}, "query": {}, "version": "v", "updates": updates}
+
+    monkeypatch.setattr(rxdb_dataframe.component, "_rxdb_dataframe", component)
+    config = {"name": "updates", "schema": schema}
+    policy = UpdatePolicy(min_interval=1, pause_while_editing=3)
+    rxdb_dataframe.rxdb_dataframe(config, update_policy=policy)
+    assert calls[-1]["update_policy"]["pause_ms"] == 0
+    state = rxdb_dataframe.RxDBSessionState()
+    assert state.updates == updates and state.metrics["updates"] == updates
+
+    # an edit of the data editor pauses the updates
+    editing_state = {"edited_rows": {"0": {"title": "A!"}}, "added_rows": [], "deleted_rows": []}
+    rxdb_dataframe.ss[rxdb_dataframe.RXDB_COLLECTION_EDITOR_KEY] = editing_state
+    try:
+        rxdb_dataframe.rxdb_dataframe(config, update_policy=policy)
+    finally:
+        rxdb_dataframe.ss[rxdb_dataframe.RXDB_COLLECTION_EDITOR_KEY] = {}
+    assert 2000 < calls[-1]["update_policy"]["pause_ms"] <= 3000
+
+    rxdb_dataframe.rxdb_dataframe(config)
+    assert calls[-1]["update_policy"] is None
@@ -0,0 +1,117 @@
+import json
+import pathlib
+import warnings
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import rxdb_dataframe
+from rxdb_dataframe.plan import compile_schema
+from rxdb_dataframe.validation import SchemaValidator
+
+DATA_DIR = pathlib.Path(__file__).parents[1] / "rxdb_dataframe/frontend/public/assets/data"
+
+schema = {
+    "primaryKey": "id",
+    "required": ["id", "title"],
+    "properties": {
+        "id": {"type": "string", "maxLength": 36},
+        "title": {"type": "string", "minLength": 3, "maxLength": 10},
+        "status": {"type": "string", "enum": ["open", "done"]},
+        "code": {"type": "string", "pattern": "^[A-Z]{2}-\\d+$"},
+        "estimate": {"type": "integer", "minimum": 0, "maximum": 100},
+        "progress": {"type": "number", "min": 0, "max": 1},
+    },
+}
+
+
+def test_validate_batch_masks():
+    df = pd.DataFrame(
+        {
+            "id": ["a", "b", "c", "d"],
+            "title": ["ok title", "no", None, "far too long title"],
+            "status": ["open", "closed", None, "done"],
+            "code": ["AB-1", "ab-1", None, "XY-22"],
+            "estimate": pd.array([5, 101, None, -1], dtype="Int64"),
+            "progress": [0.5, 0.1, np.nan, 1.5],
+        }
+    )
+    result = SchemaValidator(schema).validate(df)
+
+    assert result.invalid.tolist() == [False, True, True, True]
+    assert not result
+    assert result.masks[("title", "minLength")].tolist() == [False, True, False, False]
+    assert result.masks[("title", "required")].tolist() == [False, False, True, False]
+    assert result.field_mask("estimate").tolist() == [False, True, False, True]
+    assert result.to_frame().loc[3].to_dict() == {
+        "id": False,
+        "title": True,
+        "status": False,
+        "code": False,
+        "estimate": True,
+        "progress": True,
+    }
+    assert result.errors(df["id"])["b"] == {
+        "title": ["minLength"],
+        "status": ["enum"],
+        "code": ["pattern"],
+        "estimate": ["maximum"],
+    }
+    assert SchemaValidator(schema).validate(df.iloc[:1])
+
+
+def test_invalid_editor_rows_are_not_written():
+    config = {"name": "validated", "schema": schema}
+    artifacts = rxdb_dataframe._schema_artifacts(config)
+    plan = compile_schema(schema)
+    df = plan.apply([{"id": "a", "title": "first"}, {"id": "b", "title": "second"}])
+    state = rxdb_dataframe.RxDBSessionState()
+    state.editor = {}
+    state.dataframe = df
+    rxdb_dataframe._track_editor_rows(state, df, "id")
+    st.session_state[rxdb_dataframe.RXDB_COLLECTION_EDITOR_KEY] = {
+        "edited_rows": {"0": {"title": "x"}, "1": {"title": "renamed"}},
+        "added_rows": [{"title": "new todo"}, {"title": "no", "estimate": 500}],
+        "deleted_rows": [],
+    }
+    try:
+        writes = rxdb_dataframe._editor_writes(state, artifacts)
+    finally:
+        st.session_state[rxdb_dataframe.RXDB_COLLECTION_EDITOR_KEY] = {}
+        state.dataframe = None
+
+    assert writes["patch"] == [{"id": "b", "title": "renamed"}]
+    assert [doc["title"] for doc in writes["upsert"]] == ["new todo"]
+    assert writes["remove"] == []
+    rejected = state.editor["rejected"]
+    assert rejected["a"] == {"title": ["minLength"]}
+    assert sorted(next(v for k, v in rejected.items() if k != "a")) == ["estimate", "title"]
+
+
+def test_browser_stamped_fields_are_not_required():
+    todo = json.loads((DATA_DIR / "todo.schema.json").read_text())
+    config = {"name": "stamped", "schema": todo}
+    artifacts = rxdb_dataframe._schema_artifacts(config)
+    doc = {"id": "a", "title": "first", "createdAt": "2024-01-01T00:00:00.000Z"}
+    df = compile_schema(todo).apply([doc])
+    state = rxdb_dataframe.RxDBSessionState()
+    state.editor = {}
+    state.dataframe = df
+    rxdb_dataframe._track_editor_rows(state, df, "id")
+    st.session_state[rxdb_dataframe.RXDB_COLLECTION_EDITOR_KEY] = {
+        "edited_rows": {"0": {"createdAt": None}},
+        "added_rows": [{"title": "new todo", "completed": True}],
+        "deleted_rows": [],
+    }
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")  # the `^(.*)$` pattern of `id` has a capture group
+            writes = rxdb_dataframe._editor_writes(state, artifacts)
+    finally:
+        st.session_state[rxdb_dataframe.RXDB_COLLECTION_EDITOR_KEY] = {}
+        state.dataframe = None
+
+    # `createdAt` of the added row is stamped by the browser, a cleared one is still required
+    assert [doc["title"] for doc in writes["upsert"]] == ["new todo"]
+    assert state.editor["rejected"] == {"a": {"createdAt": ["required"]}}